@@ -1,16 +1,26 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import JWTError
 import os
-from app.services.supabase_client import supabase
+from app.services.repository import get_repository
+from app.services.cache import TTLCache
+from app.auth.jwt_handler import decode_access_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
 
-SECRET_KEY = os.getenv("JWT_SECRET")
-ALGORITHM = "HS256"
+# Authenticated user rows keyed by user id, so most requests skip the users table lookup
+principal_cache = TTLCache(
+    "principal",
+    maxsize=int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60")),
+)
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+def invalidate_principal(user_id: str) -> None:
+    principal_cache.invalidate(user_id)
+
+
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)):
 
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -18,16 +28,26 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+    # LoggingMiddleware already verified the same Authorization header; None means it was rejected
+    if hasattr(request.state, "claims"):
+        payload = request.state.claims
+    else:
+        try:
+            payload = decode_access_token(token)
+        except JWTError:
+            payload = None
+
+    user_id: str = payload.get("sub") if payload else None
+    if user_id is None:
         raise credentials_exception
 
-    res = supabase.table("users").select("id, username, email, is_admin").eq("id", user_id).execute()
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return dict(user)
+
+    user = await get_repository().users.get_by_id(user_id)
 
-    if not res.data:
+    if not user:
         raise credentials_exception
-    return res.data[0]
\ No newline at end of file
+    principal_cache.set(user_id, user)
+    return dict(user)
\ No newline at end of file
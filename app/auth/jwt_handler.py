@@ -1,8 +1,10 @@
 from datetime import datetime, timedelta
+import time
 from jose import jwt
 import os
 from passlib.context import CryptContext
 from dotenv import load_dotenv
+from app.services.cache import TTLCache
 
 load_dotenv()
 
@@ -11,6 +13,9 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Claims of recently verified tokens, each kept until the token's own `exp`
+verified_token_cache = TTLCache("verified_token", maxsize=int(os.getenv("VERIFIED_TOKEN_CACHE_SIZE", "4096")))
+
 
 def create_access_token(user_id: str):
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -21,6 +26,27 @@ def create_access_token(user_id: str):
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
+def decode_access_token(token: str) -> dict:
+    """
+    Verify a bearer token and return its claims, skipping the signature check for
+    tokens that were already verified and have not expired yet.
+
+    Raises:
+        JWTError: If the token is malformed, has an invalid signature or is expired.
+    """
+    claims = verified_token_cache.get(token)
+    if claims is not None:
+        return claims
+
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    exp = claims.get("exp")
+    if exp is not None:
+        ttl = exp - time.time()
+        if ttl > 0:
+            verified_token_cache.set(token, claims, ttl=ttl)
+    return claims
+
+
 def hash_password(password: str):
     return pwd_context.hash(password)
 
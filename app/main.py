@@ -1,8 +1,18 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.middleware import LoggingMiddleware
 from app.routes import users, tasks, suggest, resumes
 from app.logging_config import configure_logging, get_logger
+from app.services.supabase_client import close_supabase
+from app.services.resume_ingestion import resume_job_queue
+from app.services.staffing import staffing_suggestions
+from app.services.query_variations import stop_precompute
+from app.services.web_search import web_search
+from app.services.pdf_extraction import shutdown_pdf_pool
+from app.services.keyword_index import load_keyword_index
+from app.services.vector_index import load_vector_index
 from prometheus_fastapi_instrumentator import Instrumentator
 
 
@@ -11,11 +21,27 @@ from prometheus_fastapi_instrumentator import Instrumentator
 configure_logging()
 logger = get_logger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.gather(load_vector_index(), load_keyword_index())
+    resume_job_queue.start()
+    staffing_suggestions.start()
+    yield
+    await stop_precompute()
+    await staffing_suggestions.stop()
+    await resume_job_queue.stop()
+    shutdown_pdf_pool()
+    await web_search.aclose()
+    await close_supabase() # release the pooled Supabase connections
+
+
 # Create FastAPI app
 app = FastAPI(
     title="sprint-sync",
     description="Backend API for SprintSync application",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 Instrumentator().instrument(app).expose(app)
@@ -1,53 +1,69 @@
-import os
 import time
 import uuid
-from typing import Callable
-from fastapi import Depends, Request, Response
-import jwt
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.auth.jwt_handler import decode_access_token
 from app.logging_config import get_logger, set_request_id, clear_context, set_user_id
 from dotenv import load_dotenv
 load_dotenv()
 
 logger = get_logger(__name__)
 
-SECRET_KEY = os.getenv("JWT_SECRET")
-ALGORITHM = "HS256"
+class LoggingMiddleware:
+    """
+    Pure ASGI request logging middleware.
+
+    Works on scope/receive/send directly instead of BaseHTTPMiddleware, so the
+    response is not proxied through an extra task and memory stream.
+    """
 
-class LoggingMiddleware(BaseHTTPMiddleware):
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
         request_id = str(uuid.uuid4())
         set_request_id(request_id)
-        start_time = time.time()
+        start_time = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+        client = scope.get("client")
 
         # get userid
-        token = request.headers.get("Authorization")
+        token = Headers(scope=scope).get("Authorization")
         if token and token.startswith("Bearer "):
             token = token.split(" ")[1]
+            state = scope.setdefault("state", {})
             try:
-                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-                request.state.user = payload
+                payload = decode_access_token(token)
+                state["claims"] = payload # reused by get_current_user via request.state.claims
                 set_user_id(payload["sub"])
             except Exception as e:
+                state["claims"] = None
                 logger.error(reason="Failed to decode JWT token", error=str(e))
-                pass
 
-        logger.info("request_started", method=request.method, path=request.url.path, client_host=request.client.host if request.client else None)
+        logger.info("request_started", method=method, path=path, client_host=client[0] if client else None)
+        status_code = None
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id # sent back the request id to the client
+            await send(message)
+
         try:
-            response = await call_next(request) # Process the request
-            duration = time.time() - start_time
-            logger.info("request_completed", method=request.method, path=request.url.path, status_code=response.status_code, duration_seconds=round(duration, 4))
-            response.headers["X-Request-ID"] = request_id # sent back the request id to the client
-            return response
+            await self.app(scope, receive, send_with_request_id) # Process the request
+            duration = time.perf_counter() - start_time
+            logger.info("request_completed", method=method, path=path, status_code=status_code, duration_seconds=round(duration, 4))
 
         except Exception as e:
-            duration = time.time() - start_time
-            logger.error("request_failed", method=request.method, path=request.url.path, duration_seconds=round(duration, 4), error=str(e), exc_info=True)
+            duration = time.perf_counter() - start_time
+            logger.error("request_failed", method=method, path=path, duration_seconds=round(duration, 4), error=str(e), exc_info=True)
             raise
 
         finally:
-            clear_context()
\ No newline at end of file
+            clear_context()
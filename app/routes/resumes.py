@@ -1,14 +1,24 @@
-from typing import List
-
-from fastapi import APIRouter, Depends, File, HTTPException, status
+from functools import partial
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.services.pagination import (LIST_MAX_PAGE_SIZE, LIST_PAGE_SIZE, ListQueryError, decode_cursor, fetch_page,
+                                     parse_fields, stream_ndjson)
 from pydantic import BaseModel, EmailStr
-from app.services.supabase_client import supabase
+from app.services.repository import get_repository
+from app.services.etags import conditional_response, not_modified, resume_versions
 from app.auth.dependencies import get_current_user
 from fastapi import UploadFile, File
 from app.services.s3_bucket import s3_client, BUCKET_NAME
-from app.services.ai_services import profile_task_generator_agent, profile_skills_generator_agent, embeddings_model
-from pypdf import PdfReader
-from io import BytesIO
+from app.services.jobs import QueueFullError
+from app.services.pdf_extraction import (check_pdf_size, PdfTooLargeError, PdfExtractionCrashedError,
+                                         PdfExtractionTimeoutError)
+from app.services.resume_ingestion import ingest_resume, resume_job_queue
+from app.services.keyword_index import keyword_index
+from app.services.staffing import staffing_suggestions
+from app.services.vector_index import vector_index
 from app.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -16,6 +26,9 @@ logger = get_logger(__name__)
 
 router = APIRouter(prefix="/resumes", tags=["resumes"])
 
+# "users" is the owner's {"username": ...}; the embedding is never listed
+RESUME_FIELDS = ("id", "user_id", "s3_key", "profile_skills", "profile_tasks", "users", "created_at", "updated_at")
+
 class ResumeResponse(BaseModel):
     id: str
     user_id: str
@@ -24,58 +37,53 @@ class ResumeResponse(BaseModel):
     profile_tasks: str
 
 @router.post("/create")
-async def create_resume(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
-    s3_key = None
+async def create_resume(file: UploadFile = File(...), background: bool = Query(False), current_user: dict = Depends(get_current_user)):
     try:
         if file.content_type != "application/pdf":
             logger.error(reason="Invalid file type. Only PDF files are allowed.")
             raise HTTPException(status_code=400, detail="Invalid file type. Only PDF files are allowed.")
               
-        file_bytes = await file.read()
-        file_extension = file.filename.split(".")[-1].lower()
-        s3_key = f"resumes/{current_user['id']}/{current_user['id']}.{file_extension}"
-
-        response = s3_client.put_object(
-            Bucket=BUCKET_NAME,
-            Key=s3_key,
-            Body=file_bytes,
-            ContentType="application/pdf"
-        )
-        pdf_reader = PdfReader(BytesIO(file_bytes))
-        resume_text = ""
-
-        for page in pdf_reader.pages:
-            resume_text += page.extract_text() or ""
-
-        profile_skills_response = await profile_skills_generator_agent.ainvoke({
-            "messages": f"Extract keywords from the resume: \n{resume_text}"
-        })
-        profile_tasks_response = await profile_task_generator_agent.ainvoke({
-            "messages": f"Generate task based on the resume: \n{resume_text}"
-        })
-
-        sparse_response = profile_skills_response["messages"][-1].content
-        semantic_response = profile_tasks_response["messages"][-1].content
-        embedding = embeddings_model.embed_query(semantic_response)
-
-        create_response = supabase.table("resumes").upsert({
-            "user_id": current_user["id"],
-            "s3_key": s3_key,
-            "profile_skills": sparse_response,
-            "profile_tasks": semantic_response,
-            "embedding": embedding},
-            on_conflict="user_id"
-            ).execute()
-        
-        if not create_response.data:
-            logger.error(reason="Failed to save resume snippet in database")
-            raise Exception("Failed to save resume snippet")
-
+        # The multipart parser has already spooled the upload; reject oversized files before reading it
+        check_pdf_size(file.size or 0)
+
+        if background:
+            try:
+                job_id = await resume_job_queue.submit(current_user["id"], file.filename, await file.read())
+            except QueueFullError:
+                logger.warning(reason="Resume ingestion queue is full")
+                raise HTTPException(status_code=429, detail="Resume ingestion queue is full, retry later",
+                                    headers={"Retry-After": "30"})
+            return JSONResponse(status_code=202, content={"message": "Resume queued for processing", "job_id": job_id})
+
+        uploaded_data = await ingest_resume(current_user["id"], file.filename, file.file)
         return {"message": "Resume snippet uploaded successfully", 
-                "uploaded_data": {
-                    "s3_key": s3_key,
-                    "profile_skills": sparse_response,
-                    "profile_tasks": semantic_response}}
+                "uploaded_data": uploaded_data}
+    except HTTPException:
+        raise
+    except PdfTooLargeError as e:
+        logger.error(reason="PDF exceeds the size or page limit", error=str(e))
+        raise HTTPException(status_code=413, detail=str(e))
+    except PdfExtractionTimeoutError as e:
+        logger.error(reason="PDF text extraction timed out", error=str(e))
+        raise HTTPException(status_code=422, detail=str(e))
+    except PdfExtractionCrashedError as e:
+        logger.error(reason="PDF text extraction worker crashed", error=str(e))
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(error=str(e), exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/jobs/{job_id}")
+async def get_resume_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    try:
+        job = await resume_job_queue.get(job_id)
+
+        if not job or (job["user_id"] != current_user["id"] and not current_user["is_admin"]):
+            logger.error(reason="Resume job not found")
+            raise HTTPException(status_code=404, detail="Resume job not found")
+
+        return job
     except HTTPException:
         raise
     except Exception as e:
@@ -84,15 +92,20 @@ async def create_resume(file: UploadFile = File(...), current_user: dict = Depen
     
 
 @router.get("/me", response_model=ResumeResponse)
-async def get_resume(current_user: dict = Depends(get_current_user)):
+async def get_resume(request: Request, current_user: dict = Depends(get_current_user)):
     try:
-        response = supabase.table("resumes").select("*").eq("user_id", current_user["id"]).execute()
+        cached = not_modified(request, resume_versions, current_user["id"])
+        if cached is not None:
+            return cached
+
+        response = await get_repository().resumes.get_by_user(current_user["id"])
 
-        if not response.data:
+        if not response:
             logger.error(reason="Resume not found for user")
             raise HTTPException(status_code=404, detail="Resume not found")
 
-        return response.data[0]
+        return conditional_response(request, ResumeResponse.model_validate(response).model_dump(),
+                                    resume_versions, current_user["id"])
     except HTTPException:
         raise
     except Exception as e:
@@ -103,22 +116,26 @@ async def get_resume(current_user: dict = Depends(get_current_user)):
 @router.delete("/delete")
 async def delete_resume(current_user: dict = Depends(get_current_user)):
     try:
-        existing = supabase.table("resumes").select("*").eq("user_id", current_user["id"]).execute()
+        existing = await get_repository().resumes.get_by_user(current_user["id"])
 
-        if not existing.data:
+        if not existing:
             logger.error(reason="Resume not found for user")
             raise HTTPException(status_code=404, detail="Resume not found")
 
-        s3_key = existing.data[0]["s3_key"]
+        s3_key = existing["s3_key"]
 
         if s3_key:
-            s3_client.delete_object(Bucket=BUCKET_NAME, Key=s3_key)
+            await run_in_threadpool(s3_client.delete_object, Bucket=BUCKET_NAME, Key=s3_key)
 
-        delete_response = supabase.table("resumes").delete().eq("user_id", current_user["id"]).execute()
+        delete_response = await get_repository().resumes.delete_by_user(current_user["id"])
 
-        if not delete_response.data:
+        if not delete_response:
             logger.error(reason="Failed to delete resume record")
             raise Exception("Failed to delete resume record")
+        vector_index.remove(current_user["id"])
+        keyword_index.remove(current_user["id"])
+        staffing_suggestions.invalidate()
+        resume_versions.invalidate(current_user["id"])
 
         return {"message": "Resume deleted successfully"}
     except HTTPException:
@@ -128,15 +145,35 @@ async def delete_resume(current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail=str(e))
     
 @router.get("/list")
-def list_resumes(current_user: dict = Depends(get_current_user)):
+async def list_resumes(response: Response, limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+                 cursor: Optional[str] = None, fields: Optional[str] = None, stream: bool = False,
+                 current_user: dict = Depends(get_current_user)):
+    """
+    One page of resumes, oldest first. Pass the X-Next-Cursor response header back as
+    `cursor` for the next page. `fields` selects a comma separated subset of RESUME_FIELDS;
+    id and created_at are always returned. `stream=true` writes every resume from
+    `cursor` on as NDJSON, fetching `limit` rows at a time.
+    """
     try:
         if not current_user["is_admin"]:
             logger.error(reason="User doesn't have Admin privilege")
             raise HTTPException(status_code=403, detail="Not authorized. Only admins can view all resumes.")
-        res = supabase.table("resumes").select("id, user_id, s3_key, profile_skills, profile_tasks, users(username)").execute()
-        return res.data
+
+        columns = parse_fields(fields, RESUME_FIELDS)
+        fetch = partial(get_repository().resumes.list_page, columns)
+        after = decode_cursor(cursor)
+        if stream:
+            return StreamingResponse(stream_ndjson(fetch, after, limit), media_type="application/x-ndjson")
+
+        rows, next_cursor = await fetch_page(fetch, after, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return rows
     except HTTPException:
         raise
+    except ListQueryError as e:
+        logger.error(reason="Invalid list parameters", error=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -2,18 +2,26 @@ import json
 import os
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
-from app.services.supabase_client import supabase
 from app.auth.dependencies import get_current_user
 from langchain_core.messages import HumanMessage
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 from langchain_core.rate_limiters import InMemoryRateLimiter
-from app.services.ai_services import description_generator_agent, query_generator_agent
-from app.services.retrieval import multi_query_hybrid_search
+from app.services.ai_services import description_generator_agent, embeddings_model
+from app.services.staffing import staffing_suggestions
+from app.services.response_cache import SemanticResponseCache
 from app.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Generated descriptions keyed by normalized title, with an embedding similarity fallback
+description_cache = SemanticResponseCache(
+    "suggest_description",
+    maxsize=int(os.getenv("SUGGEST_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("SUGGEST_CACHE_TTL_SECONDS", "86400")),
+    similarity_threshold=float(os.getenv("SUGGEST_CACHE_SIMILARITY_THRESHOLD", "0.92")),
+)
+
 rate_limiter = InMemoryRateLimiter(
     requests_per_second=0.5,
     max_bucket_size=5,
@@ -25,6 +33,15 @@ router = APIRouter(prefix="/ai", tags=["suggest"])
 
 class SuggestRequest(BaseModel):
     title: str
+    use_cache: bool = True
+
+
+async def embed_title(title: str):
+    try:
+        return await embeddings_model.aembed_query(title, task_type="SEMANTIC_SIMILARITY")
+    except Exception as e:
+        logger.warning(reason="Failed to embed title for the suggestion cache", error=str(e))
+        return None
 
 class SuggestProfileRequest(BaseModel):
     title: str
@@ -46,9 +63,23 @@ async def suggest_description(task: SuggestRequest, current_user: dict = Depends
         
         
 
+        title_embedding = None
+        if task.use_cache:
+            cached_description = description_cache.get_exact(task.title)
+            if cached_description is None:
+                title_embedding = await embed_title(task.title)
+                if title_embedding is not None:
+                    cached_description = description_cache.get_similar(title_embedding)
+            if cached_description is not None:
+                logger.info("Serving cached task description", title=task.title)
+                return cached_description
+
         message = HumanMessage(content=f"Task title: {task.title}")
         response = await description_generator_agent.ainvoke({"messages": message})
-        return json.loads(response["messages"][-1].content)["description"]
+        description = json.loads(response["messages"][-1].content)["description"]
+        if task.use_cache:
+            description_cache.set(task.title, description, embedding=title_embedding)
+        return description
     except HTTPException:
         raise
     except Exception as e:
@@ -63,37 +94,33 @@ async def suggest_profile(task: SuggestProfileRequest, current_user: dict = Depe
     try:
         if json.loads(os.getenv("USE_LLM_STUB", "false").lower()):
             logger.info("Using LLM stub for suggest_profile")
+            # Same shape as the hybrid search records
             return [
                 {"id": "18bfb1c2-5c9a-328a-9b3a-8f1e769df1e6",
-                "username": "user1"},
+                "username": "user1",
+                "resume_id": "7c0e2a51-3f7d-4b8e-a1d2-5e6f7a8b9c01",
+                "score": 0.0328,
+                "matches": [{"search_type": "keyword", "query": task.title, "rank": 1,
+                             "snippet": "skills: Python, FastAPI"}]},
                 {"id": "434356d4-9c3a-4c8e-9b3a-8f1e769df1e6",
-                "username": "user2"}
+                "username": "user2",
+                "resume_id": "9d1f3b62-4a8e-4c9f-b2e3-6f7a8b9c0d12",
+                "score": 0.0161,
+                "matches": [{"search_type": "vector", "query": task.title, "rank": 2,
+                             "snippet": "- Build REST APIs"}]}
                 ]
         if not current_user["is_admin"]:
             logger.error(reason="User doesn't have Admin privilege")
             raise HTTPException(status_code=403, detail="Admin privileges required to generate task description")
         
-        messages = [
-            HumanMessage(content=f"Generate search query variations for the following: \ntask title: {task.title}\nAnd task description: {task.description}"),
-        ]
-        query_generator_response = await query_generator_agent.ainvoke({"messages": messages})
-        query_generator_response = json.loads(query_generator_response["messages"][-1].content)
-
-        # Do hybrid search for the given task
-        finalized_profiles = multi_query_hybrid_search(keyword_search_queries=query_generator_response["keyword_search_queries"],
-                                                       vector_search_queries=query_generator_response["task_search_queries"],
-                                                       num_profiles=3)
-        finalized_user_ids = [profile['user_id'] for profile in finalized_profiles]
-
-        supabase_response = supabase.rpc(
-            "get_users_by_ids_ordered",
-            {"input_ids": finalized_user_ids}
-        ).execute()
-
-        if not supabase_response.data:
+        # Served from the precomputed suggestions when fresh, otherwise query variations + hybrid search.
+        # Records carry the user id, username, fused score and why each profile matched
+        matched_users = await staffing_suggestions.get_or_compute(task.title, task.description)
+
+        if not matched_users:
             logger.warning(reason="No profile matches found")
 
-        return supabase_response.data or []
+        return matched_users
     except HTTPException:
         raise
     except Exception as e:
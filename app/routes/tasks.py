@@ -1,8 +1,19 @@
-from typing import Optional
+import asyncio
+import os
+from functools import partial
+from typing import List, Optional
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from app.services.pagination import (LIST_MAX_PAGE_SIZE, LIST_PAGE_SIZE, ListQueryError, decode_cursor, fetch_page,
+                                     parse_fields, parse_sort, stream_ndjson)
 from pydantic import BaseModel, EmailStr
-from app.services.supabase_client import supabase
+from app.services.repository import TaskFilters, get_repository
+from app.services.etags import conditional_response, my_tasks_versions, not_modified, task_versions
+from app.services.query_variations import precompute_query_variations
+from app.services.staffing import staffing_suggestions
+from app.services.task_import import TaskImportError, import_tasks
 from app.auth.dependencies import get_current_user
 from datetime import datetime, timezone
 from enum import Enum
@@ -18,41 +29,112 @@ class TaskStatus(str, Enum):
     in_process = "in_process"
     completed = "completed"
 
+TASK_FIELDS = ("id", "title", "description", "status", "total_minutes", "user_id", "created_at", "updated_at")
+TASK_SORT_FIELDS = ("created_at", "updated_at")
+TASK_BULK_MAX_ITEMS = int(os.getenv("TASK_BULK_MAX_ITEMS", "500"))
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Query parameters without an offset are taken as UTC
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def task_filters(status: Optional[TaskStatus] = None,
+                 created_after: Optional[datetime] = None, created_before: Optional[datetime] = None,
+                 updated_after: Optional[datetime] = None, updated_before: Optional[datetime] = None) -> TaskFilters:
+    """Task filter query parameters; `*_after` is inclusive and `*_before` exclusive."""
+    return TaskFilters(status=status.value if status else None,
+                       created_after=_utc(created_after), created_before=_utc(created_before),
+                       updated_after=_utc(updated_after), updated_before=_utc(updated_before))
+
+
 class TaskCreateRequest(BaseModel):
     title: str
     description: str
     total_minutes: float
-    user_id: str
+    user_id: UUID
 
 class TaskUpdateRequest(BaseModel):
     title: Optional[str] = None
     description: Optional[str] = None
     total_minutes: Optional[float] = None
-    user_id: Optional[str] = None
+    user_id: Optional[UUID] = None
     status: Optional[TaskStatus] = None
 
+class TaskBulkUpdateRequest(TaskUpdateRequest):
+    id: UUID
+
+
+
+def task_changes(task: TaskUpdateRequest, current_user: dict) -> dict:
+    """Columns an update writes: admins may change any field, assignees only the status and time spent."""
+    update_data = {"updated_at": datetime.now(timezone.utc).isoformat()}
+    if not current_user["is_admin"]:
+        if task.total_minutes:
+            update_data["total_minutes"] = task.total_minutes
+        if task.status:
+            update_data["status"] = task.status
+    else:
+        if task.title:
+            update_data["title"] = task.title
+        if task.description:
+            update_data["description"] = task.description
+        if task.total_minutes:
+            update_data["total_minutes"] = task.total_minutes
+        if task.user_id:
+            update_data["user_id"] = str(task.user_id)
+        if task.status:
+            update_data["status"] = task.status
+    return update_data
+
+
+def task_created(res: dict) -> None:
+    my_tasks_versions.invalidate(res["user_id"])
+    # Warm the query variations and staffing suggestions /ai/suggest_profile will need for this task
+    precompute_query_variations(res["title"], res["description"])
+    staffing_suggestions.schedule(res["id"], res["title"], res["description"])
+
+
+def task_updated(res: dict, update_data: dict, precompute: bool = True) -> None:
+    task_versions.invalidate(res["id"])
+    if "user_id" in update_data:
+        # The previous assignee's list changed too, and only the new one is known here
+        my_tasks_versions.clear()
+    else:
+        my_tasks_versions.invalidate(res["user_id"])
+    if precompute and ("title" in update_data or "description" in update_data):
+        precompute_query_variations(res["title"], res["description"])
+        staffing_suggestions.schedule(res["id"], res["title"], res["description"])
+
+
+def task_deleted(res: dict) -> None:
+    task_versions.invalidate(res["id"])
+    my_tasks_versions.invalidate(res["user_id"])
 
 
 @router.post("/create")
-def create_task(task: TaskCreateRequest, current_user: dict = Depends(get_current_user)):
+async def create_task(task: TaskCreateRequest, current_user: dict = Depends(get_current_user)):
     try:
         if not current_user["is_admin"]:
             logger.error(reason="User doesn't have Admin privilege")
             raise HTTPException(status_code=403, detail="Not authorized. Only admins can create tasks.")
         
-        res = supabase.table("tasks").insert({
+        res = await get_repository().tasks.create({
             "title": task.title,
             "description": task.description,
             "total_minutes": task.total_minutes,
-            "user_id": task.user_id,
+            "user_id": str(task.user_id),
             "status": TaskStatus.created,
-        }).execute()
+        })
 
-        if not res.data:
+        if not res:
             logger.error(reason="Could not create task in database")
             raise HTTPException(status_code=500, detail="Task creation failed")
 
-        return res.data[0]
+        task_created(res)
+        return res
     except HTTPException:
         raise
     except Exception as e:
@@ -61,18 +143,24 @@ def create_task(task: TaskCreateRequest, current_user: dict = Depends(get_curren
 
 
 @router.get("/get/{task_id}")
-def get_task(task_id: str, current_user: dict = Depends(get_current_user)):
+async def get_task(task_id: str, request: Request, current_user: dict = Depends(get_current_user)):
     try:
+        # Admins see every task, anyone else only their own, so the ETag is remembered per viewer
+        viewer = "admin" if current_user["is_admin"] else current_user["id"]
+        cached = not_modified(request, task_versions, task_id, viewer)
+        if cached is not None:
+            return cached
+
         if not current_user["is_admin"]:
-            res = supabase.table("tasks").select("*").eq("id", task_id).eq("user_id", current_user["id"]).execute()
+            res = await get_repository().tasks.get(task_id, user_id=current_user["id"])
         else:
-            res = supabase.table("tasks").select("*").eq("id", task_id).execute()
+            res = await get_repository().tasks.get(task_id)
 
-        if not res.data:
+        if not res:
             logger.error(reason="Task not found")
             raise HTTPException(status_code=404, detail="Task not found")
 
-        return res.data[0]
+        return conditional_response(request, res, task_versions, task_id, viewer)
     except HTTPException:
         raise
     except Exception as e:
@@ -81,44 +169,38 @@ def get_task(task_id: str, current_user: dict = Depends(get_current_user)):
     
 
 @router.get("/my_tasks")
-def get_my_tasks(current_user: dict = Depends(get_current_user)):
+async def get_my_tasks(request: Request, filters: TaskFilters = Depends(task_filters), sort: str = "created_at",
+                       current_user: dict = Depends(get_current_user)):
+    """Tasks assigned to the current user, filtered and ordered by `sort` ("-" prefix for descending)."""
     try:
-        res = supabase.table("tasks").select("*").eq("user_id", current_user["id"]).execute()
-        return res.data
+        cached = not_modified(request, my_tasks_versions, current_user["id"], request.url.query)
+        if cached is not None:
+            return cached
+
+        sort = parse_sort(sort, TASK_SORT_FIELDS)
+        tasks = await get_repository().tasks.list(user_id=current_user["id"], filters=filters, sort=sort)
+        return conditional_response(request, tasks, my_tasks_versions, current_user["id"], request.url.query)
     except HTTPException:
         raise
+    except ListQueryError as e:
+        logger.error(reason="Invalid list parameters", error=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/update/{task_id}")
-def update_task(task_id: str, task: TaskUpdateRequest, current_user: dict = Depends(get_current_user)):
+async def update_task(task_id: str, task: TaskUpdateRequest, current_user: dict = Depends(get_current_user)):
     try:
-        update_data = {"updated_at": datetime.now(timezone.utc).isoformat()}
-        if not current_user["is_admin"]:
-            if task.total_minutes:
-                update_data["total_minutes"] = task.total_minutes
-            if task.status:
-                update_data["status"] = task.status
-        else:
-            if task.title:
-                update_data["title"] = task.title
-            if task.description:
-                update_data["description"] = task.description
-            if task.total_minutes:
-                update_data["total_minutes"] = task.total_minutes
-            if task.user_id:
-                update_data["user_id"] = task.user_id
-            if task.status:
-                update_data["status"] = task.status
-
-        res = supabase.table("tasks").update(update_data).eq("id", task_id).execute()
-
-        if not res.data:
+        update_data = task_changes(task, current_user)
+        res = await get_repository().tasks.update(task_id, update_data)
+
+        if not res:
             logger.error(reason="Could not update task in database")
             raise HTTPException(status_code=500, detail="Task update failed")
 
-        return res.data[0]
+        task_updated(res, update_data)
+        return res
     except HTTPException:
         raise
     except Exception as e:
@@ -126,37 +208,249 @@ def update_task(task_id: str, task: TaskUpdateRequest, current_user: dict = Depe
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/delete/{task_id}")
-def delete_task(task_id: str, current_user: dict = Depends(get_current_user)):
+async def delete_task(task_id: str, current_user: dict = Depends(get_current_user)):
     try:
         if not current_user["is_admin"]:
             logger.error(reason="User doesn't have Admin privilege")
             raise HTTPException(status_code=403, detail="Not authorized. Only admins can delete tasks.")
         
-        res = supabase.table("tasks").delete().eq("id", task_id).execute()
+        res = await get_repository().tasks.delete(task_id)
 
-        if not res.data:
+        if not res:
             logger.error(reason="Could not delete task in database")
             raise HTTPException(status_code=500, detail="Task deletion failed")
 
+        task_deleted(res)
         return {"detail": "Task deleted successfully"}
     except HTTPException:
         raise
     except Exception as e:
         logger.error(error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
-    
+
+
+async def _existing_user_ids(user_ids: List[str]) -> set:
+    """The ids among `user_ids` that belong to a user, looked up in one query."""
+    user_ids = [user_id for user_id in dict.fromkeys(user_ids) if user_id is not None]
+    if not user_ids:
+        return set()
+    return {user["id"] for user in await get_repository().users.get_usernames_ordered(user_ids)}
+
+
+def _item_result(index: int, task_id: Optional[str], task: Optional[dict] = None, detail: Optional[str] = None) -> dict:
+    result = {"index": index, "id": task_id, "ok": detail is None}
+    if task is not None:
+        result["task"] = task
+    if detail is not None:
+        result["detail"] = detail
+    return result
+
+
+@router.post("/bulk_create")
+async def bulk_create_tasks(tasks: List[TaskCreateRequest] = Body(min_length=1, max_length=TASK_BULK_MAX_ITEMS),
+                            current_user: dict = Depends(get_current_user)):
+    """
+    Create the tasks in one insert; the results are in request order. Items assigned to
+    an unknown user are reported per item and not inserted.
+    """
+    try:
+        if not current_user["is_admin"]:
+            logger.error(reason="User doesn't have Admin privilege")
+            raise HTTPException(status_code=403, detail="Not authorized. Only admins can create tasks.")
+
+        users = await _existing_user_ids([str(task.user_id) for task in tasks])
+        results = [None] * len(tasks)
+        valid = []
+        for index, task in enumerate(tasks):
+            if str(task.user_id) not in users:
+                results[index] = _item_result(index, None, detail="User not found")
+            else:
+                valid.append(index)
+
+        rows = []
+        if valid:
+            rows = await get_repository().tasks.create_many([{
+                "title": tasks[index].title,
+                "description": tasks[index].description,
+                "total_minutes": tasks[index].total_minutes,
+                "user_id": str(tasks[index].user_id),
+                "status": TaskStatus.created,
+            } for index in valid])
+
+            if len(rows) != len(valid):
+                logger.error(reason="Could not create tasks in database", requested=len(valid), created=len(rows))
+                raise HTTPException(status_code=500, detail="Task creation failed")
+            for index, res in zip(valid, rows):
+                results[index] = _item_result(index, res["id"], task=res)
+
+        # Like /import, bulk writes skip the precompute hooks: hundreds of LLM calls would
+        # compete with interactive /ai/suggest_profile traffic for the same rate limit
+        for user_id in {res["user_id"] for res in rows}:
+            my_tasks_versions.invalidate(user_id)
+        logger.info("tasks_bulk_created", requested=len(tasks), created=len(rows))
+        return results
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(error=str(e), exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/bulk_update")
+async def bulk_update_tasks(tasks: List[TaskBulkUpdateRequest] = Body(min_length=1, max_length=TASK_BULK_MAX_ITEMS),
+                            current_user: dict = Depends(get_current_user)):
+    """
+    Apply each update with the same rules as /update/{task_id}. Only the changed columns
+    are written: items with the same changes share one `in_` update, and the groups run
+    concurrently. Unknown ids, tasks of other users (for non admins) and repeated ids are
+    reported per item and not written, as are reassignments to an unknown user.
+    """
+    try:
+        repository = get_repository()
+        now = datetime.now(timezone.utc).isoformat()
+        changes = [{**task_changes(task, current_user), "updated_at": now} for task in tasks]
+        users = await _existing_user_ids([update_data.get("user_id") for update_data in changes])
+        results = [None] * len(tasks)
+        indexes = {}
+        groups = {}
+        for index, (task, update_data) in enumerate(zip(tasks, changes)):
+            task_id = str(task.id)
+            if task_id in indexes:
+                results[index] = _item_result(index, task_id, detail="Task is listed more than once")
+                continue
+            if "user_id" in update_data and update_data["user_id"] not in users:
+                results[index] = _item_result(index, task_id, detail="User not found")
+                continue
+            indexes[task_id] = index
+            groups.setdefault(tuple(sorted(update_data.items())), []).append(task_id)
+
+        # Ownership is part of the write, so a task reassigned meanwhile is not updated by its old assignee
+        owner = None if current_user["is_admin"] else current_user["id"]
+        updated = await asyncio.gather(*[repository.tasks.update_many(task_ids, dict(update_data), user_id=owner)
+                                         for update_data, task_ids in groups.items()])
+        for update_data, rows in zip(groups, updated):
+            for res in rows:
+                task_updated(res, dict(update_data), precompute=False)
+                index = indexes[res["id"]]
+                results[index] = _item_result(index, res["id"], task=res)
+
+        for task_id, index in indexes.items():
+            if results[index] is None:
+                results[index] = _item_result(index, task_id, detail="Task not found")
+
+        logger.info("tasks_bulk_updated", requested=len(tasks), updated=sum(len(rows) for rows in updated))
+        return results
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(error=str(e), exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/bulk_delete")
+async def bulk_delete_tasks(task_ids: List[UUID] = Body(min_length=1, max_length=TASK_BULK_MAX_ITEMS),
+                            current_user: dict = Depends(get_current_user)):
+    """Delete all tasks in one statement. POST rather than DELETE, since the ids are sent as a JSON body."""
+    try:
+        task_ids = [str(task_id) for task_id in task_ids]
+        if not current_user["is_admin"]:
+            logger.error(reason="User doesn't have Admin privilege")
+            raise HTTPException(status_code=403, detail="Not authorized. Only admins can delete tasks.")
+
+        unique_ids = list(dict.fromkeys(task_ids))
+        deleted = {res["id"]: res for res in await get_repository().tasks.delete_many(unique_ids)}
+        for res in deleted.values():
+            task_deleted(res)
+
+        logger.info("tasks_bulk_deleted", requested=len(task_ids), deleted=len(deleted))
+        results = []
+        seen = set()
+        for index, task_id in enumerate(task_ids):
+            if task_id in seen:
+                results.append(_item_result(index, task_id, detail="Task is listed more than once"))
+            elif task_id in deleted:
+                results.append(_item_result(index, task_id))
+            else:
+                results.append(_item_result(index, task_id, detail="Task not found"))
+            seen.add(task_id)
+        return results
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(error=str(e), exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/import")
+async def import_tasks_csv(file: UploadFile = File(...), user_id: Optional[UUID] = Query(None),
+                           current_user: dict = Depends(get_current_user)):
+    """
+    Create a task for every row of a sprint estimation CSV (Story, Task, Estimate Min (hr),
+    Estimate Max (hr), Actual, Comment), optionally all assigned to `user_id`. Rejected
+    rows are reported by line and don't stop the import.
+    """
+    try:
+        if not current_user["is_admin"]:
+            logger.error(reason="User doesn't have Admin privilege")
+            raise HTTPException(status_code=403, detail="Not authorized. Only admins can import tasks.")
+
+        assignee = str(user_id) if user_id is not None else None
+        if assignee is not None and not await get_repository().users.get_by_id(assignee):
+            logger.error(reason="Assignee not found", user_id=assignee)
+            raise HTTPException(status_code=404, detail="User not found")
+
+        report = await import_tasks(file.file, get_repository().tasks.create_many, user_id=assignee)
+
+        # Imported tasks skip the per-task precompute hooks, a large import would flood them
+        if assignee is not None:
+            my_tasks_versions.invalidate(assignee)
+        return report
+    except HTTPException:
+        raise
+    except TaskImportError as e:
+        logger.error(reason="Invalid task import file", error=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(error=str(e), exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 
 @router.get("/list")
-def list_tasks(current_user: dict = Depends(get_current_user)):
+async def list_tasks(response: Response, limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+                 cursor: Optional[str] = None, fields: Optional[str] = None, stream: bool = False,
+                 filters: TaskFilters = Depends(task_filters), assignee: Optional[UUID] = None,
+                 sort: str = "created_at", current_user: dict = Depends(get_current_user)):
+    """
+    One page of tasks, ordered by `sort` (created_at or updated_at, "-" prefix for
+    descending). Pass the X-Next-Cursor response header back as `cursor` for the next
+    page of the same query. `fields` selects a comma separated subset of TASK_FIELDS;
+    id, created_at and the sort column are always returned. `stream=true` writes every
+    matching task from `cursor` on as NDJSON, fetching `limit` rows at a time.
+    `assignee` restricts the list to one user's tasks.
+    """
     try:
         if not current_user["is_admin"]:
             logger.error(reason="User doesn't have Admin privilege")
             raise HTTPException(status_code=403, detail="Not authorized. Only admins can view all tasks.")
-        
-        res = supabase.table("tasks").select("*").execute()
-        return res.data
+
+        sort = parse_sort(sort, TASK_SORT_FIELDS)
+        columns = parse_fields(fields, TASK_FIELDS, sort)
+        if assignee is not None:
+            filters.user_id = str(assignee)
+        fetch = partial(get_repository().tasks.list_page, columns, filters=filters, sort=sort)
+        after = decode_cursor(cursor, sort)
+        if stream:
+            return StreamingResponse(stream_ndjson(fetch, after, limit, sort), media_type="application/x-ndjson")
+
+        rows, next_cursor = await fetch_page(fetch, after, limit, sort)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return rows
     except HTTPException:
         raise
+    except ListQueryError as e:
+        logger.error(reason="Invalid list parameters", error=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
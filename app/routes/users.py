@@ -1,9 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from functools import partial
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from app.services.pagination import (LIST_MAX_PAGE_SIZE, LIST_PAGE_SIZE, ListQueryError, decode_cursor, fetch_page,
+                                     parse_fields, stream_ndjson)
 from pydantic import BaseModel, EmailStr
-from app.services.supabase_client import supabase
+from app.services.repository import get_repository
+from app.services.usernames import username_cache
+from app.services.etags import conditional_response, my_tasks_versions, not_modified, task_versions, user_versions
+from app.services.keyword_index import keyword_index
+from app.services.staffing import staffing_suggestions
+from app.services.vector_index import vector_index
 from app.auth.jwt_handler import hash_password, verify_password, create_access_token
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_current_user, invalidate_principal
 from datetime import datetime, timezone
 from typing import List, Optional
 from app.logging_config import get_logger
@@ -30,6 +40,10 @@ class UpdateUserRequest(BaseModel):
     is_admin: Optional[bool] = None
 
 
+# Columns /users/list may return; the password hash is never selectable
+USER_FIELDS = ("id", "username", "email", "is_admin", "created_at", "updated_at")
+
+
 class UserResponse(BaseModel):
     id: str
     email: EmailStr
@@ -38,26 +52,26 @@ class UserResponse(BaseModel):
 
 
 @router.post("/create")
-def create_user(data: SignUpRequest):
+async def create_user(data: SignUpRequest):
     try:
-        existing = supabase.table("users").select("*").eq("username", data.username).execute()
-        if existing.data:
+        existing = await get_repository().users.get_by_username(data.username)
+        if existing:
             logger.error(reason="Username already registered")
             raise HTTPException(status_code=409, detail="Username already registered")
 
-        hashed_password = hash_password(data.password)
+        hashed_password = await run_in_threadpool(hash_password, data.password)
 
-        res = supabase.table("users").insert({
+        user = await get_repository().users.create({
             "email": data.email,
             "username": data.username,
             "password": hashed_password,
             "is_admin": False
-        }).execute()
+        })
 
-        if not res.data:
+        if not user:
             raise HTTPException(status_code=500, detail="Signup failed")
 
-        user = res.data[0]
+        username_cache.set(user["id"], user["username"])
         access_token = create_access_token(user["id"])
 
         return {
@@ -72,17 +86,15 @@ def create_user(data: SignUpRequest):
 
 
 @router.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends()):
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     try:
-        res = supabase.table("users").select("*").eq("username", form_data.username).execute()
+        user = await get_repository().users.get_by_username(form_data.username)
 
-        if not res.data:
+        if not user:
             logger.error(reason="User not found")
             raise HTTPException(status_code=404, detail="User not found")
 
-        user = res.data[0]
-
-        if not verify_password(form_data.password, user["password"]):
+        if not await run_in_threadpool(verify_password, form_data.password, user["password"]):
             logger.error(reason="Invalid password")
             raise HTTPException(status_code=401, detail="Invalid password")
 
@@ -100,15 +112,19 @@ def login(form_data: OAuth2PasswordRequestForm = Depends()):
 
 
 @router.get("/me", response_model=UserResponse)
-def get_me(current_user: dict = Depends(get_current_user)):
+async def get_me(request: Request, current_user: dict = Depends(get_current_user)):
     try:
-        return current_user
+        cached = not_modified(request, user_versions, current_user["id"])
+        if cached is not None:
+            return cached
+        return conditional_response(request, UserResponse.model_validate(current_user).model_dump(),
+                                    user_versions, current_user["id"])
     except Exception as e:
         logger.error(error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.put("/update/{user_id}")
-def update_user(user_id: str, data: UpdateUserRequest, current_user: dict = Depends(get_current_user)):
+async def update_user(user_id: str, data: UpdateUserRequest, current_user: dict = Depends(get_current_user)):
     try:
         if current_user["id"] != user_id and not current_user["is_admin"]:
             logger.error(reason="User doesn't have permission to update other users")
@@ -120,7 +136,7 @@ def update_user(user_id: str, data: UpdateUserRequest, current_user: dict = Depe
             update_data["email"] = data.email
 
         if data.password:
-            update_data["password"] = hash_password(data.password)
+            update_data["password"] = await run_in_threadpool(hash_password, data.password)
 
         if current_user["is_admin"]:
             update_data["is_admin"] = data.is_admin
@@ -133,12 +149,16 @@ def update_user(user_id: str, data: UpdateUserRequest, current_user: dict = Depe
 
         update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
 
-        res = supabase.table("users").update(update_data).eq("id", user_id).execute()
+        res = await get_repository().users.update(user_id, update_data)
 
-        if not res.data:
+        if not res:
             logger.error(reason="Could not update user in database")
             raise HTTPException(status_code=500, detail="User Update failed")
 
+        invalidate_principal(user_id)
+        user_versions.invalidate(user_id)
+        username_cache.set(user_id, res["username"])
+
         return {"message": "User updated successfully"}
     except HTTPException:
         raise
@@ -148,7 +168,7 @@ def update_user(user_id: str, data: UpdateUserRequest, current_user: dict = Depe
 
 
 @router.delete("/delete/{user_id}")
-def delete_user(user_id: str, current_user: dict = Depends(get_current_user)):
+async def delete_user(user_id: str, current_user: dict = Depends(get_current_user)):
     try:
         if not current_user["is_admin"]:
             logger.error(reason="User doesn't have Admin privilege")
@@ -158,12 +178,23 @@ def delete_user(user_id: str, current_user: dict = Depends(get_current_user)):
             logger.error(reason="User attempted to delete their own account")
             raise HTTPException(status_code=400, detail="Cannot delete own account")
 
-        res = supabase.table("users").delete().eq("id", user_id).execute()
+        res = await get_repository().users.delete(user_id)
 
-        if not res.data:
+        if not res:
             logger.error(reason="Could not delete user in database")
             raise HTTPException(status_code=500, detail="User Delete failed")
 
+        invalidate_principal(user_id)
+        username_cache.invalidate(user_id)
+        user_versions.invalidate(user_id)
+        my_tasks_versions.invalidate(user_id)
+        # Their tasks are unassigned by the foreign key
+        task_versions.clear()
+        # The resume went with the user (ON DELETE CASCADE)
+        vector_index.remove(user_id)
+        keyword_index.remove(user_id)
+        staffing_suggestions.invalidate()
+
         return {"message": "User deleted successfully"}
     except HTTPException:
         raise
@@ -172,17 +203,36 @@ def delete_user(user_id: str, current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail=str(e))
     
 
-@router.get("/list", response_model=List[UserResponse])
-def list_users(current_user: dict = Depends(get_current_user)):
+@router.get("/list")
+async def list_users(response: Response, limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+                 cursor: Optional[str] = None, fields: Optional[str] = None, stream: bool = False,
+                 current_user: dict = Depends(get_current_user)):
+    """
+    One page of users, oldest first. Pass the X-Next-Cursor response header back as
+    `cursor` for the next page. `fields` selects a comma separated subset of USER_FIELDS;
+    id and created_at are always returned. `stream=true` writes every user from
+    `cursor` on as NDJSON, fetching `limit` rows at a time.
+    """
     try:
         if not current_user["is_admin"]:
             logger.error(reason="User doesn't have Admin privilege")
             raise HTTPException(status_code=403, detail="Not authorized. Only admins can view all users.")
-        
-        res = supabase.table("users").select("*").execute()
-        return res.data
+
+        columns = parse_fields(fields, USER_FIELDS)
+        fetch = partial(get_repository().users.list_page, columns)
+        after = decode_cursor(cursor)
+        if stream:
+            return StreamingResponse(stream_ndjson(fetch, after, limit), media_type="application/x-ndjson")
+
+        rows, next_cursor = await fetch_page(fetch, after, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return rows
     except HTTPException:
         raise
+    except ListQueryError as e:
+        logger.error(reason="Invalid list parameters", error=str(e))
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(error=str(e), exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -3,11 +3,12 @@ from langchain_google_genai import ChatGoogleGenerativeAI, GoogleGenerativeAIEmb
 from dotenv import load_dotenv
 from langchain_core.rate_limiters import InMemoryRateLimiter
 from langchain_groq import ChatGroq
+from app.services.embedding_cache import CachedEmbeddings, EmbeddingStore
 from app.services.prompts import task_description_system_prompt, resume_sparse_prompt, resume_semantic_prompt, query_generator_system_prompt
 from langchain.agents import create_agent
 from langchain.agents.middleware import ModelCallLimitMiddleware, ModelRetryMiddleware, ModelFallbackMiddleware, ToolCallLimitMiddleware
 from langchain.agents.structured_output import ToolStrategy, ProviderStrategy
-from tavily import TavilyClient
+from app.services.web_search import web_search
 from dotenv import load_dotenv
 from langchain_core.tools import tool
 from pydantic import BaseModel, Field
@@ -22,7 +23,7 @@ rate_limiter = InMemoryRateLimiter(
 )
 
 @tool
-def tavily_search(query: str) -> dict:
+async def tavily_search(query: str) -> dict:
     """
     Perform a web search using the Tavily API and return the top results.
 
@@ -36,14 +37,17 @@ def tavily_search(query: str) -> dict:
         dict: A JSON response from Tavily containing search results,
               including titles, URLs, and content snippets.
     """
-    tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
-    response = tavily_client.search(query, max_results=3, topic="general", search_depth="advanced")
-    return response
+    return await web_search.search(query)
 
 default_model = ChatGroq(model="openai/gpt-oss-120b", temperature=0.3, rate_limiter=rate_limiter)
 fallback_model = ChatGoogleGenerativeAI(model="gemini-2.0-flash", temperature=0.3, rate_limiter=rate_limiter)
-embeddings_model = GoogleGenerativeAIEmbeddings(model="models/gemini-embedding-001", 
-                                                output_dimensionality=768)
+# Cached by (model, dimensionality, task type, text hash): in-memory LRU in front of a SQLite store
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "cache/embeddings.sqlite3")
+embeddings_model = CachedEmbeddings(
+    GoogleGenerativeAIEmbeddings(model="models/gemini-embedding-001", output_dimensionality=768),
+    memory_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "4096")),
+    store=EmbeddingStore(EMBEDDING_CACHE_PATH) if EMBEDDING_CACHE_PATH else None,
+)
 
 description_generator_agent = create_agent(
             model=default_model,
@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+from prometheus_client import Counter, Gauge
+
+# Registered on the default registry, so they are served by the Instrumentator /metrics endpoint
+CACHE_HITS = Counter("sprint_sync_cache_hits_total", "Number of cache hits", ["cache"])
+CACHE_MISSES = Counter("sprint_sync_cache_misses_total", "Number of cache misses", ["cache"])
+CACHE_EVICTIONS = Counter("sprint_sync_cache_evictions_total", "Number of cache evictions", ["cache", "reason"])
+CACHE_SIZE = Gauge("sprint_sync_cache_size", "Number of entries currently held in the cache", ["cache"])
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with a bounded size (LRU eviction) and a per-entry time to live.
+
+    Args:
+        name (str): Cache name, used as the `cache` label of the Prometheus metrics.
+        maxsize (int): Maximum number of entries kept before the least recently used one is evicted.
+        ttl (float): Default time to live of an entry in seconds. `None` keeps entries until evicted.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: Optional[float] = None):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = CACHE_HITS.labels(cache=name)
+        self._misses = CACHE_MISSES.labels(cache=name)
+        self._size = CACHE_SIZE.labels(cache=name)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self._misses.inc()
+                return default
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self._size.set(len(self._data))
+                CACHE_EVICTIONS.labels(cache=self.name, reason="expired").inc()
+                self._misses.inc()
+                return default
+            self._data.move_to_end(key)
+            self._hits.inc()
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                CACHE_EVICTIONS.labels(cache=self.name, reason="size").inc()
+            self._size.set(len(self._data))
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            if self._data.pop(key, _MISSING) is not _MISSING:
+                CACHE_EVICTIONS.labels(cache=self.name, reason="invalidated").inc()
+            self._size.set(len(self._data))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._size.set(0)
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,151 @@
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional
+from langchain_core.embeddings import Embeddings
+from app.services.cache import TTLCache, CACHE_HITS, CACHE_MISSES
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.split())
+
+
+class EmbeddingStore:
+    """
+    On-disk embedding store: one SQLite row per key holding the vector as a float32 blob.
+
+    Args:
+        path (str): SQLite database file, created with its parent directory if missing.
+    """
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)")
+        self._connection.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[str]) -> Dict[str, array]:
+        if not keys:
+            return {}
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._connection.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", keys).fetchall()
+        vectors = {}
+        for key, blob in rows:
+            vector = array("f")
+            vector.frombytes(blob)
+            vectors[key] = vector
+        return vectors
+
+    def set_many(self, vectors: Dict[str, array]) -> None:
+        if not vectors:
+            return
+        with self._lock:
+            self._connection.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                                         [(key, vector.tobytes()) for key, vector in vectors.items()])
+            self._connection.commit()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that serves repeated texts from an in-memory LRU backed by an
+    optional on-disk EmbeddingStore.
+
+    Keys combine the model name, output dimensionality, task type and a SHA-256 of the
+    whitespace-normalized text. Vectors are held as float32 arrays and only converted
+    to lists of floats when returned.
+
+    Args:
+        embeddings (Embeddings): The embeddings model to wrap.
+        memory_size (int): Number of vectors kept in the in-memory LRU.
+        store (EmbeddingStore): Persistent store consulted on memory misses, or None.
+    """
+
+    def __init__(self, embeddings: Embeddings, memory_size: int, store: Optional[EmbeddingStore] = None):
+        self.embeddings = embeddings
+        self.model = getattr(embeddings, "model", type(embeddings).__name__)
+        self.output_dimensionality = getattr(embeddings, "output_dimensionality", None)
+        self.memory = TTLCache("embedding_memory", maxsize=memory_size)
+        self.store = store
+
+    def _key(self, text: str, task_type: str) -> str:
+        text_hash = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{self.model}|{self.output_dimensionality}|{task_type}|{text_hash}"
+
+    def _lookup_memory(self, keys: List[str]) -> Dict[str, array]:
+        found = {}
+        for key in keys:
+            vector = self.memory.get(key)
+            if vector is not None:
+                found[key] = vector
+        return found
+
+    def _record_store_lookup(self, requested: List[str], found: Dict[str, array]) -> None:
+        CACHE_HITS.labels(cache="embedding_store").inc(len(found))
+        CACHE_MISSES.labels(cache="embedding_store").inc(len(requested) - len(found))
+        for key, vector in found.items():
+            self.memory.set(key, vector)
+
+    def _remember(self, keys: List[str], vectors: List[List[float]]) -> Dict[str, array]:
+        computed = {key: array("f", vector) for key, vector in zip(keys, vectors)}
+        for key, vector in computed.items():
+            self.memory.set(key, vector)
+        return computed
+
+    def _pending(self, texts: List[str], task_type: str):
+        keys = [self._key(text, task_type) for text in texts]
+        unique_keys = list(dict.fromkeys(keys))
+        vectors = self._lookup_memory(unique_keys)
+        return keys, vectors, [key for key in unique_keys if key not in vectors]
+
+    def _embed(self, texts: List[str], task_type: str, compute) -> List[List[float]]:
+        keys, vectors, missing = self._pending(texts, task_type)
+        if missing and self.store is not None:
+            found = self.store.get_many(missing)
+            self._record_store_lookup(missing, found)
+            vectors.update(found)
+            missing = [key for key in missing if key not in vectors]
+        if missing:
+            text_by_key = dict(zip(keys, texts))
+            computed = self._remember(missing, compute([text_by_key[key] for key in missing]))
+            if self.store is not None:
+                self.store.set_many(computed)
+            vectors.update(computed)
+        return [vectors[key].tolist() for key in keys]
+
+    async def _aembed(self, texts: List[str], task_type: str, compute) -> List[List[float]]:
+        keys, vectors, missing = self._pending(texts, task_type)
+        if missing and self.store is not None:
+            found = await asyncio.to_thread(self.store.get_many, missing)
+            self._record_store_lookup(missing, found)
+            vectors.update(found)
+            missing = [key for key in missing if key not in vectors]
+        if missing:
+            text_by_key = dict(zip(keys, texts))
+            computed = self._remember(missing, await compute([text_by_key[key] for key in missing]))
+            if self.store is not None:
+                await asyncio.to_thread(self.store.set_many, computed)
+            vectors.update(computed)
+        return [vectors[key].tolist() for key in keys]
+
+    def embed_documents(self, texts: List[str], **kwargs) -> List[List[float]]:
+        return self._embed(texts, kwargs.get("task_type") or "RETRIEVAL_DOCUMENT",
+                           lambda missing: self.embeddings.embed_documents(missing, **kwargs))
+
+    def embed_query(self, text: str, **kwargs) -> List[float]:
+        return self._embed([text], kwargs.get("task_type") or "RETRIEVAL_QUERY",
+                           lambda missing: [self.embeddings.embed_query(missing[0], **kwargs)])[0]
+
+    async def aembed_documents(self, texts: List[str], **kwargs) -> List[List[float]]:
+        return await self._aembed(texts, kwargs.get("task_type") or "RETRIEVAL_DOCUMENT",
+                                  lambda missing: self.embeddings.aembed_documents(missing, **kwargs))
+
+    async def aembed_query(self, text: str, **kwargs) -> List[float]:
+        async def compute(missing):
+            return [await self.embeddings.aembed_query(missing[0], **kwargs)]
+        return (await self._aembed([text], kwargs.get("task_type") or "RETRIEVAL_QUERY", compute))[0]
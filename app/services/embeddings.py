@@ -0,0 +1,80 @@
+import asyncio
+import os
+from typing import List, Optional
+from langchain_core.embeddings import Embeddings
+from app.services.ai_services import embeddings_model
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+EMBEDDING_BATCH_WINDOW_SECONDS = float(os.getenv("EMBEDDING_BATCH_WINDOW_SECONDS", "0.01"))
+EMBEDDING_MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "100"))
+
+
+class QueryEmbeddingBatcher:
+    """
+    Micro-batches search query embeddings.
+
+    Texts requested within `window_seconds` of each other, by one request or by
+    concurrent ones, are embedded with a single `aembed_documents` call (using the
+    RETRIEVAL_QUERY task type, so vectors match `embed_query`).
+
+    Args:
+        embeddings (Embeddings): The underlying embeddings model.
+        window_seconds (float): How long to wait for more texts before dispatching a batch.
+        max_batch_size (int): Dispatch immediately once this many texts are pending.
+    """
+
+    def __init__(self, embeddings: Embeddings, window_seconds: float, max_batch_size: int):
+        self.embeddings = embeddings
+        self.window_seconds = window_seconds
+        self.max_batch_size = max_batch_size
+        self._pending: List[tuple] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_tasks: set = set()
+
+    async def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self._pending.append((text, future))
+            futures.append(future)
+
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window_seconds, self._dispatch)
+        return list(await asyncio.gather(*futures))
+
+    def _dispatch(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._flush(batch))
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self, batch: List[tuple]) -> None:
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+        logger.info("Embedding query batch", batch_size=len(batch), unique_texts=len(unique_texts))
+        try:
+            vectors = await self.embeddings.aembed_documents(unique_texts, task_type="RETRIEVAL_QUERY")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        vectors_by_text = dict(zip(unique_texts, vectors))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(vectors_by_text[text])
+
+
+query_embedder = QueryEmbeddingBatcher(embeddings_model,
+                                       window_seconds=EMBEDDING_BATCH_WINDOW_SECONDS,
+                                       max_batch_size=EMBEDDING_MAX_BATCH_SIZE)
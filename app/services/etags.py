@@ -0,0 +1,90 @@
+import hashlib
+import os
+from typing import Any, Hashable, Optional
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.services.cache import TTLCache
+
+ETAG_CACHE_SIZE = int(os.getenv("ETAG_CACHE_SIZE", "10000"))
+# Other workers' writes are only seen once an entry expires, so keep this short
+ETAG_CACHE_TTL_SECONDS = float(os.getenv("ETAG_CACHE_TTL_SECONDS", "10"))
+# Clients may keep the response but must revalidate it with If-None-Match on every poll
+ETAG_CACHE_CONTROL = os.getenv("ETAG_CACHE_CONTROL", "private, no-cache")
+
+
+class VersionMap:
+    """
+    ETags of the responses last rendered for a resource, so a matching If-None-Match
+    is answered with a 304 before the database is queried.
+
+    A resource may be rendered several ways (per viewer or query string); every
+    variant is dropped together by `invalidate`.
+
+    Args:
+        name (str): Cache name, used as the `cache` label of the Prometheus metrics.
+        maxsize (int): Resources tracked.
+        ttl (float): Seconds an ETag is trusted without re-reading the resource.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self._etags = TTLCache(name, maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: Hashable, variant: str = "") -> Optional[str]:
+        return (self._etags.get(key) or {}).get(variant)
+
+    def set(self, key: Hashable, variant: str, etag: str) -> None:
+        self._etags.set(key, {**(self._etags.get(key) or {}), variant: etag})
+
+    def invalidate(self, key: Hashable) -> None:
+        self._etags.invalidate(key)
+
+    def clear(self) -> None:
+        self._etags.clear()
+
+
+# task id -> {viewer: ETag} of /tasks/get/{task_id}
+task_versions = VersionMap("task_etag", maxsize=ETAG_CACHE_SIZE, ttl=ETAG_CACHE_TTL_SECONDS)
+# user id -> {query string: ETag} of /tasks/my_tasks
+my_tasks_versions = VersionMap("my_tasks_etag", maxsize=ETAG_CACHE_SIZE, ttl=ETAG_CACHE_TTL_SECONDS)
+# user id -> ETag of /users/me
+user_versions = VersionMap("user_etag", maxsize=ETAG_CACHE_SIZE, ttl=ETAG_CACHE_TTL_SECONDS)
+# user id -> ETag of /resumes/me
+resume_versions = VersionMap("resume_etag", maxsize=ETAG_CACHE_SIZE, ttl=ETAG_CACHE_TTL_SECONDS)
+
+
+def compute_etag(body: bytes) -> str:
+    return f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in {candidate.removeprefix("W/") for candidate in candidates}
+
+
+def _not_modified_response(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": ETAG_CACHE_CONTROL})
+
+
+def not_modified(request: Request, versions: VersionMap, key: Hashable, variant: str = "") -> Optional[Response]:
+    """A 304 when If-None-Match matches the ETag in `versions`, otherwise None and the resource has to be read."""
+    etag = versions.get(key, variant)
+    if etag is not None and etag_matches(request.headers.get("if-none-match"), etag):
+        return _not_modified_response(etag)
+    return None
+
+
+def conditional_response(request: Request, content: Any, versions: VersionMap, key: Hashable,
+                         variant: str = "") -> Response:
+    """Render `content` as JSON, remember its ETag, and answer 304 if the client already has it."""
+    response = JSONResponse(jsonable_encoder(content))
+    etag = compute_etag(response.body)
+    versions.set(key, variant, etag)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return _not_modified_response(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = ETAG_CACHE_CONTROL
+    return response
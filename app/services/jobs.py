@@ -0,0 +1,252 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+from app.logging_config import get_logger, set_user_id, clear_context
+
+logger = get_logger(__name__)
+
+JOB_POLL_INTERVAL_SECONDS = 5.0
+JOB_LEASE_SECONDS = 60.0
+JOB_COLUMNS = ("id", "user_id", "filename", "status", "attempts", "error", "result", "created_at", "updated_at")
+
+
+class QueueFullError(Exception):
+    """Raised by ResumeJobQueue.submit when the number of pending jobs reached its limit."""
+
+
+class ResumeJobStore:
+    """
+    SQLite table of resume ingestion jobs. Payloads are kept until the job finishes,
+    so queued jobs survive a restart.
+
+    Several processes may share the file: a job is claimed in a single UPDATE inside
+    BEGIN IMMEDIATE, and a running job holds a lease its worker renews with `heartbeat`.
+    A running job whose lease expired, because its process stopped, is claimed again.
+
+    Args:
+        path (str): SQLite database file, created with its parent directory if missing.
+        lease_seconds (float): How long a claim stays valid without a heartbeat.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = JOB_LEASE_SECONDS):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.lease_seconds = lease_seconds
+        # Autocommit, so claim_next controls its own transaction; writers wait for each other's locks
+        self._connection = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS resume_jobs (
+                id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL,
+                filename TEXT NOT NULL,
+                payload BLOB,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL,
+                error TEXT,
+                result TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                lease_expires_at REAL
+            )""")
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(resume_jobs)")}
+        if "lease_expires_at" not in columns:
+            self._connection.execute("ALTER TABLE resume_jobs ADD COLUMN lease_expires_at REAL")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS resume_jobs_status_idx ON resume_jobs (status, available_at)")
+        self._lock = threading.Lock()
+
+    def create(self, user_id: str, filename: str, payload: bytes) -> str:
+        job_id = str(uuid.uuid4())
+        now = datetime.now(timezone.utc).isoformat()
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO resume_jobs (id, user_id, filename, payload, status, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, user_id, filename, payload, time.time(), now, now))
+            self._connection.commit()
+        return job_id
+
+    def count_pending(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM resume_jobs WHERE status IN ('queued', 'running')").fetchone()[0]
+
+    def claim_next(self) -> Optional[tuple]:
+        """
+        Mark the oldest due queued job, or a running job whose lease expired, as running
+        under a new lease and return (id, user_id, filename, payload, attempts).
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._connection.execute(
+                    "UPDATE resume_jobs SET status = 'running', attempts = attempts + 1, lease_expires_at = ?, updated_at = ? "
+                    "WHERE id = (SELECT id FROM resume_jobs "
+                    "WHERE (status = 'queued' AND available_at <= ?) "
+                    "OR (status = 'running' AND (lease_expires_at IS NULL OR lease_expires_at <= ?)) "
+                    "ORDER BY created_at LIMIT 1) "
+                    "RETURNING id, user_id, filename, payload, attempts",
+                    (now + self.lease_seconds, datetime.now(timezone.utc).isoformat(), now, now)).fetchone()
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return row
+
+    def heartbeat(self, job_id: str) -> None:
+        """Extend the lease of a job this process is running."""
+        with self._lock:
+            self._connection.execute(
+                "UPDATE resume_jobs SET lease_expires_at = ? WHERE id = ? AND status = 'running'",
+                (time.time() + self.lease_seconds, job_id))
+
+    def next_available_at(self) -> Optional[float]:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT MIN(CASE WHEN status = 'queued' THEN available_at ELSE COALESCE(lease_expires_at, 0) END) "
+                "FROM resume_jobs WHERE status IN ('queued', 'running')").fetchone()[0]
+
+    def finish(self, job_id: str, status: str, result: Optional[dict] = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._connection.execute(
+                "UPDATE resume_jobs SET status = ?, result = ?, error = ?, payload = NULL, lease_expires_at = NULL, "
+                "updated_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, datetime.now(timezone.utc).isoformat(), job_id))
+            self._connection.commit()
+
+    def retry_later(self, job_id: str, delay: float, error: str) -> None:
+        with self._lock:
+            self._connection.execute(
+                "UPDATE resume_jobs SET status = 'queued', available_at = ?, error = ?, lease_expires_at = NULL, "
+                "updated_at = ? WHERE id = ?",
+                (time.time() + delay, error, datetime.now(timezone.utc).isoformat(), job_id))
+            self._connection.commit()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._connection.execute(f"SELECT {', '.join(JOB_COLUMNS)} FROM resume_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(JOB_COLUMNS, row))
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+
+class ResumeJobQueue:
+    """
+    Bounded pool of asyncio workers processing resume ingestion jobs from a ResumeJobStore.
+
+    Args:
+        store (ResumeJobStore): Where jobs and their payloads are persisted.
+        handler (Callable): Coroutine function called with (user_id, filename, payload), returning the job result.
+        workers (int): Number of jobs processed concurrently.
+        max_pending (int): Queued plus running jobs accepted before submit raises QueueFullError.
+        max_attempts (int): Attempts per job before it is marked as failed.
+        retry_delay (float): Base delay in seconds before a retry, doubled on every attempt.
+        transient_errors (tuple): Exception types worth retrying; anything else fails the job at once.
+    """
+
+    def __init__(self, store: ResumeJobStore, handler: Callable[[str, str, bytes], Awaitable[dict]], workers: int,
+                 max_pending: int, max_attempts: int, retry_delay: float, transient_errors: tuple):
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.transient_errors = transient_errors
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def submit(self, user_id: str, filename: str, payload: bytes) -> str:
+        if await asyncio.to_thread(self.store.count_pending) >= self.max_pending:
+            raise QueueFullError("Resume ingestion queue is full")
+        job_id = await asyncio.to_thread(self.store.create, user_id, filename, payload)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        logger.info("resume_job_queued", job_id=job_id)
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                # Cleared before claiming, so a job submitted after an empty claim still wakes the worker
+                self._wakeup.clear()
+                job = await asyncio.to_thread(self.store.claim_next)
+                if job is None:
+                    await self._wait_for_work()
+                    continue
+                await self._run(*job)
+            except Exception as e:
+                # e.g. "database is locked"; the worker must outlive it, or queued jobs are never run
+                logger.error(reason="Resume job worker iteration failed", error=str(e), exc_info=True)
+                await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+
+    async def _wait_for_work(self) -> None:
+        next_available_at = await asyncio.to_thread(self.store.next_available_at)
+        timeout = JOB_POLL_INTERVAL_SECONDS
+        if next_available_at is not None:
+            timeout = min(timeout, max(0.0, next_available_at - time.time()))
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.store.lease_seconds / 3)
+            try:
+                await asyncio.to_thread(self.store.heartbeat, job_id)
+            except Exception as e:
+                # The next beat still renews the lease before it expires
+                logger.error(reason="Resume job heartbeat failed", job_id=job_id, error=str(e), exc_info=True)
+
+    async def _run(self, job_id: str, user_id: str, filename: str, payload: bytes, attempt: int) -> None:
+        if attempt > self.max_attempts:
+            # Reclaimed after its lease expired too often, e.g. the job keeps crashing its worker process
+            logger.error("resume_job_failed", job_id=job_id, attempt=attempt, error="Lease expired")
+            await asyncio.to_thread(self.store.finish, job_id, "failed", error="Worker stopped while processing the job")
+            return
+        set_user_id(user_id)
+        start_time = time.perf_counter()
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            result = await self.handler(user_id, filename, payload)
+        except self.transient_errors as e:
+            if attempt < self.max_attempts:
+                delay = self.retry_delay * 2 ** (attempt - 1)
+                logger.warning("resume_job_retry", job_id=job_id, attempt=attempt, retry_in_seconds=delay, error=str(e))
+                await asyncio.to_thread(self.store.retry_later, job_id, delay, str(e))
+                self._wakeup.set()
+            else:
+                logger.error("resume_job_failed", job_id=job_id, attempt=attempt, error=str(e))
+                await asyncio.to_thread(self.store.finish, job_id, "failed", error=str(e))
+        except Exception as e:
+            logger.error("resume_job_failed", job_id=job_id, attempt=attempt, error=str(e), exc_info=True)
+            await asyncio.to_thread(self.store.finish, job_id, "failed", error=str(e))
+        else:
+            logger.info("resume_job_succeeded", job_id=job_id, attempt=attempt,
+                        duration_seconds=round(time.perf_counter() - start_time, 4))
+            await asyncio.to_thread(self.store.finish, job_id, "succeeded", result=result)
+        finally:
+            heartbeat.cancel()
+            clear_context()
@@ -0,0 +1,174 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+from array import array
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.services.repository import get_repository
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+KEYWORD_INDEX_ENABLED = json.loads(os.getenv("KEYWORD_INDEX_ENABLED", "false").lower())
+
+PROFILE_FIELDS = ("id", "user_id", "profile_skills", "profile_tasks")
+
+
+def tokenize(text: str) -> List[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+class KeywordIndex:
+    """
+    In-process replacement for the keyword_search_profile RPC: a BM25 inverted index over
+    resumes.profile_skills.
+
+    Each term maps to two compact arrays, the document slots containing it (uint32) and
+    the term frequencies (uint16), which are scored with NumPy. Slots freed by removals
+    are reused, so the index is maintained incrementally. Until `load` has run the index
+    is not `ready` and updates are ignored; callers then use the RPC.
+
+    Terms are only lowercased, not stemmed like the RPC's `english` tsvector, so
+    "developer" does not match "developers" here and rankings differ from the RPC path.
+
+    Args:
+        k1 (float): BM25 term frequency saturation.
+        b (float): BM25 document length normalization.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._reset()
+        self.ready = False
+
+    def _reset(self) -> None:
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._profiles: List[Optional[dict]] = []
+        self._terms: List[Tuple[str, ...]] = []
+        self._lengths = array("I")
+        self._positions: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def load(self, rows: List[dict]) -> None:
+        """Replace the index contents with `rows` (resumes including profile_skills)."""
+        with self._lock:
+            self._reset()
+            for row in rows:
+                self._add(row)
+            self.ready = True
+
+    def upsert(self, row: dict) -> None:
+        """Add or replace the resume of `row["user_id"]`."""
+        if not self.ready:
+            return
+        with self._lock:
+            self._remove(row["user_id"])
+            self._add(row)
+
+    def remove(self, user_id: str) -> None:
+        """Drop the resume of `user_id`, if indexed."""
+        if not self.ready:
+            return
+        with self._lock:
+            self._remove(user_id)
+
+    def _add(self, row: dict) -> None:
+        counts = Counter(tokenize(row.get("profile_skills") or ""))
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._profiles)
+            self._profiles.append(None)
+            self._terms.append(())
+            self._lengths.append(0)
+        for term, frequency in counts.items():
+            slots, frequencies = self._postings.setdefault(term, (array("I"), array("H")))
+            slots.append(slot)
+            frequencies.append(min(frequency, 65535))
+        self._profiles[slot] = {field: row.get(field) for field in PROFILE_FIELDS}
+        self._terms[slot] = tuple(counts)
+        self._lengths[slot] = sum(counts.values())
+        self._total_length += self._lengths[slot]
+        self._positions[row["user_id"]] = slot
+
+    def _remove(self, user_id: str) -> None:
+        slot = self._positions.pop(user_id, None)
+        if slot is None:
+            return
+        for term in self._terms[slot]:
+            slots, frequencies = self._postings[term]
+            position = slots.index(slot)
+            del slots[position]
+            del frequencies[position]
+            if not slots:
+                del self._postings[term]
+        self._total_length -= self._lengths[slot]
+        self._profiles[slot] = None
+        self._terms[slot] = ()
+        self._lengths[slot] = 0
+        self._free.append(slot)
+
+    def search_many(self, queries: List[str], num_profiles: int) -> List[List[dict]]:
+        """
+        Rank the resumes for every query in one pass: each distinct term's BM25
+        contribution is computed once and shared by all the queries containing it.
+
+        Returns:
+            List[List[dict]]: Per query, the top `num_profiles` resumes matching any term, best first.
+        """
+        with self._lock:
+            live = len(self._positions)
+            if not live or num_profiles <= 0:
+                return [[] for _ in queries]
+            lengths = np.frombuffer(self._lengths, dtype=np.uint32).astype(np.float32)
+            length_norm = self.k1 * (1 - self.b + self.b * lengths / (self._total_length / live or 1.0))
+            contributions = {}
+            results = []
+            for query in queries:
+                scores = np.zeros(len(self._profiles), dtype=np.float32)
+                for term in set(tokenize(query)):
+                    if term not in self._postings:
+                        continue
+                    if term not in contributions:
+                        slots, frequencies = self._postings[term]
+                        # A copy, not a view: an exported buffer would make the next resize
+                        # of the postings array raise BufferError
+                        slots = np.frombuffer(slots, dtype=np.uint32).copy()
+                        frequencies = np.frombuffer(frequencies, dtype=np.uint16).astype(np.float32)
+                        idf = math.log(1 + (live - len(slots) + 0.5) / (len(slots) + 0.5))
+                        contributions[term] = (slots, idf * frequencies * (self.k1 + 1) / (frequencies + length_norm[slots]))
+                    slots, contribution = contributions[term]
+                    scores[slots] += contribution
+                candidates = np.flatnonzero(scores)
+                if len(candidates) > num_profiles:
+                    candidates = candidates[np.argpartition(scores[candidates], -num_profiles)[-num_profiles:]]
+                candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+                results.append([{**self._profiles[slot], "score": float(scores[slot])} for slot in candidates])
+            return results
+
+
+keyword_index = KeywordIndex()
+
+
+async def load_keyword_index() -> None:
+    """Fill the index from the resumes table when KEYWORD_INDEX_ENABLED; on failure searches keep using the RPC."""
+    if not KEYWORD_INDEX_ENABLED:
+        return
+    start_time = time.perf_counter()
+    try:
+        keyword_index.load(await get_repository().resumes.list_profiles())
+    except Exception as e:
+        logger.error(reason="Failed to load the keyword index, falling back to keyword_search_profile", error=str(e))
+        return
+    logger.info("keyword_index_loaded", total_profiles=len(keyword_index),
+                duration_seconds=round(time.perf_counter() - start_time, 4))
@@ -0,0 +1,258 @@
+import math
+import re
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.services.repository import (Repository, UserRepository, TaskRepository, ResumeRepository, SearchRepository,
+                                     TaskFilters)
+
+USER_FIELDS = ("id", "username", "email", "is_admin")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _sorted(rows: Iterable[dict], sort: str) -> List[dict]:
+    column = sort.lstrip("-")
+    return sorted(rows, key=lambda row: (row.get(column) or "", row["id"]), reverse=sort.startswith("-"))
+
+
+def _keyset_page(rows: Iterable[dict], columns: List[str], after: Optional[Tuple[str, str]], limit: int,
+                 sort: str = "created_at") -> List[dict]:
+    ordered = _sorted(rows, sort)
+    if after is not None:
+        column, after = sort.lstrip("-"), tuple(after)
+        if sort.startswith("-"):
+            ordered = [row for row in ordered if (row.get(column) or "", row["id"]) < after]
+        else:
+            ordered = [row for row in ordered if (row.get(column) or "", row["id"]) > after]
+    return [{column: row.get(column) for column in columns} for row in ordered[:limit]]
+
+
+def _in_range(value: Optional[str], start: Optional[datetime], end: Optional[datetime]) -> bool:
+    if start is None and end is None:
+        return True
+    if value is None:
+        return False
+    value = datetime.fromisoformat(value)
+    return (start is None or value >= start) and (end is None or value < end)
+
+
+def _task_matches(task: dict, filters: Optional[TaskFilters]) -> bool:
+    if filters is None:
+        return True
+    return ((filters.status is None or task["status"] == filters.status)
+            and (filters.user_id is None or task["user_id"] == filters.user_id)
+            and _in_range(task.get("created_at"), filters.created_after, filters.created_before)
+            and _in_range(task.get("updated_at"), filters.updated_after, filters.updated_before))
+
+
+def _tokens(text: str) -> set:
+    return set(re.findall(r"\w+", text.lower()))
+
+
+class MemoryStore:
+    """Tables shared by the in-memory repositories, mirroring initial_schema.sql."""
+
+    def __init__(self):
+        self.users: Dict[str, dict] = {}
+        self.tasks: Dict[str, dict] = {}
+        self.resumes: Dict[str, dict] = {}
+
+
+class MemoryUserRepository(UserRepository):
+
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    async def get_by_id(self, user_id: str) -> Optional[dict]:
+        user = self.store.users.get(user_id)
+        return {field: user[field] for field in USER_FIELDS} if user else None
+
+    async def get_by_username(self, username: str) -> Optional[dict]:
+        for user in self.store.users.values():
+            if user["username"] == username:
+                return dict(user)
+        return None
+
+    async def create(self, data: dict) -> Optional[dict]:
+        if await self.get_by_username(data["username"]):
+            raise ValueError("duplicate key value violates unique constraint \"users_username_key\"")
+        now = _now()
+        user = {"id": str(uuid.uuid4()), "is_admin": False, "created_at": now, "updated_at": now, **data}
+        self.store.users[user["id"]] = user
+        return dict(user)
+
+    async def update(self, user_id: str, data: dict) -> Optional[dict]:
+        user = self.store.users.get(user_id)
+        if user is None:
+            return None
+        user.update(data)
+        return dict(user)
+
+    async def delete(self, user_id: str) -> Optional[dict]:
+        user = self.store.users.pop(user_id, None)
+        if user is None:
+            return None
+        # ON DELETE CASCADE for resumes, ON DELETE SET NULL for tasks
+        self.store.resumes = {key: resume for key, resume in self.store.resumes.items() if resume["user_id"] != user_id}
+        for task in self.store.tasks.values():
+            if task["user_id"] == user_id:
+                task["user_id"] = None
+        return user
+
+    async def list_page(self, columns: List[str], after: Optional[Tuple[str, str]], limit: int) -> List[dict]:
+        return _keyset_page(self.store.users.values(), columns, after, limit)
+
+    async def get_usernames_ordered(self, user_ids: List[str]) -> List[dict]:
+        return [{"id": user_id, "username": self.store.users[user_id]["username"]}
+                for user_id in user_ids if user_id in self.store.users]
+
+
+class MemoryTaskRepository(TaskRepository):
+
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    async def create(self, data: dict) -> Optional[dict]:
+        now = _now()
+        task = {"id": str(uuid.uuid4()), "user_id": None, "description": None, "status": "created",
+                "total_minutes": 0.0, "created_at": now, "updated_at": now, **data}
+        self.store.tasks[task["id"]] = task
+        return dict(task)
+
+    async def create_many(self, rows: List[dict]) -> List[dict]:
+        return [await self.create(row) for row in rows]
+
+    async def update_many(self, task_ids: List[str], data: dict, user_id: Optional[str] = None) -> List[dict]:
+        updated = []
+        for task_id in dict.fromkeys(task_ids):
+            task = self.store.tasks.get(task_id)
+            if task is not None and (user_id is None or task["user_id"] == user_id):
+                task.update(data)
+                updated.append(dict(task))
+        return updated
+
+    async def delete_many(self, task_ids: List[str]) -> List[dict]:
+        return [self.store.tasks.pop(task_id) for task_id in dict.fromkeys(task_ids) if task_id in self.store.tasks]
+
+    async def get(self, task_id: str, user_id: Optional[str] = None) -> Optional[dict]:
+        task = self.store.tasks.get(task_id)
+        if task is None or (user_id is not None and task["user_id"] != user_id):
+            return None
+        return dict(task)
+
+    async def list(self, user_id: Optional[str] = None, filters: Optional[TaskFilters] = None,
+                   sort: str = "created_at") -> List[dict]:
+        tasks = [task for task in self.store.tasks.values()
+                 if (user_id is None or task["user_id"] == user_id) and _task_matches(task, filters)]
+        return [dict(task) for task in _sorted(tasks, sort)]
+
+    async def list_page(self, columns: List[str], after: Optional[Tuple[str, str]], limit: int,
+                        filters: Optional[TaskFilters] = None, sort: str = "created_at") -> List[dict]:
+        tasks = [task for task in self.store.tasks.values() if _task_matches(task, filters)]
+        return _keyset_page(tasks, columns, after, limit, sort)
+
+    async def update(self, task_id: str, data: dict) -> Optional[dict]:
+        task = self.store.tasks.get(task_id)
+        if task is None:
+            return None
+        task.update(data)
+        return dict(task)
+
+    async def delete(self, task_id: str) -> Optional[dict]:
+        return self.store.tasks.pop(task_id, None)
+
+
+class MemoryResumeRepository(ResumeRepository):
+
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    async def upsert(self, data: dict) -> Optional[dict]:
+        now = _now()
+        resume = self.store.resumes.get(data["user_id"])
+        if resume is None:
+            resume = {"id": str(uuid.uuid4()), "s3_key": None, "created_at": now, "updated_at": now}
+            self.store.resumes[data["user_id"]] = resume
+        resume.update(data)
+        return dict(resume)
+
+    async def get_by_user(self, user_id: str) -> Optional[dict]:
+        resume = self.store.resumes.get(user_id)
+        return dict(resume) if resume else None
+
+    async def delete_by_user(self, user_id: str) -> Optional[dict]:
+        return self.store.resumes.pop(user_id, None)
+
+    async def clear_content_hash(self, user_id: str) -> None:
+        if user_id in self.store.resumes:
+            self.store.resumes[user_id]["content_hash"] = None
+
+    async def find_by_hash(self, column: str, value: str) -> Optional[dict]:
+        for resume in self.store.resumes.values():
+            if resume.get(column) == value:
+                return {key: resume.get(key) for key in ("user_id", "profile_skills", "profile_tasks", "embedding", "text_hash")}
+        return None
+
+    async def list_embeddings(self, page_size: int = 1000) -> List[dict]:
+        return [{key: resume.get(key) for key in ("id", "user_id", "profile_skills", "profile_tasks", "embedding")}
+                for resume in self.store.resumes.values()]
+
+    async def list_profiles(self, page_size: int = 1000) -> List[dict]:
+        return [{key: resume.get(key) for key in ("id", "user_id", "profile_skills", "profile_tasks")}
+                for resume in self.store.resumes.values()]
+
+    async def list_page(self, columns: List[str], after: Optional[Tuple[str, str]], limit: int) -> List[dict]:
+        rows = []
+        for resume in self.store.resumes.values():
+            user = self.store.users.get(resume["user_id"])
+            rows.append({**resume, "users": {"username": user["username"]} if user else None})
+        return _keyset_page(rows, columns, after, limit)
+
+
+class MemorySearchRepository(SearchRepository):
+    """Approximates keyword_search_profile (any-term match) and vector_search_profile (cosine)."""
+
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    def _with_username(self, resume: dict) -> dict:
+        user = self.store.users.get(resume["user_id"])
+        return {**resume, "username": user["username"] if user else None}
+
+    async def keyword_search(self, user_query: str, num_profiles: int) -> List[dict]:
+        query_tokens = _tokens(user_query)
+        scored = []
+        for resume in self.store.resumes.values():
+            score = len(query_tokens & _tokens(resume["profile_skills"]))
+            if score:
+                scored.append((score, resume))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [self._with_username(resume) for _, resume in scored[:num_profiles]]
+
+    async def vector_search(self, query_embedding: List[float], match_threshold: float, num_profiles: int) -> List[dict]:
+        query_norm = math.sqrt(sum(value * value for value in query_embedding)) or 1.0
+        scored = []
+        for resume in self.store.resumes.values():
+            embedding = resume.get("embedding")
+            if not embedding:
+                continue
+            norm = math.sqrt(sum(value * value for value in embedding)) or 1.0
+            similarity = sum(a * b for a, b in zip(query_embedding, embedding)) / (query_norm * norm)
+            if similarity > match_threshold:
+                scored.append((similarity, resume))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [self._with_username(resume) for _, resume in scored[:num_profiles]]
+
+
+class MemoryRepository(Repository):
+    """In-process stand-in for Supabase, selected with `USE_MEMORY_DB=true`."""
+
+    def __init__(self):
+        self.store = MemoryStore()
+        self.users = MemoryUserRepository(self.store)
+        self.tasks = MemoryTaskRepository(self.store)
+        self.resumes = MemoryResumeRepository(self.store)
+        self.search = MemorySearchRepository(self.store)
@@ -0,0 +1,89 @@
+import base64
+import binascii
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+LIST_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", "100"))
+LIST_MAX_PAGE_SIZE = int(os.getenv("LIST_MAX_PAGE_SIZE", "1000"))
+
+# Every listed row carries these; (created_at, id) is the default keyset
+CURSOR_FIELDS = ("created_at", "id")
+DEFAULT_SORT = "created_at"
+
+# (sort column value, id) of the last row of the previous page
+Cursor = Tuple[str, str]
+PageFetcher = Callable[[Optional[Cursor], int], Awaitable[List[dict]]]
+
+
+class ListQueryError(ValueError):
+    """Raised for an unknown `fields` entry or a malformed cursor."""
+
+
+def sort_column(sort: str) -> str:
+    return sort.lstrip("-")
+
+
+def parse_sort(sort: str, allowed: Tuple[str, ...]) -> str:
+    """Validate a `sort` query parameter: a column of `allowed`, prefixed with "-" for descending order."""
+    if sort_column(sort) not in allowed or sort.count("-") > 1:
+        raise ListQueryError(f"Invalid sort: {sort}. Allowed: {', '.join(allowed)}, optionally prefixed with -")
+    return sort
+
+
+def encode_cursor(row: dict, sort: str = DEFAULT_SORT) -> str:
+    payload = [sort, row[sort_column(sort)], row["id"]]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str], sort: str = DEFAULT_SORT) -> Optional[Cursor]:
+    if not cursor:
+        return None
+    try:
+        cursor_sort, value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        # Both end up in a PostgREST filter, so only a timestamp and a UUID are accepted
+        datetime.fromisoformat(value)
+        uuid.UUID(row_id)
+    except (binascii.Error, UnicodeError, ValueError, TypeError, AttributeError):
+        raise ListQueryError("Invalid cursor")
+    if cursor_sort != sort:
+        raise ListQueryError("Cursor was issued for a different sort order")
+    return value, row_id
+
+
+def parse_fields(fields: Optional[str], allowed: Tuple[str, ...], sort: str = DEFAULT_SORT) -> List[str]:
+    """
+    Columns to select for a `fields=a,b` query parameter, restricted to `allowed`;
+    all of `allowed` when omitted. The cursor and sort columns are always included.
+    """
+    if not fields:
+        return list(allowed)
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise ListQueryError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return list(dict.fromkeys([*CURSOR_FIELDS, sort_column(sort), *requested]))
+
+
+async def fetch_page(fetch: PageFetcher, after: Optional[Cursor], limit: int,
+                     sort: str = DEFAULT_SORT) -> Tuple[List[dict], Optional[str]]:
+    """Return up to `limit` rows after the cursor and the cursor of the next page, if there is one."""
+    rows = await fetch(after, limit + 1)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1], sort)
+
+
+async def stream_ndjson(fetch: PageFetcher, after: Optional[Cursor], page_size: int,
+                        sort: str = DEFAULT_SORT) -> AsyncIterator[str]:
+    """Yield every row after the cursor as one JSON line, fetching the next page only once the previous one is written."""
+    while True:
+        rows = await fetch(after, page_size)
+        for row in rows:
+            yield json.dumps(row, default=str) + "\n"
+        if len(rows) < page_size:
+            return
+        after = (rows[-1][sort_column(sort)], rows[-1]["id"])
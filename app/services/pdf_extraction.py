@@ -0,0 +1,85 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Optional
+from pypdf import PdfReader
+
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(10 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "30"))
+PDF_EXTRACTION_TIMEOUT_SECONDS = float(os.getenv("PDF_EXTRACTION_TIMEOUT_SECONDS", "30"))
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", "2"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+class PdfTooLargeError(ValueError):
+    """Raised when a PDF exceeds PDF_MAX_BYTES or PDF_MAX_PAGES."""
+
+
+class PdfExtractionTimeoutError(Exception):
+    """Raised when text extraction takes longer than PDF_EXTRACTION_TIMEOUT_SECONDS."""
+
+
+class PdfExtractionCrashedError(Exception):
+    """Raised when the worker process died while extracting the document."""
+
+
+def extract_text(file_bytes: bytes, max_pages: int) -> str:
+    """Extract the text of every page, collecting pages in a list and joining them once."""
+    reader = PdfReader(BytesIO(file_bytes))
+    if len(reader.pages) > max_pages:
+        raise PdfTooLargeError(f"PDF has {len(reader.pages)} pages, the limit is {max_pages}")
+    pages = []
+    for page in reader.pages:
+        pages.append(page.extract_text() or "")
+    return "".join(pages)
+
+
+def check_pdf_size(size: int) -> None:
+    if size > PDF_MAX_BYTES:
+        raise PdfTooLargeError(f"PDF is {size} bytes, the limit is {PDF_MAX_BYTES}")
+
+
+def get_pdf_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the shared extraction process pool, or None when PDF_EXTRACTION_WORKERS is 0."""
+    global _pool
+    if _pool is None and PDF_EXTRACTION_WORKERS > 0:
+        _pool = ProcessPoolExecutor(max_workers=PDF_EXTRACTION_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_pdf_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+
+
+async def extract_pdf_text(file_bytes: bytes) -> str:
+    """
+    Extract the text of a PDF off the event loop, in the process pool (or a thread when
+    the pool is disabled), enforcing the size, page and time limits.
+
+    On timeout the caller gets PdfExtractionTimeoutError right away; the worker
+    finishes the document in the background, bounded by the page limit.
+
+    A worker that dies on a document (out of memory, a crash in the parser) breaks
+    the whole pool, so it is replaced for the next call and the caller gets
+    PdfExtractionCrashedError.
+    """
+    check_pdf_size(len(file_bytes))
+    loop = asyncio.get_running_loop()
+    pool = get_pdf_pool()
+    try:
+        future = loop.run_in_executor(pool, extract_text, file_bytes, PDF_MAX_PAGES)
+        return await asyncio.wait_for(future, timeout=PDF_EXTRACTION_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise PdfExtractionTimeoutError(f"PDF text extraction took longer than {PDF_EXTRACTION_TIMEOUT_SECONDS} seconds")
+    except BrokenProcessPool:
+        # Concurrent failures may already have replaced the pool
+        if pool is _pool:
+            shutdown_pdf_pool()
+        raise PdfExtractionCrashedError("PDF text extraction worker crashed on this document")
@@ -0,0 +1,94 @@
+import asyncio
+import hashlib
+import json
+import os
+from typing import Dict, Set
+from langchain_core.messages import HumanMessage
+from app.services.ai_services import query_generator_agent
+from app.services.cache import TTLCache
+from app.services.embedding_cache import normalize_text
+from app.services.prompts import query_generator_system_prompt
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+QUERY_VARIATIONS_CACHE_SIZE = int(os.getenv("QUERY_VARIATIONS_CACHE_SIZE", "1024"))
+QUERY_VARIATIONS_CACHE_TTL_SECONDS = float(os.getenv("QUERY_VARIATIONS_CACHE_TTL_SECONDS", "86400"))
+QUERY_VARIATIONS_PRECOMPUTE = json.loads(os.getenv("QUERY_VARIATIONS_PRECOMPUTE", "false").lower())
+QUERY_VARIATIONS_PRECOMPUTE_CONCURRENCY = int(os.getenv("QUERY_VARIATIONS_PRECOMPUTE_CONCURRENCY", "2"))
+QUERY_VARIATIONS_PRECOMPUTE_MAX_PENDING = int(os.getenv("QUERY_VARIATIONS_PRECOMPUTE_MAX_PENDING", "100"))
+
+# Editing the system prompt changes the version, so stale variations are never served
+PROMPT_VERSION = hashlib.sha256(query_generator_system_prompt.encode("utf-8")).hexdigest()[:12]
+
+query_variations_cache = TTLCache("query_variations", maxsize=QUERY_VARIATIONS_CACHE_SIZE, ttl=QUERY_VARIATIONS_CACHE_TTL_SECONDS)
+_in_flight: Dict[str, asyncio.Future] = {}
+_background_tasks: Set[asyncio.Task] = set()
+# Bounds the LLM calls made ahead of time, so they leave room for interactive requests
+_precompute_slots = asyncio.Semaphore(QUERY_VARIATIONS_PRECOMPUTE_CONCURRENCY)
+
+
+def query_variations_key(title: str, description: str) -> str:
+    payload = json.dumps([PROMPT_VERSION, normalize_text(title), normalize_text(description or "")])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def _generate(title: str, description: str) -> dict:
+    messages = [
+        HumanMessage(content=f"Generate search query variations for the following: \ntask title: {title}\nAnd task description: {description}"),
+    ]
+    response = await query_generator_agent.ainvoke({"messages": messages})
+    return json.loads(response["messages"][-1].content)
+
+
+async def get_query_variations(title: str, description: str) -> dict:
+    """
+    Return the `keyword_search_queries` and `task_search_queries` generated for a task,
+    from the cache when the same (title, description, prompt version) was seen before.
+    Concurrent calls for the same task share one LLM call.
+    """
+    key = query_variations_key(title, description)
+    variations = query_variations_cache.get(key)
+    if variations is not None:
+        return variations
+
+    future = _in_flight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(_generate(title, description))
+        _in_flight[key] = future
+        future.add_done_callback(lambda _: _in_flight.pop(key, None))
+    variations = await asyncio.shield(future)
+    query_variations_cache.set(key, variations)
+    return variations
+
+
+async def _precompute(title: str, description: str) -> None:
+    try:
+        async with _precompute_slots:
+            await get_query_variations(title, description)
+    except Exception as e:
+        logger.warning(reason="Failed to precompute query variations", error=str(e))
+
+
+def precompute_query_variations(title: str, description: str) -> None:
+    """
+    Generate and cache the variations for a task in the background, when QUERY_VARIATIONS_PRECOMPUTE
+    is on. At most QUERY_VARIATIONS_PRECOMPUTE_CONCURRENCY generations run at once; once
+    QUERY_VARIATIONS_PRECOMPUTE_MAX_PENDING are waiting, further tasks are dropped.
+    """
+    if not QUERY_VARIATIONS_PRECOMPUTE or json.loads(os.getenv("USE_LLM_STUB", "false").lower()):
+        return
+    if len(_background_tasks) >= QUERY_VARIATIONS_PRECOMPUTE_MAX_PENDING:
+        logger.warning(reason="Query variations precompute backlog is full, skipping task")
+        return
+    task = asyncio.create_task(_precompute(title, description))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def stop_precompute() -> None:
+    """Cancel the precomputes still pending or running, on shutdown."""
+    tasks = list(_background_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
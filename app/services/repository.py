@@ -0,0 +1,263 @@
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+from app.services.supabase_client import get_supabase
+
+USER_COLUMNS = "id, username, email, is_admin"
+
+
+@dataclass
+class TaskFilters:
+    """Task list filters; time ranges include the lower bound and exclude the upper one."""
+    status: Optional[str] = None
+    user_id: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    updated_after: Optional[datetime] = None
+    updated_before: Optional[datetime] = None
+
+
+def _order(query, sort: str):
+    """Order by a `sort` spec ("column" or "-column" for descending) with id as the tie breaker."""
+    column, descending = sort.lstrip("-"), sort.startswith("-")
+    return query.order(column, desc=descending).order("id", desc=descending)
+
+
+def _keyset_page(query, after: Optional[Tuple[str, str]], limit: int, sort: str = "created_at"):
+    """Restrict a select to `limit` rows ordered by (sort column, id), starting after the `after` key."""
+    if after is not None:
+        column, op = sort.lstrip("-"), "lt" if sort.startswith("-") else "gt"
+        value, row_id = after
+        query = query.or_(f'{column}.{op}."{value}",and({column}.eq."{value}",id.{op}.{row_id})')
+    return _order(query, sort).limit(limit)
+
+
+def _filter_tasks(query, filters: Optional[TaskFilters]):
+    if filters is None:
+        return query
+    if filters.status is not None:
+        query = query.eq("status", filters.status)
+    if filters.user_id is not None:
+        query = query.eq("user_id", filters.user_id)
+    if filters.created_after is not None:
+        query = query.gte("created_at", filters.created_after.isoformat())
+    if filters.created_before is not None:
+        query = query.lt("created_at", filters.created_before.isoformat())
+    if filters.updated_after is not None:
+        query = query.gte("updated_at", filters.updated_after.isoformat())
+    if filters.updated_before is not None:
+        query = query.lt("updated_at", filters.updated_before.isoformat())
+    return query
+
+
+class UserRepository:
+
+    async def get_by_id(self, user_id: str) -> Optional[dict]:
+        client = await get_supabase()
+        res = await client.table("users").select(USER_COLUMNS).eq("id", user_id).execute()
+        return res.data[0] if res.data else None
+
+    async def get_by_username(self, username: str) -> Optional[dict]:
+        """Return the full user row, including the password hash, for authentication."""
+        client = await get_supabase()
+        res = await client.table("users").select("*").eq("username", username).execute()
+        return res.data[0] if res.data else None
+
+    async def create(self, data: dict) -> Optional[dict]:
+        client = await get_supabase()
+        res = await client.table("users").insert(data).execute()
+        return res.data[0] if res.data else None
+
+    async def update(self, user_id: str, data: dict) -> Optional[dict]:
+        client = await get_supabase()
+        res = await client.table("users").update(data).eq("id", user_id).execute()
+        return res.data[0] if res.data else None
+
+    async def delete(self, user_id: str) -> Optional[dict]:
+        client = await get_supabase()
+        res = await client.table("users").delete().eq("id", user_id).execute()
+        return res.data[0] if res.data else None
+
+    async def list_page(self, columns: List[str], after: Optional[Tuple[str, str]], limit: int) -> List[dict]:
+        """Return `columns` of up to `limit` users after the (created_at, id) key `after`."""
+        client = await get_supabase()
+        res = await _keyset_page(client.table("users").select(", ".join(columns)), after, limit).execute()
+        return res.data or []
+
+    async def get_usernames_ordered(self, user_ids: List[str]) -> List[dict]:
+        """Return `{id, username}` rows in the same order as `user_ids`."""
+        client = await get_supabase()
+        res = await client.rpc("get_users_by_ids_ordered", {"input_ids": user_ids}).execute()
+        return res.data or []
+
+
+class TaskRepository:
+
+    async def create(self, data: dict) -> Optional[dict]:
+        client = await get_supabase()
+        res = await client.table("tasks").insert(data).execute()
+        return res.data[0] if res.data else None
+
+    async def create_many(self, rows: List[dict]) -> List[dict]:
+        """Insert all rows in one statement and return them in the same order."""
+        client = await get_supabase()
+        res = await client.table("tasks").insert(rows).execute()
+        return res.data or []
+
+    async def update_many(self, task_ids: List[str], data: dict, user_id: Optional[str] = None) -> List[dict]:
+        """Write the same columns to every task, restricted to tasks assigned to `user_id` when given."""
+        client = await get_supabase()
+        query = client.table("tasks").update(data).in_("id", task_ids)
+        if user_id is not None:
+            query = query.eq("user_id", user_id)
+        res = await query.execute()
+        return res.data or []
+
+    async def delete_many(self, task_ids: List[str]) -> List[dict]:
+        client = await get_supabase()
+        res = await client.table("tasks").delete().in_("id", task_ids).execute()
+        return res.data or []
+
+    async def get(self, task_id: str, user_id: Optional[str] = None) -> Optional[dict]:
+        """Return the task, restricted to tasks assigned to `user_id` when given."""
+        client = await get_supabase()
+        query = client.table("tasks").select("*").eq("id", task_id)
+        if user_id is not None:
+            query = query.eq("user_id", user_id)
+        res = await query.execute()
+        return res.data[0] if res.data else None
+
+    async def list(self, user_id: Optional[str] = None, filters: Optional[TaskFilters] = None,
+                   sort: str = "created_at") -> List[dict]:
+        client = await get_supabase()
+        query = _filter_tasks(client.table("tasks").select("*"), filters)
+        if user_id is not None:
+            query = query.eq("user_id", user_id)
+        res = await _order(query, sort).execute()
+        return res.data or []
+
+    async def list_page(self, columns: List[str], after: Optional[Tuple[str, str]], limit: int,
+                        filters: Optional[TaskFilters] = None, sort: str = "created_at") -> List[dict]:
+        client = await get_supabase()
+        query = _filter_tasks(client.table("tasks").select(", ".join(columns)), filters)
+        res = await _keyset_page(query, after, limit, sort).execute()
+        return res.data or []
+
+    async def update(self, task_id: str, data: dict) -> Optional[dict]:
+        client = await get_supabase()
+        res = await client.table("tasks").update(data).eq("id", task_id).execute()
+        return res.data[0] if res.data else None
+
+    async def delete(self, task_id: str) -> Optional[dict]:
+        client = await get_supabase()
+        res = await client.table("tasks").delete().eq("id", task_id).execute()
+        return res.data[0] if res.data else None
+
+
+class ResumeRepository:
+
+    async def upsert(self, data: dict) -> Optional[dict]:
+        """Create or replace the resume of `data["user_id"]`."""
+        client = await get_supabase()
+        res = await client.table("resumes").upsert(data, on_conflict="user_id").execute()
+        return res.data[0] if res.data else None
+
+    async def get_by_user(self, user_id: str) -> Optional[dict]:
+        client = await get_supabase()
+        res = await client.table("resumes").select("*").eq("user_id", user_id).execute()
+        return res.data[0] if res.data else None
+
+    async def delete_by_user(self, user_id: str) -> Optional[dict]:
+        client = await get_supabase()
+        res = await client.table("resumes").delete().eq("user_id", user_id).execute()
+        return res.data[0] if res.data else None
+
+    async def clear_content_hash(self, user_id: str) -> None:
+        client = await get_supabase()
+        await client.table("resumes").update({"content_hash": None}).eq("user_id", user_id).execute()
+
+    async def find_by_hash(self, column: str, value: str) -> Optional[dict]:
+        """Return the extraction results of any resume whose `content_hash` or `text_hash` equals `value`."""
+        client = await get_supabase()
+        res = await client.table("resumes").select("user_id, profile_skills, profile_tasks, embedding, text_hash").eq(column, value).limit(1).execute()
+        return res.data[0] if res.data else None
+
+    async def _select_all(self, columns: str, page_size: int) -> List[dict]:
+        client = await get_supabase()
+        rows = []
+        while True:
+            res = await client.table("resumes").select(columns).order("id").range(len(rows), len(rows) + page_size - 1).execute()
+            rows.extend(res.data or [])
+            if len(res.data or []) < page_size:
+                return rows
+
+    async def list_embeddings(self, page_size: int = 1000) -> List[dict]:
+        """Return every resume with its embedding, fetched in pages of `page_size` rows."""
+        return await self._select_all("id, user_id, profile_skills, profile_tasks, embedding", page_size)
+
+    async def list_profiles(self, page_size: int = 1000) -> List[dict]:
+        """Return every resume without its embedding, fetched in pages of `page_size` rows."""
+        return await self._select_all("id, user_id, profile_skills, profile_tasks", page_size)
+
+    async def list_page(self, columns: List[str], after: Optional[Tuple[str, str]], limit: int) -> List[dict]:
+        """Like the other list_page methods; the "users" column selects the owner's username."""
+        client = await get_supabase()
+        select = ", ".join("users(username)" if column == "users" else column for column in columns)
+        res = await _keyset_page(client.table("resumes").select(select), after, limit).execute()
+        return res.data or []
+
+
+class SearchRepository:
+
+    async def keyword_search(self, user_query: str, num_profiles: int) -> List[dict]:
+        client = await get_supabase()
+        res = await client.rpc("keyword_search_profile", {
+            "user_query": user_query,
+            "snippets_per_search": num_profiles
+        }).execute()
+        return res.data or []
+
+    async def vector_search(self, query_embedding: List[float], match_threshold: float, num_profiles: int) -> List[dict]:
+        client = await get_supabase()
+        res = await client.rpc("vector_search_profile", {
+            "query_embedding": query_embedding,
+            "match_threshold": match_threshold,
+            "snippets_per_search": num_profiles
+        }).execute()
+        return res.data or []
+
+
+class Repository:
+    """Async data access for every table and search RPC used by the routes."""
+
+    def __init__(self):
+        self.users = UserRepository()
+        self.tasks = TaskRepository()
+        self.resumes = ResumeRepository()
+        self.search = SearchRepository()
+
+
+_repository: Optional[Repository] = None
+
+
+def get_repository() -> Repository:
+    """
+    Return the active repository: Supabase by default, or the in-memory stand-in
+    when `USE_MEMORY_DB=true`, so the API can run without a live Supabase project.
+    """
+    global _repository
+    if _repository is None:
+        if json.loads(os.getenv("USE_MEMORY_DB", "false").lower()):
+            from app.services.memory_repository import MemoryRepository
+            _repository = MemoryRepository()
+        else:
+            _repository = Repository()
+    return _repository
+
+
+def set_repository(repository: Optional[Repository]) -> None:
+    """Replace the active repository, e.g. with a MemoryRepository in tests. `None` resets it."""
+    global _repository
+    _repository = repository
@@ -0,0 +1,92 @@
+import re
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional
+import numpy as np
+from app.services.cache import CACHE_HITS, CACHE_MISSES, CACHE_EVICTIONS, CACHE_SIZE
+
+
+def normalize_title(title: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", title.lower()).split())
+
+
+class SemanticResponseCache:
+    """
+    Response cache looked up first by exact normalized text, then by cosine similarity
+    of the text embedding against every cached entry.
+
+    Args:
+        name (str): Cache name, used as the `cache` label of the Prometheus metrics.
+        maxsize (int): Maximum number of entries kept before the least recently used one is evicted.
+        ttl (float): Time to live of an entry in seconds.
+        similarity_threshold (float): Minimum cosine similarity for a semantic hit.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float, similarity_threshold: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self._entries: "OrderedDict[str, tuple[Optional[np.ndarray], Any, float]]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_keys: List[str] = []
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired = [key for key, (_, _, expires_at) in self._entries.items() if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+            CACHE_EVICTIONS.labels(cache=self.name, reason="expired").inc()
+        if expired:
+            self._matrix = None
+
+    def get_exact(self, text: str) -> Any:
+        self._evict_expired()
+        entry = self._entries.get(normalize_title(text))
+        if entry is None:
+            CACHE_MISSES.labels(cache=f"{self.name}_exact").inc()
+            return None
+        self._entries.move_to_end(normalize_title(text))
+        CACHE_HITS.labels(cache=f"{self.name}_exact").inc()
+        return entry[1]
+
+    def get_similar(self, embedding: List[float]) -> Any:
+        """Return the response of the most similar cached entry above the threshold, or None."""
+        self._evict_expired()
+        if self._matrix is None:
+            self._matrix_keys = [key for key, (vector, _, _) in self._entries.items() if vector is not None]
+            self._matrix = np.stack([self._entries[key][0] for key in self._matrix_keys]) if self._matrix_keys else None
+        if self._matrix is None:
+            CACHE_MISSES.labels(cache=f"{self.name}_semantic").inc()
+            return None
+
+        similarities = self._matrix @ _unit(embedding)
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            CACHE_MISSES.labels(cache=f"{self.name}_semantic").inc()
+            return None
+        key = self._matrix_keys[best]
+        self._entries.move_to_end(key)
+        CACHE_HITS.labels(cache=f"{self.name}_semantic").inc()
+        return self._entries[key][1]
+
+    def set(self, text: str, response: Any, embedding: Optional[List[float]] = None) -> None:
+        vector = _unit(embedding) if embedding is not None else None
+        self._entries[normalize_title(text)] = (vector, response, time.monotonic() + self.ttl)
+        self._entries.move_to_end(normalize_title(text))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            CACHE_EVICTIONS.labels(cache=self.name, reason="size").inc()
+        self._matrix = None
+        CACHE_SIZE.labels(cache=self.name).set(len(self._entries))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._matrix = None
+        CACHE_SIZE.labels(cache=self.name).set(0)
+
+
+def _unit(embedding: List[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
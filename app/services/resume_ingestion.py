@@ -0,0 +1,199 @@
+import asyncio
+import hashlib
+import os
+import time
+from datetime import datetime, timezone
+from io import BytesIO
+from typing import BinaryIO, Union
+import httpx
+from botocore.exceptions import ConnectionError as BotocoreConnectionError
+from fastapi.concurrency import run_in_threadpool
+from groq import APIConnectionError, APITimeoutError, RateLimitError
+from app.services.ai_services import profile_task_generator_agent, profile_skills_generator_agent, embeddings_model
+from app.services.embedding_cache import normalize_text
+from app.services.etags import resume_versions
+from app.services.jobs import ResumeJobQueue, ResumeJobStore
+from app.services.pdf_extraction import check_pdf_size, extract_pdf_text
+from app.services.repository import get_repository
+from app.services.keyword_index import keyword_index
+from app.services.staffing import staffing_suggestions
+from app.services.vector_index import vector_index
+from app.services.s3_bucket import S3_UPLOAD_CHUNK_SIZE, upload_stream
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Failures worth retrying in the background queue; anything else (e.g. an unreadable PDF) fails the job
+TRANSIENT_ERRORS = (TimeoutError, ConnectionError, httpx.TransportError, BotocoreConnectionError,
+                    APIConnectionError, APITimeoutError, RateLimitError)
+
+
+async def timed_stage(stage: str, timings: dict, awaitable):
+    """Await `awaitable` and record its duration in seconds under `timings[stage]`."""
+    start_time = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[stage] = round(time.perf_counter() - start_time, 4)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(fileobj: BinaryIO) -> str:
+    """SHA-256 of a file object read in chunks, leaving it rewound to the start."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: fileobj.read(S3_UPLOAD_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+class StreamingUpload:
+    """
+    Streams a file object to S3 in a worker thread and tees the bytes it reads into a
+    buffer for the PDF parser, so the parser can start as soon as the file has been read
+    while the remaining parts are still uploading.
+
+    The buffer is capped at PDF_MAX_BYTES: a larger file aborts the upload with
+    PdfTooLargeError as soon as the limit is crossed.
+    """
+
+    def __init__(self, fileobj: BinaryIO, key: str):
+        self._loop = asyncio.get_running_loop()
+        self._file_read = self._loop.create_future()
+        self._buffer = bytearray()
+        self.task = asyncio.create_task(run_in_threadpool(upload_stream, fileobj, key, "application/pdf", self._on_chunk))
+
+    def _on_chunk(self, chunk: bytes) -> None:
+        if chunk:
+            self._buffer.extend(chunk)
+            check_pdf_size(len(self._buffer))
+        else:
+            self._loop.call_soon_threadsafe(self._file_read.set_result, self._buffer)
+
+    async def read(self) -> bytearray:
+        """Wait until the whole file has been read, re-raising the upload error if it failed first."""
+        await asyncio.wait({self._file_read, self.task}, return_when=asyncio.FIRST_COMPLETED)
+        if not self._file_read.done():
+            self.task.result()
+        return self._file_read.result()
+
+
+async def extract_profile(resume_text: str, timings: dict) -> dict:
+    """Run the skills and tasks agents on the resume text and embed the tasks."""
+    async def extract_skills():
+        profile_skills_response = await timed_stage("skills_extraction", timings, profile_skills_generator_agent.ainvoke({
+            "messages": f"Extract keywords from the resume: \n{resume_text}"
+        }))
+        return profile_skills_response["messages"][-1].content
+
+    async def extract_tasks_and_embed():
+        profile_tasks_response = await timed_stage("tasks_extraction", timings, profile_task_generator_agent.ainvoke({
+            "messages": f"Generate task based on the resume: \n{resume_text}"
+        }))
+        semantic_response = profile_tasks_response["messages"][-1].content
+        # Embed as soon as the task list exists, without waiting for the skills extraction
+        embedding = await timed_stage("embedding", timings, embeddings_model.aembed_query(semantic_response))
+        return semantic_response, embedding
+
+    sparse_response, (semantic_response, embedding) = await asyncio.gather(extract_skills(), extract_tasks_and_embed())
+    return {"profile_skills": sparse_response, "profile_tasks": semantic_response, "embedding": embedding}
+
+
+async def ingest_resume(user_id: str, filename: str, file: Union[bytes, BinaryIO]) -> dict:
+    """
+    Upload a PDF resume to S3, extract its skills and tasks with the agents, embed the
+    tasks and store everything in the resumes table.
+
+    Identical uploads are recognised by the SHA-256 of the file and of its normalized
+    text: re-uploading the stored file is a no-op, and a file or text already processed
+    for any user reuses that row's extraction and embedding instead of calling the LLMs.
+
+    Args:
+        user_id (str): Owner of the resume.
+        filename (str): Uploaded file name, used for the S3 key extension.
+        file (bytes | BinaryIO): The PDF, either in memory or as a file object (e.g. the
+            UploadFile spool) that is streamed to S3 without being read whole up front.
+
+    Returns:
+        dict: The stored `s3_key`, `profile_skills` and `profile_tasks`.
+    """
+    file_extension = filename.split(".")[-1].lower()
+    s3_key = f"resumes/{user_id}/{user_id}.{file_extension}"
+    if isinstance(file, (bytes, bytearray)):
+        file = BytesIO(file)
+    file_hash = await run_in_threadpool(hash_file, file)
+    resumes = get_repository().resumes
+    timings = {}
+    start_time = time.perf_counter()
+
+    existing = await resumes.get_by_user(user_id)
+    if existing and existing.get("content_hash") == file_hash and existing.get("s3_key") == s3_key:
+        logger.info("resume_ingestion_deduplicated", match="unchanged")
+        return {"s3_key": s3_key,
+                "profile_skills": existing["profile_skills"],
+                "profile_tasks": existing["profile_tasks"]}
+    if existing and existing.get("content_hash"):
+        # The upload below overwrites the stored object before the new row is saved; if the
+        # ingest then fails, the old hash must no longer vouch for what is in S3
+        await resumes.clear_content_hash(user_id)
+
+    # The upload runs in a worker thread while the PDF is parsed and the agents run
+    streaming_upload = StreamingUpload(file, s3_key)
+    upload = asyncio.create_task(timed_stage("s3_upload", timings, streaming_upload.task))
+
+    try:
+        match = "content"
+        profile = await resumes.find_by_hash("content_hash", file_hash)
+        if profile is None:
+            resume_text = await timed_stage("pdf_parse", timings, extract_pdf_text(await streaming_upload.read()))
+            text_hash = content_hash(normalize_text(resume_text).encode("utf-8"))
+            match = "text"
+            profile = await resumes.find_by_hash("text_hash", text_hash)
+            if profile is None:
+                match = None
+                profile = {**await extract_profile(resume_text, timings), "text_hash": text_hash}
+        await upload
+    finally:
+        if not upload.done():
+            upload.cancel()
+
+    create_response = await resumes.upsert({
+        "user_id": user_id,
+        "s3_key": s3_key,
+        "profile_skills": profile["profile_skills"],
+        "profile_tasks": profile["profile_tasks"],
+        "embedding": profile["embedding"],
+        "content_hash": file_hash,
+        "text_hash": profile["text_hash"],
+        "updated_at": datetime.now(timezone.utc).isoformat()})
+
+    if not create_response:
+        logger.error(reason="Failed to save resume snippet in database")
+        raise Exception("Failed to save resume snippet")
+    vector_index.upsert(create_response)
+    keyword_index.upsert(create_response)
+    staffing_suggestions.invalidate()
+    resume_versions.invalidate(user_id)
+    if match:
+        logger.info("resume_ingestion_deduplicated", match=match)
+    logger.info("resume_ingestion_completed", stage_durations=timings,
+                duration_seconds=round(time.perf_counter() - start_time, 4))
+
+    return {"s3_key": s3_key,
+            "profile_skills": profile["profile_skills"],
+            "profile_tasks": profile["profile_tasks"]}
+
+
+resume_job_queue = ResumeJobQueue(
+    ResumeJobStore(os.getenv("RESUME_JOBS_DB_PATH", "cache/resume_jobs.sqlite3"),
+                   lease_seconds=float(os.getenv("RESUME_JOB_LEASE_SECONDS", "60"))),
+    handler=ingest_resume,
+    workers=int(os.getenv("RESUME_JOB_WORKERS", "2")),
+    max_pending=int(os.getenv("RESUME_JOB_QUEUE_SIZE", "50")),
+    max_attempts=int(os.getenv("RESUME_JOB_MAX_ATTEMPTS", "3")),
+    retry_delay=float(os.getenv("RESUME_JOB_RETRY_DELAY_SECONDS", "5")),
+    transient_errors=TRANSIENT_ERRORS,
+)
@@ -1,67 +1,222 @@
-from app.services.ai_services import embeddings_model
-from app.services.supabase_client import supabase
+import asyncio
+import heapq
+import os
+import time
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from fastapi.concurrency import run_in_threadpool
+from app.services.embeddings import query_embedder
+from app.services.repository import get_repository
+from app.services.keyword_index import keyword_index, tokenize
+from app.services.usernames import resolve_usernames
+from app.services.vector_index import vector_index
 from app.logging_config import get_logger
 
 logger = get_logger(__name__)
 
-def apply_rrf(profiles_list: list, weights: list = None, k: int = 60):
-    logger.info("apply_rrf", info="Starting RRF")
-    scores_dict = {}
-    all_profiles = {}
-    for profiles in profiles_list:
-        for idx, profile in enumerate(profiles):
+HYBRID_SEARCH_CONCURRENCY = int(os.getenv("HYBRID_SEARCH_CONCURRENCY", "6"))
+HYBRID_SEARCH_TIMEOUT_SECONDS = float(os.getenv("HYBRID_SEARCH_TIMEOUT_SECONDS", "10"))
+# Total result entries from which apply_rrf sums the contributions with NumPy
+RRF_ARRAY_THRESHOLD = int(os.getenv("RRF_ARRAY_THRESHOLD", "2048"))
+SNIPPET_MAX_CHARS = 200
+VECTOR_MATCH_THRESHOLD = 0.3
+
+def _rrf_rank(scores: Dict[str, float], top_k: Optional[int]) -> List[Tuple[str, float]]:
+    if top_k is not None and top_k < len(scores):
+        # Same order as the full sort (ties keep first-seen order), without sorting every candidate
+        return heapq.nlargest(top_k, scores.items(), key=itemgetter(1))
+    return sorted(scores.items(), key=itemgetter(1), reverse=True)
+
+
+def _rrf_rank_array(profiles_list: list, list_weights: List[float], k: int, top_k: Optional[int],
+                    profiles: Dict[str, dict]) -> List[Tuple[str, float]]:
+    codes = {}
+    entry_codes = []
+    for ranked_profiles in profiles_list:
+        for profile in ranked_profiles:
+            profile_id = profile["id"]
+            if profile_id not in codes:
+                codes[profile_id] = len(codes)
+                profiles[profile_id] = profile
+            entry_codes.append(codes[profile_id])
+    contributions = np.concatenate([weight / (k + np.arange(len(ranked_profiles), dtype=np.float64))
+                                    for ranked_profiles, weight in zip(profiles_list, list_weights)])
+    scores = np.bincount(np.asarray(entry_codes, dtype=np.intp), weights=contributions, minlength=len(codes))
+    candidates = np.arange(len(codes))
+    if top_k is not None and top_k < len(codes):
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        # argpartition keeps no order among ties at the cut, widen to every candidate tied with the k-th score
+        candidates = np.flatnonzero(scores >= scores[candidates].min())
+    # Highest score first, ties in first-seen order
+    ordered = candidates[np.lexsort((candidates, -scores[candidates]))][:top_k]
+    profile_ids = list(codes)
+    return [(profile_ids[code], float(scores[code])) for code in ordered]
+
+
+def apply_rrf(profiles_list: list, weights: Optional[List[float]] = None, k: int = 60,
+              top_k: Optional[int] = None) -> List[Tuple[dict, float]]:
+    """
+    Fuse ranked result lists with reciprocal rank fusion: a profile at (0-based) rank r
+    of list i contributes weights[i] / (k + r), summed over every list it appears in.
+
+    Small inputs are scored with a dict; once the lists hold RRF_ARRAY_THRESHOLD entries
+    or more, the contributions are summed with NumPy instead. Both give the same order.
+
+    Args:
+        profiles_list (list): Ranked lists of profiles, each profile identified by its "id".
+        weights (List[float]): One weight per list, default 1.0 for all.
+        k (int): RRF damping constant.
+        top_k (int): Only return the best `top_k` profiles, selected without a full sort.
+
+    Returns:
+        List[Tuple[dict, float]]: (profile, fused score) pairs, highest score first, ties in
+        first-seen order.
+    """
+    if weights is None:
+        weights = [1.0] * len(profiles_list)
+    elif len(weights) != len(profiles_list):
+        raise ValueError(f"Got {len(weights)} weights for {len(profiles_list)} result lists")
+    if top_k is not None and top_k <= 0:
+        return []
+
+    profiles = {}
+    total_entries = sum(len(ranked_profiles) for ranked_profiles in profiles_list)
+    if total_entries >= RRF_ARRAY_THRESHOLD:
+        ranked = _rrf_rank_array(profiles_list, weights, k, top_k, profiles)
+    else:
+        scores = {}
+        for ranked_profiles, weight in zip(profiles_list, weights):
+            for rank, profile in enumerate(ranked_profiles):
                 profile_id = profile["id"]
-                score = 1 / (k + idx)
-                if profile_id in scores_dict:
-                    if weights:
-                        scores_dict[profile_id] += score * weights[idx]
-                    else:
-                        scores_dict[profile_id] += score
-                else:
-                    if weights:
-                        scores_dict[profile_id] = score * weights[idx]
-                    else:
-                        scores_dict[profile_id] = score
-                    all_profiles[profile_id] = profile
-    logger.info("Finished calculating RRF", scores=scores_dict)
-    sorted_profiles = sorted(scores_dict.items(), key=lambda x: x[1], reverse=True)
-    final_profiles = [all_profiles[profile_id] for profile_id, score in sorted_profiles]
-    return final_profiles
-
-def vector_search(user_query: str, num_profiles: int):
+                if profile_id not in scores:
+                    scores[profile_id] = 0.0
+                    profiles[profile_id] = profile
+                scores[profile_id] += weight / (k + rank)
+        ranked = _rrf_rank(scores, top_k)
+    logger.debug("apply_rrf", total_lists=len(profiles_list), total_entries=total_entries, total_profiles=len(profiles))
+    return [(profiles[profile_id], score) for profile_id, score in ranked]
+
+async def vector_search(user_query: str, num_profiles: int, query_embedding: list = None):
     logger.info("vector_search", info="Starting vector search", query=user_query)
-    query_embedding = embeddings_model.embed_query(user_query)
-    result = supabase.rpc('vector_search_profile', {
-                'query_embedding': query_embedding,
-                'match_threshold': 0.3,
-                'snippets_per_search': num_profiles
-            }).execute()
-    if not result.data:
+    if query_embedding is None:
+        query_embedding = (await query_embedder.embed_queries([user_query]))[0]
+    if vector_index.ready:
+        # The local index answers in-process, the matrix product runs in a worker thread
+        result = await run_in_threadpool(vector_index.search, query_embedding, VECTOR_MATCH_THRESHOLD, num_profiles)
+    else:
+        result = await get_repository().search.vector_search(query_embedding, match_threshold=VECTOR_MATCH_THRESHOLD, num_profiles=num_profiles)
+    if not result:
         logger.info("No results found for vector search", query=user_query)
-    return result.data if result.data else []
+    return result
 
 
-def keyword_search(user_query: str, num_profiles: int):
+async def keyword_search(user_query: str, num_profiles: int):
     logger.info("Starting keyword search", query=user_query)
-    result = supabase.rpc('keyword_search_profile', {
-                'user_query': user_query,
-                'snippets_per_search': num_profiles
-            }).execute()
-    if not result.data:
+    if keyword_index.ready:
+        result = (await run_in_threadpool(keyword_index.search_many, [user_query], num_profiles))[0]
+    else:
+        result = await get_repository().search.keyword_search(user_query, num_profiles)
+    if not result:
         logger.info("No results found for keyword search", query=user_query)
-    return result.data if result.data else []
+    return result
+
+
+async def _search_branch(search_type: str, search_fn, query: str, num_profiles: int, semaphore: asyncio.Semaphore):
+    """Run one search under the concurrency cap and timeout. Returns (profiles, error)."""
+    async with semaphore:
+        start_time = time.perf_counter()
+        try:
+            profiles = await asyncio.wait_for(search_fn(query, num_profiles), timeout=HYBRID_SEARCH_TIMEOUT_SECONDS)
+        except Exception as e:
+            error = "timeout" if isinstance(e, asyncio.TimeoutError) else str(e)
+            logger.warning("hybrid_search_branch_failed", search_type=search_type, query=query,
+                           duration_seconds=round(time.perf_counter() - start_time, 4), error=error)
+            return [], e
+        logger.info("hybrid_search_branch_completed", search_type=search_type, query=query,
+                    duration_seconds=round(time.perf_counter() - start_time, 4), total_profiles=len(profiles))
+        return profiles, None
+
 
+def _snippet(text: str, query: str) -> str:
+    """The line of `text` sharing the most words with `query` (the first line if none do)."""
+    query_terms = set(tokenize(query))
+    lines = [line.strip() for line in (text or "").splitlines() if line.strip()] or [""]
+    best_line = max(lines, key=lambda line: len(query_terms.intersection(tokenize(line))))
+    return best_line[:SNIPPET_MAX_CHARS]
 
-def multi_query_hybrid_search(keyword_search_queries: list, vector_search_queries: list, num_profiles):
+
+async def enrich_profiles(fused_profiles: List[Tuple[dict, float]], searches: List[Tuple[str, str]],
+                          profiles_list: List[list]) -> List[dict]:
+    """
+    Turn fused (profile, score) pairs into the records returned by the API: user id,
+    username, fused score and, for every search that returned the profile, its rank
+    and the profile line that best matches the query.
+
+    Usernames come from the search RPCs, which join the users table, or else from the
+    username cache. Profiles whose user no longer exists are dropped.
+
+    Args:
+        fused_profiles (List[Tuple[dict, float]]): apply_rrf output.
+        searches (List[Tuple[str, str]]): (search type, query) of each result list.
+        profiles_list (List[list]): The result lists that were fused, in the order of `searches`.
+    """
+    matches = {profile["id"]: [] for profile, _ in fused_profiles}
+    for (search_type, query), profiles in zip(searches, profiles_list):
+        for rank, profile in enumerate(profiles):
+            if profile["id"] in matches:
+                field = "profile_skills" if search_type == "keyword" else "profile_tasks"
+                matches[profile["id"]].append({"search_type": search_type, "query": query, "rank": rank + 1,
+                                               "snippet": _snippet(profile.get(field), query)})
+
+    usernames = {profile["user_id"]: profile["username"] for profile, _ in fused_profiles if profile.get("username")}
+    missing = [profile["user_id"] for profile, _ in fused_profiles if profile["user_id"] not in usernames]
+    if missing:
+        usernames.update(await resolve_usernames(missing))
+
+    return [{"id": profile["user_id"],
+             "username": usernames[profile["user_id"]],
+             "resume_id": profile["id"],
+             "score": score,
+             "matches": matches[profile["id"]]}
+            for profile, score in fused_profiles if profile["user_id"] in usernames]
+
+
+async def multi_query_hybrid_search(keyword_search_queries: list, vector_search_queries: list, num_profiles):
     logger.info("Starting hybrid search", keyword_search_queries=keyword_search_queries, vector_search_queries=vector_search_queries)
-    profiles_result = []
-    for query in keyword_search_queries:
-        profiles = keyword_search(query, num_profiles)
-        profiles_result.append(profiles)
-    for query in vector_search_queries:
-        profiles = vector_search(query, num_profiles)
-        profiles_result.append(profiles)
-    relevant_profiles = apply_rrf(profiles_result)
-    logger.info("Finished hybrid search", total_profiles=len(relevant_profiles))
-    finalized_profiles = relevant_profiles[:num_profiles]
-    return finalized_profiles
\ No newline at end of file
+    start_time = time.perf_counter()
+    # Embed every vector query in one batched call, the vector RPCs then reuse the precomputed vectors
+    query_embeddings = asyncio.ensure_future(query_embedder.embed_queries(vector_search_queries)) if vector_search_queries else None
+
+    async def embedded_vector_search(query: str, num_profiles: int):
+        embeddings = await asyncio.shield(query_embeddings)
+        return await vector_search(query, num_profiles, query_embedding=embeddings[vector_search_queries.index(query)])
+
+    # With the local keyword index every keyword query is scored in a single pass
+    keyword_results = None
+    if keyword_index.ready and keyword_search_queries:
+        keyword_results = asyncio.ensure_future(run_in_threadpool(keyword_index.search_many, keyword_search_queries, num_profiles))
+
+    async def indexed_keyword_search(query: str, num_profiles: int):
+        results = await asyncio.shield(keyword_results)
+        return results[keyword_search_queries.index(query)]
+
+    semaphore = asyncio.Semaphore(HYBRID_SEARCH_CONCURRENCY)
+    keyword_search_fn = indexed_keyword_search if keyword_results is not None else keyword_search
+    branches = [_search_branch("keyword", keyword_search_fn, query, num_profiles, semaphore) for query in keyword_search_queries]
+    branches += [_search_branch("vector", embedded_vector_search, query, num_profiles, semaphore) for query in vector_search_queries]
+    results = await asyncio.gather(*branches)
+    if query_embeddings is not None and not query_embeddings.done():
+        query_embeddings.cancel()
+
+    # Keep the partial results of the branches that succeeded, fail only if nothing came back
+    errors = [error for _, error in results if error is not None]
+    if results and len(errors) == len(results):
+        raise errors[0]
+    profiles_result = [profiles for profiles, _ in results]
+    relevant_profiles = apply_rrf(profiles_result, top_k=num_profiles)
+    searches = [("keyword", query) for query in keyword_search_queries] + [("vector", query) for query in vector_search_queries]
+    finalized_profiles = await enrich_profiles(relevant_profiles, searches, profiles_result)
+    logger.info("Finished hybrid search", total_profiles=len(finalized_profiles), failed_branches=len(errors),
+                duration_seconds=round(time.perf_counter() - start_time, 4))
+    return finalized_profiles
@@ -1,6 +1,7 @@
 import boto3
 from dotenv import load_dotenv
 import os
+from typing import BinaryIO, Callable, Optional
 
 load_dotenv()
 
@@ -10,4 +11,57 @@ s3_client = boto3.client("s3",
     region_name=os.getenv("AWS_REGION")
 )
 
-BUCKET_NAME = os.getenv("AWS_BUCKET_NAME")
\ No newline at end of file
+BUCKET_NAME = os.getenv("AWS_BUCKET_NAME")
+
+# Files larger than one chunk go through a multipart upload; S3 parts must be at least 5 MiB
+S3_UPLOAD_CHUNK_SIZE = max(int(os.getenv("S3_UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024))), 5 * 1024 * 1024)
+
+
+def upload_stream(fileobj: BinaryIO, key: str, content_type: str,
+                  on_chunk: Optional[Callable[[bytes], None]] = None) -> int:
+    """
+    Upload `fileobj` to the bucket in S3_UPLOAD_CHUNK_SIZE chunks without reading it whole.
+
+    A file that fits in one chunk is sent with a single put_object; anything larger is
+    sent as a multipart upload, which is aborted if reading or uploading fails. At most
+    two chunks (the part being sent and the one read ahead) are held at a time.
+    Blocking: call it from a worker thread.
+
+    Args:
+        fileobj (BinaryIO): Source, read sequentially from its current position.
+        key (str): Object key in BUCKET_NAME.
+        content_type (str): Content-Type stored with the object.
+        on_chunk (Callable): Called with every chunk as it is read, then with b"" at end of file.
+            Exceptions it raises abort the upload.
+
+    Returns:
+        int: Number of bytes uploaded.
+    """
+    def read_chunk() -> bytes:
+        chunk = fileobj.read(S3_UPLOAD_CHUNK_SIZE)
+        if on_chunk:
+            on_chunk(chunk)
+        return chunk
+
+    chunk = read_chunk()
+    next_chunk = read_chunk() if chunk else b""
+    if not next_chunk:
+        s3_client.put_object(Bucket=BUCKET_NAME, Key=key, Body=chunk, ContentType=content_type)
+        return len(chunk)
+
+    upload_id = s3_client.create_multipart_upload(Bucket=BUCKET_NAME, Key=key, ContentType=content_type)["UploadId"]
+    parts = []
+    size = 0
+    try:
+        while chunk:
+            part = s3_client.upload_part(Bucket=BUCKET_NAME, Key=key, UploadId=upload_id,
+                                         PartNumber=len(parts) + 1, Body=chunk)
+            parts.append({"ETag": part["ETag"], "PartNumber": len(parts) + 1})
+            size += len(chunk)
+            chunk, next_chunk = next_chunk, (read_chunk() if next_chunk else b"")
+        s3_client.complete_multipart_upload(Bucket=BUCKET_NAME, Key=key, UploadId=upload_id,
+                                            MultipartUpload={"Parts": parts})
+    except BaseException:
+        s3_client.abort_multipart_upload(Bucket=BUCKET_NAME, Key=key, UploadId=upload_id)
+        raise
+    return size
@@ -0,0 +1,146 @@
+import asyncio
+import json
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from app.services.cache import TTLCache
+from app.services.query_variations import get_query_variations, query_variations_key
+from app.services.retrieval import multi_query_hybrid_search
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+STAFFING_PRECOMPUTE = json.loads(os.getenv("STAFFING_PRECOMPUTE", "false").lower())
+STAFFING_WORKERS = int(os.getenv("STAFFING_WORKERS", "2"))
+STAFFING_MAX_PENDING = int(os.getenv("STAFFING_MAX_PENDING", "100"))
+STAFFING_CACHE_SIZE = int(os.getenv("STAFFING_CACHE_SIZE", "1024"))
+STAFFING_CACHE_TTL_SECONDS = float(os.getenv("STAFFING_CACHE_TTL_SECONDS", "600"))
+STAFFING_NUM_PROFILES = 3
+
+
+async def compute_staffing_suggestions(title: str, description: str) -> List[dict]:
+    """Generate the search queries for a task and return the best matching profiles."""
+    variations = await get_query_variations(title, description)
+    return await multi_query_hybrid_search(keyword_search_queries=variations["keyword_search_queries"],
+                                           vector_search_queries=variations["task_search_queries"],
+                                           num_profiles=STAFFING_NUM_PROFILES)
+
+
+class StaffingSuggestions:
+    """
+    Staffing suggestions per task content, computed on demand or ahead of time by a
+    bounded pool of asyncio workers.
+
+    Suggestions are keyed like the query variations (title, description, prompt version)
+    and expire after `ttl`. `invalidate` drops them all when resumes change; a computation
+    that was already running when that happened is not stored.
+
+    Pending recomputes are deduplicated per task id: scheduling a task that is still
+    waiting only replaces its title and description. Concurrent computations of the
+    same suggestions, from requests or workers, share one call to `compute`.
+
+    Args:
+        compute (Callable): Coroutine function called with (title, description), returning the suggestions.
+        workers (int): Recomputes run concurrently.
+        max_pending (int): Tasks waiting for a recompute; further tasks are dropped until the backlog drains.
+        maxsize (int): Suggestions kept.
+        ttl (float): Seconds a suggestion is served for.
+        enabled (bool): Whether `schedule` queues recomputes at all.
+    """
+
+    def __init__(self, compute: Callable[[str, str], Awaitable[List[dict]]], workers: int, max_pending: int,
+                 maxsize: int, ttl: float, enabled: bool):
+        self.compute = compute
+        self.workers = workers
+        self.max_pending = max_pending
+        self.enabled = enabled
+        self._results = TTLCache("staffing_suggestions", maxsize=maxsize, ttl=ttl)
+        self._pending: Dict[str, Tuple[str, str]] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._generation = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def get(self, title: str, description: str) -> Optional[List[dict]]:
+        return self._results.get(query_variations_key(title, description))
+
+    async def get_or_compute(self, title: str, description: str) -> List[dict]:
+        key = query_variations_key(title, description)
+        suggestions = self._results.get(key)
+        if suggestions is not None:
+            return suggestions
+
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._compute(key, title, description))
+            self._in_flight[key] = future
+
+            def forget(done: asyncio.Future) -> None:
+                # `invalidate` may have let a newer computation take the key
+                if self._in_flight.get(key) is done:
+                    del self._in_flight[key]
+
+            future.add_done_callback(forget)
+        return await asyncio.shield(future)
+
+    async def _compute(self, key: str, title: str, description: str) -> List[dict]:
+        generation = self._generation
+        suggestions = await self.compute(title, description)
+        if generation == self._generation:
+            self._results.set(key, suggestions)
+        return suggestions
+
+    def invalidate(self) -> None:
+        """Forget every suggestion, e.g. after a resume was added, replaced or removed."""
+        self._generation += 1
+        self._results.clear()
+        # Computations already running keep their callers but aren't joined by new ones
+        self._in_flight.clear()
+
+    def schedule(self, task_id: str, title: str, description: str) -> None:
+        if not self.enabled or self._wakeup is None:
+            return
+        if task_id not in self._pending and len(self._pending) >= self.max_pending:
+            logger.warning(reason="Staffing recompute backlog is full, skipping task", task_id=task_id)
+            return
+        self._pending[task_id] = (title, description)
+        self._wakeup.set()
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._wakeup = None
+        self._pending.clear()
+
+    async def _worker(self) -> None:
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            task_id = next(iter(self._pending))
+            title, description = self._pending.pop(task_id)
+            start_time = time.perf_counter()
+            try:
+                await self.get_or_compute(title, description)
+            except Exception as e:
+                logger.warning(reason="Staffing recompute failed", task_id=task_id, error=str(e))
+            else:
+                logger.info("staffing_recompute_completed", task_id=task_id,
+                            duration_seconds=round(time.perf_counter() - start_time, 4))
+
+
+staffing_suggestions = StaffingSuggestions(
+    compute_staffing_suggestions,
+    workers=STAFFING_WORKERS,
+    max_pending=STAFFING_MAX_PENDING,
+    maxsize=STAFFING_CACHE_SIZE,
+    ttl=STAFFING_CACHE_TTL_SECONDS,
+    enabled=STAFFING_PRECOMPUTE,
+)
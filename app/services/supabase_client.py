@@ -1,14 +1,47 @@
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from supabase import create_client, Client
+from typing import Optional
+import httpx
+from supabase import acreate_client, AsyncClient, AsyncClientOptions
 from dotenv import load_dotenv
 import os
-from pydantic import BaseModel
 
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-    
\ No newline at end of file
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "50"))
+SUPABASE_TIMEOUT_SECONDS = float(os.getenv("SUPABASE_TIMEOUT_SECONDS", "30"))
+
+_http_client: Optional[httpx.AsyncClient] = None
+_supabase: Optional[AsyncClient] = None
+
+
+async def get_supabase() -> AsyncClient:
+    """
+    Return the process wide async Supabase client, creating it on first use.
+
+    Every PostgREST call goes through one pooled httpx.AsyncClient, so connections
+    are kept alive and reused across requests instead of being opened per query.
+    """
+    global _http_client, _supabase
+    if _supabase is None:
+        http_client = httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            timeout=SUPABASE_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=SUPABASE_MAX_CONNECTIONS,
+                                max_keepalive_connections=SUPABASE_MAX_CONNECTIONS),
+        )
+        client = await acreate_client(SUPABASE_URL, SUPABASE_KEY, options=AsyncClientOptions(httpx_client=http_client))
+        if _supabase is None:
+            _http_client, _supabase = http_client, client
+        else:
+            await http_client.aclose()
+    return _supabase
+
+
+async def close_supabase() -> None:
+    global _http_client, _supabase
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client, _supabase = None, None
@@ -0,0 +1,154 @@
+import csv
+import io
+import math
+import os
+from typing import Awaitable, BinaryIO, Callable, Iterator, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+TASK_IMPORT_BATCH_SIZE = int(os.getenv("TASK_IMPORT_BATCH_SIZE", "500"))
+# Rows reported individually; further failures are only counted
+TASK_IMPORT_MAX_ERRORS = int(os.getenv("TASK_IMPORT_MAX_ERRORS", "1000"))
+
+# Header of "Sprint Project Estimation and Strategy.csv"
+STORY, TASK, ESTIMATE_MIN, ESTIMATE_MAX, ACTUAL, COMMENT = (
+    "Story", "Task", "Estimate Min (hr)", "Estimate Max (hr)", "Actual", "Comment")
+REQUIRED_COLUMNS = (STORY, TASK, ESTIMATE_MIN, ESTIMATE_MAX, ACTUAL)
+
+
+class TaskImportError(ValueError):
+    """Raised when the file is not a sprint estimation CSV at all, as opposed to a single bad row."""
+
+
+def _hours(row: dict, column: str) -> Optional[float]:
+    value = (row.get(column) or "").strip()
+    if not value:
+        return None
+    try:
+        hours = float(value)
+    except ValueError:
+        raise ValueError(f"{column} is not a number: {value!r}")
+    if not math.isfinite(hours) or hours < 0:
+        raise ValueError(f"{column} must be a non-negative number of hours")
+    return hours
+
+
+def parse_task_row(row: dict, user_id: Optional[str] = None) -> dict:
+    """
+    Map one CSV row to a task: the Task column is the title, Story and Comment the
+    description. total_minutes is the Actual hours when filled in, otherwise the
+    midpoint of the estimate range. Raises ValueError with the reason a row is rejected.
+    """
+    if None in row:
+        raise ValueError("Row has more columns than the header")
+    title = (row.get(TASK) or "").strip()
+    if not title:
+        raise ValueError(f"{TASK} is empty")
+
+    estimate_min, estimate_max, actual = _hours(row, ESTIMATE_MIN), _hours(row, ESTIMATE_MAX), _hours(row, ACTUAL)
+    if estimate_min is not None and estimate_max is not None and estimate_min > estimate_max:
+        raise ValueError(f"{ESTIMATE_MIN} is greater than {ESTIMATE_MAX}")
+    if actual is None:
+        if estimate_min is None or estimate_max is None:
+            raise ValueError(f"Either {ACTUAL} or both estimates are required")
+        actual = (estimate_min + estimate_max) / 2
+
+    description = "\n\n".join(part for part in ((row.get(STORY) or "").strip(), (row.get(COMMENT) or "").strip()) if part)
+    return {"title": title, "description": description, "total_minutes": actual * 60, "user_id": user_id,
+            "status": "created"}
+
+
+def iter_task_rows(fileobj: BinaryIO, user_id: Optional[str] = None) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Parse the CSV one record at a time, yielding (line, task, None) for valid rows and
+    (line, None, reason) for rejected ones. `line` is where the record ends in the file.
+    Blank rows and the sheet's "Total" row are skipped.
+    """
+    # utf-8-sig drops the byte order mark the sprint sheet export starts with
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        try:
+            header = reader.fieldnames or []
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise TaskImportError(f"Could not read the CSV header: {e}")
+        missing = [column for column in REQUIRED_COLUMNS if column not in header]
+        if missing:
+            raise TaskImportError(f"Missing columns: {', '.join(missing)}")
+
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except (UnicodeDecodeError, csv.Error) as e:
+                # The reader can't resynchronize after a broken record
+                yield reader.line_num, None, f"Could not parse the rest of the file: {e}"
+                return
+            if not any((value or "").strip() for value in row.values() if isinstance(value, str)):
+                continue
+            if (row.get(STORY) or "").strip().lower() == "total" and not (row.get(TASK) or "").strip():
+                # The spreadsheet's sum row
+                continue
+            try:
+                yield reader.line_num, parse_task_row(row, user_id), None
+            except ValueError as e:
+                yield reader.line_num, None, str(e)
+    finally:
+        # Leave the upload's file open for its owner
+        text.detach()
+
+
+def _next_batch(rows: Iterator, size: int) -> List[Tuple[int, Optional[dict], Optional[str]]]:
+    batch = []
+    for item in rows:
+        batch.append(item)
+        if len(batch) >= size:
+            break
+    return batch
+
+
+async def import_tasks(fileobj: BinaryIO, create_many: Callable[[List[dict]], Awaitable[List[dict]]],
+                       user_id: Optional[str] = None, batch_size: int = TASK_IMPORT_BATCH_SIZE) -> dict:
+    """
+    Insert the tasks of a sprint estimation CSV in batches of `batch_size` rows and
+    return {"imported", "failed", "errors": [{"line", "detail"}], "errors_truncated"}.
+
+    The file is read in the threadpool one batch at a time, so only one batch of
+    rows is held in memory. A failed insert is reported for every row of its batch.
+    """
+    rows = iter_task_rows(fileobj, user_id)
+    report = {"imported": 0, "failed": 0, "errors": [], "errors_truncated": False}
+
+    def fail(line: int, detail: str) -> None:
+        report["failed"] += 1
+        if len(report["errors"]) < TASK_IMPORT_MAX_ERRORS:
+            report["errors"].append({"line": line, "detail": detail})
+        else:
+            report["errors_truncated"] = True
+
+    while True:
+        batch = await run_in_threadpool(_next_batch, rows, batch_size)
+        if not batch:
+            break
+        valid = []
+        for line, task, error in batch:
+            if error is not None:
+                fail(line, error)
+            else:
+                valid.append((line, task))
+        if not valid:
+            continue
+        try:
+            created = await create_many([task for _, task in valid])
+        except Exception as e:
+            logger.warning(reason="Task import batch insert failed", error=str(e), rows=len(valid))
+            for line, _ in valid:
+                fail(line, f"Insert failed: {e}")
+            continue
+        report["imported"] += len(created)
+
+    logger.info("tasks_imported", imported=report["imported"], failed=report["failed"])
+    return report
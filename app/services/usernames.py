@@ -0,0 +1,30 @@
+import os
+from typing import Dict, List
+from app.services.cache import TTLCache
+from app.services.repository import get_repository
+
+USERNAME_CACHE_SIZE = int(os.getenv("USERNAME_CACHE_SIZE", "10000"))
+USERNAME_CACHE_TTL_SECONDS = float(os.getenv("USERNAME_CACHE_TTL_SECONDS", "3600"))
+
+# user id -> username; the users routes update it on create, update and delete
+username_cache = TTLCache("username", maxsize=USERNAME_CACHE_SIZE, ttl=USERNAME_CACHE_TTL_SECONDS)
+
+
+async def resolve_usernames(user_ids: List[str]) -> Dict[str, str]:
+    """
+    Map user ids to usernames from the cache, fetching only the misses in one query.
+    Ids of deleted users are left out.
+    """
+    usernames = {}
+    missing = []
+    for user_id in dict.fromkeys(user_ids):
+        username = username_cache.get(user_id)
+        if username is None:
+            missing.append(user_id)
+        else:
+            usernames[user_id] = username
+    if missing:
+        for user in await get_repository().users.get_usernames_ordered(missing):
+            username_cache.set(user["id"], user["username"])
+            usernames[user["id"]] = user["username"]
+    return usernames
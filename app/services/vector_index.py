@@ -0,0 +1,126 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+import numpy as np
+from app.services.repository import get_repository
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+VECTOR_INDEX_ENABLED = json.loads(os.getenv("VECTOR_INDEX_ENABLED", "false").lower())
+
+PROFILE_FIELDS = ("id", "user_id", "profile_skills", "profile_tasks")
+
+
+def _as_vector(embedding) -> np.ndarray:
+    """Unit-normalized float32 copy of an embedding; PostgREST returns pgvector columns as "[...]" strings."""
+    if isinstance(embedding, str):
+        embedding = json.loads(embedding)
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class VectorIndex:
+    """
+    In-process replacement for the vector_search_profile RPC: every resume embedding is a
+    unit-normalized row of one contiguous float32 matrix, so a query is a single
+    matrix-vector product followed by a partial sort.
+
+    Rows are keyed by user_id (one resume per user). Removal moves the last row into the
+    freed slot, and the matrix grows by doubling, so updates never rebuild the index.
+    Until `load` has run the index is not `ready` and updates are ignored; callers then
+    use the RPC.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._profiles: List[dict] = []
+        self._positions: Dict[str, int] = {}
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def load(self, rows: List[dict]) -> None:
+        """Replace the index contents with `rows` (resumes including their embedding)."""
+        rows = [row for row in rows if row.get("embedding") is not None]
+        vectors = [_as_vector(row["embedding"]) for row in rows]
+        with self._lock:
+            self._matrix = np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+            self._profiles = [{field: row.get(field) for field in PROFILE_FIELDS} for row in rows]
+            self._positions = {profile["user_id"]: position for position, profile in enumerate(self._profiles)}
+            self.ready = True
+
+    def upsert(self, row: dict) -> None:
+        """Add or replace the resume of `row["user_id"]`."""
+        if not self.ready or row.get("embedding") is None:
+            return
+        vector = _as_vector(row["embedding"])
+        profile = {field: row.get(field) for field in PROFILE_FIELDS}
+        with self._lock:
+            if self._matrix.shape[1] != vector.shape[0]:
+                if self._profiles:
+                    raise ValueError(f"Embedding has {vector.shape[0]} dimensions, the index has {self._matrix.shape[1]}")
+                self._matrix = np.empty((0, vector.shape[0]), dtype=np.float32)
+            position = self._positions.get(profile["user_id"])
+            if position is None:
+                position = len(self._profiles)
+                if position == self._matrix.shape[0]:
+                    grown = np.empty((max(16, 2 * position), self._matrix.shape[1]), dtype=np.float32)
+                    grown[:position] = self._matrix[:position]
+                    self._matrix = grown
+                self._profiles.append(profile)
+                self._positions[profile["user_id"]] = position
+            else:
+                self._profiles[position] = profile
+            self._matrix[position] = vector
+
+    def remove(self, user_id: str) -> None:
+        """Drop the resume of `user_id`, if indexed."""
+        if not self.ready:
+            return
+        with self._lock:
+            position = self._positions.pop(user_id, None)
+            if position is None:
+                return
+            last = len(self._profiles) - 1
+            if position != last:
+                self._matrix[position] = self._matrix[last]
+                self._profiles[position] = self._profiles[last]
+                self._positions[self._profiles[position]["user_id"]] = position
+            self._profiles.pop()
+
+    def search(self, query_embedding: List[float], match_threshold: float, num_profiles: int) -> List[dict]:
+        """Top `num_profiles` resumes by cosine similarity above `match_threshold`, best first."""
+        query = _as_vector(query_embedding)
+        with self._lock:
+            count = len(self._profiles)
+            if not count or num_profiles <= 0:
+                return []
+            similarities = self._matrix[:count] @ query
+            candidates = np.flatnonzero(similarities > match_threshold)
+            if len(candidates) > num_profiles:
+                candidates = candidates[np.argpartition(similarities[candidates], -num_profiles)[-num_profiles:]]
+            candidates = candidates[np.argsort(-similarities[candidates], kind="stable")]
+            return [{**self._profiles[position], "similarity": float(similarities[position])} for position in candidates]
+
+
+vector_index = VectorIndex()
+
+
+async def load_vector_index() -> None:
+    """Fill the index from the resumes table when VECTOR_INDEX_ENABLED; on failure searches keep using the RPC."""
+    if not VECTOR_INDEX_ENABLED:
+        return
+    start_time = time.perf_counter()
+    try:
+        vector_index.load(await get_repository().resumes.list_embeddings())
+    except Exception as e:
+        logger.error(reason="Failed to load the vector index, falling back to vector_search_profile", error=str(e))
+        return
+    logger.info("vector_index_loaded", total_profiles=len(vector_index),
+                duration_seconds=round(time.perf_counter() - start_time, 4))
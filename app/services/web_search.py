@@ -0,0 +1,88 @@
+import asyncio
+import os
+import time
+from typing import Callable, Dict, Optional
+from prometheus_client import Histogram
+from tavily import AsyncTavilyClient
+from app.services.cache import TTLCache
+from app.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+TAVILY_API_BASE_URL = os.getenv("TAVILY_API_BASE_URL", "https://api.tavily.com")
+TAVILY_SEARCH_DEPTH = os.getenv("TAVILY_SEARCH_DEPTH", "advanced")
+TAVILY_MAX_RESULTS = int(os.getenv("TAVILY_MAX_RESULTS", "3"))
+TAVILY_TIMEOUT_SECONDS = float(os.getenv("TAVILY_TIMEOUT_SECONDS", "30"))
+TAVILY_CACHE_SIZE = int(os.getenv("TAVILY_CACHE_SIZE", "1024"))
+TAVILY_CACHE_TTL_SECONDS = float(os.getenv("TAVILY_CACHE_TTL_SECONDS", "3600"))
+
+# Cache hit rate is reported by the TTLCache metrics under cache="tavily_search"
+TAVILY_UPSTREAM_LATENCY = Histogram("sprint_sync_tavily_upstream_latency_seconds",
+                                    "Latency of Tavily search API calls", ["outcome"])
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def create_tavily_client() -> AsyncTavilyClient:
+    # The client owns one httpx.AsyncClient, so connections are kept alive between searches
+    return AsyncTavilyClient(api_key=os.getenv("TAVILY_API_KEY"), api_base_url=TAVILY_API_BASE_URL)
+
+
+class WebSearch:
+    """
+    Tavily search shared by every agent: one client for the whole process, a TTL cache
+    keyed by the normalized query, and coalescing of identical concurrent searches
+    into a single upstream call.
+
+    Args:
+        client_factory (Callable): Builds the AsyncTavilyClient on first use.
+        cache (TTLCache): Search responses by normalized query.
+    """
+
+    def __init__(self, client_factory: Callable[[], AsyncTavilyClient], cache: TTLCache):
+        self.client_factory = client_factory
+        self.cache = cache
+        self._client: Optional[AsyncTavilyClient] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def _get_client(self) -> AsyncTavilyClient:
+        if self._client is None:
+            self._client = self.client_factory()
+        return self._client
+
+    async def search(self, query: str) -> dict:
+        key = normalize_query(query)
+        response = self.cache.get(key)
+        if response is not None:
+            return response
+
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._search_upstream(key))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            logger.info("tavily_search_coalesced", query=key)
+        return await asyncio.shield(future)
+
+    async def _search_upstream(self, query: str) -> dict:
+        start_time = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._get_client().search(query, max_results=TAVILY_MAX_RESULTS, topic="general",
+                                                       search_depth=TAVILY_SEARCH_DEPTH, timeout=TAVILY_TIMEOUT_SECONDS)
+            outcome = "success"
+        finally:
+            TAVILY_UPSTREAM_LATENCY.labels(outcome=outcome).observe(time.perf_counter() - start_time)
+        self.cache.set(query, response)
+        return response
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.close()
+        self._client = None
+
+
+web_search = WebSearch(create_tavily_client, TTLCache("tavily_search", maxsize=TAVILY_CACHE_SIZE, ttl=TAVILY_CACHE_TTL_SECONDS))
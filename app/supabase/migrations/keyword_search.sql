@@ -7,6 +7,7 @@ CREATE OR REPLACE FUNCTION keyword_search_profile(
 RETURNS TABLE (
     id uuid,
     user_id uuid,
+    username text,
     profile_skills text,
     profile_tasks text,
     embedding vector
@@ -16,10 +17,12 @@ AS $function$
     SELECT
         rs.id,
         rs.user_id,
+        u.username,
         rs.profile_skills,
         rs.profile_tasks,
         rs.embedding
     FROM resumes rs
+    JOIN users u ON u.id = rs.user_id
     WHERE
         rs.fts @@ to_tsquery(
             'english',
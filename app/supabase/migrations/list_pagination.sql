@@ -0,0 +1,9 @@
+-- Keyset indexes for the cursor paginated /list endpoints, which order by (created_at, id)
+CREATE INDEX IF NOT EXISTS users_created_at_id_idx
+ON users (created_at, id);
+
+CREATE INDEX IF NOT EXISTS tasks_created_at_id_idx
+ON tasks (created_at, id);
+
+CREATE INDEX IF NOT EXISTS resumes_created_at_id_idx
+ON resumes (created_at, id);
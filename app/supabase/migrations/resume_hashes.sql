@@ -0,0 +1,9 @@
+-- Content hashes used to skip re-processing identical resume uploads
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS content_hash text;
+ALTER TABLE resumes ADD COLUMN IF NOT EXISTS text_hash text;
+
+CREATE INDEX IF NOT EXISTS resume_content_hash_idx
+ON resumes (content_hash);
+
+CREATE INDEX IF NOT EXISTS resume_text_hash_idx
+ON resumes (text_hash);
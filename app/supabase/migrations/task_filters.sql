@@ -0,0 +1,14 @@
+-- Indexes for the filtered and sorted task queries of /tasks/my_tasks and /tasks/list.
+-- (created_at, id) for the unfiltered list is added by list_pagination.sql.
+
+-- my_tasks and the assignee filter, optionally narrowed by status
+CREATE INDEX IF NOT EXISTS tasks_user_id_status_created_at_idx
+ON tasks (user_id, status, created_at, id);
+
+-- Status filter across all users, e.g. every in_process task
+CREATE INDEX IF NOT EXISTS tasks_status_created_at_idx
+ON tasks (status, created_at, id);
+
+-- sort=updated_at / -updated_at and the updated_after / updated_before range
+CREATE INDEX IF NOT EXISTS tasks_updated_at_id_idx
+ON tasks (updated_at, id);
@@ -8,8 +8,9 @@ CREATE OR REPLACE FUNCTION vector_search_profile(
 RETURNS TABLE (
     id uuid,
     user_id uuid,
-    profile_tasks text,
+    username text,
     profile_skills text,
+    profile_tasks text,
     embedding vector
 )
 LANGUAGE sql
@@ -17,10 +18,12 @@ AS $function$
     SELECT
         rs.id,
         rs.user_id,
+        u.username,
         rs.profile_skills,
         rs.profile_tasks,
         rs.embedding
     FROM resumes rs
+    JOIN users u ON u.id = rs.user_id
     WHERE
         rs.embedding IS NOT NULL
         AND (1 - (rs.embedding <=> query_embedding)) > match_threshold
@@ -0,0 +1,81 @@
+"""
+Keyword search latency of the in-process BM25 index (app.services.keyword_index) on
+synthetic corpora whose skill terms follow a Zipf distribution, optionally compared
+with one keyword_search_profile RPC per query against the configured Supabase project.
+
+Each request scores a batch of keyword variations, as multi_query_hybrid_search does.
+
+Usage:
+    python -m benchmarks.bench_keyword_index --sizes 1000 10000 100000
+    python -m benchmarks.bench_keyword_index --sizes 1000 --rpc
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import numpy as np
+from app.services.keyword_index import KeywordIndex
+
+VOCABULARY_SIZE = 5000
+TERMS_PER_PROFILE = 40
+TERMS_PER_QUERY = 3
+
+
+def sample_terms(rng: np.random.Generator, count: int) -> str:
+    ranks = np.minimum(rng.zipf(1.3, size=count), VOCABULARY_SIZE)
+    return " ".join(f"skill{rank}" for rank in ranks)
+
+
+def report(label: str, size: int, load_seconds: float, samples: list, variations: int):
+    median = statistics.median(samples) * 1000
+    print(f"{label:<8}{size:>9}{load_seconds:>10.2f}{median:>14.2f}{median / variations:>14.3f}")
+
+
+def bench_index(size: int, requests: list, variations: int):
+    rng = np.random.default_rng(size)
+    rows = [{"id": str(i), "user_id": str(i), "profile_skills": sample_terms(rng, TERMS_PER_PROFILE), "profile_tasks": ""}
+            for i in range(size)]
+    index = KeywordIndex()
+    start = time.perf_counter()
+    index.load(rows)
+    load_seconds = time.perf_counter() - start
+
+    samples = []
+    for queries in requests:
+        start = time.perf_counter()
+        index.search_many(queries, 10)
+        samples.append(time.perf_counter() - start)
+    report("index", size, load_seconds, samples, variations)
+
+
+async def bench_rpc(requests: list, variations: int):
+    from app.services.repository import get_repository
+    search = get_repository().search
+    size = len(await get_repository().resumes.list_profiles())
+    samples = []
+    for queries in requests:
+        start = time.perf_counter()
+        await asyncio.gather(*(search.keyword_search(query, 10) for query in queries))
+        samples.append(time.perf_counter() - start)
+    report("rpc", size, 0.0, samples, variations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--variations", type=int, default=5, help="keyword queries per request")
+    parser.add_argument("--rpc", action="store_true", help="also time the keyword_search_profile RPC")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    requests = [[sample_terms(rng, TERMS_PER_QUERY) for _ in range(args.variations)] for _ in range(args.requests)]
+    print(f"{'path':<8}{'profiles':>9}{'load s':>10}{'request ms':>14}{'per query ms':>14}")
+    for size in args.sizes:
+        bench_index(size, requests, args.variations)
+    if args.rpc:
+        asyncio.run(bench_rpc(requests, args.variations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Requests/sec of a trivial route behind the previous BaseHTTPMiddleware based
+LoggingMiddleware and the current pure ASGI one.
+
+Usage:
+    python -m benchmarks.bench_middleware --requests 5000
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from typing import Callable
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+
+import httpx
+from fastapi import FastAPI, Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.auth.jwt_handler import create_access_token, decode_access_token
+from app.logging_config import configure_logging, get_logger, set_request_id, clear_context, set_user_id
+from app.middleware import LoggingMiddleware
+
+logger = get_logger(__name__)
+
+
+class BaseHTTPLoggingMiddleware(BaseHTTPMiddleware):
+    """The LoggingMiddleware implementation before the pure ASGI rewrite."""
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        request_id = str(uuid.uuid4())
+        set_request_id(request_id)
+        start_time = time.time()
+        token = request.headers.get("Authorization")
+        if token and token.startswith("Bearer "):
+            token = token.split(" ")[1]
+            try:
+                payload = decode_access_token(token)
+                request.state.claims = payload
+                set_user_id(payload["sub"])
+            except Exception as e:
+                request.state.claims = None
+                logger.error(reason="Failed to decode JWT token", error=str(e))
+
+        logger.info("request_started", method=request.method, path=request.url.path)
+        try:
+            response = await call_next(request)
+            duration = time.time() - start_time
+            logger.info("request_completed", method=request.method, path=request.url.path, status_code=response.status_code, duration_seconds=round(duration, 4))
+            response.headers["X-Request-ID"] = request_id
+            return response
+        finally:
+            clear_context()
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    app.add_middleware(middleware)
+    return app
+
+
+async def run(app: FastAPI, num_requests: int, concurrency: int, token: str) -> float:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker(count: int):
+            for _ in range(count):
+                response = await client.get("/ping", headers=headers)
+                assert response.headers["X-Request-ID"]
+
+        await worker(50) # warm up
+        start = time.perf_counter()
+        per_worker = num_requests // concurrency
+        await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return (per_worker * concurrency) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    configure_logging("benchmark.log")
+    token = create_access_token("benchmark-user")
+    for name, middleware in (("BaseHTTPMiddleware", BaseHTTPLoggingMiddleware), ("pure ASGI", LoggingMiddleware)):
+        rps = asyncio.run(run(build_app(middleware), args.requests, args.concurrency, token))
+        print(f"{name:<20} {rps:>10.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Event-loop latency while PDFs are extracted concurrently: inline on the loop (the
+previous create_resume behaviour) versus the process pool in app.services.pdf_extraction.
+
+A ticker coroutine sleeps for 5 ms in a loop and records how late it wakes up; with
+extraction off the loop the lag should stay flat regardless of document size.
+
+Usage:
+    python -m benchmarks.bench_pdf_extraction --pages 1 10 30 --concurrency 8
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("PDF_MAX_PAGES", "1000")
+os.environ.setdefault("PDF_MAX_BYTES", str(100 * 1024 * 1024))
+os.environ.setdefault("PDF_EXTRACTION_TIMEOUT_SECONDS", "300")
+
+from app.services.pdf_extraction import extract_pdf_text, extract_text, get_pdf_pool, shutdown_pdf_pool
+
+TICK_SECONDS = 0.005
+
+
+def make_pdf(num_pages: int, lines_per_page: int = 45) -> bytes:
+    """Build a PDF with `num_pages` pages of Helvetica text."""
+    page_ids = [4 + 2 * index for index in range(num_pages)]
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % page_id for page_id in page_ids), num_pages),
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    for index, page_id in enumerate(page_ids):
+        lines = b" ".join(b"(Page %d line %d: Designed and shipped FastAPI services with PostgreSQL and Redis.) Tj T*" % (index, line)
+                          for line in range(lines_per_page))
+        content = b"BT /F1 10 Tf 12 TL 40 760 Td " + lines + b" ET"
+        objects[page_id] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                            b"/Resources << /Font << /F1 3 0 R >> >> >>" % (page_id + 1))
+        objects[page_id + 1] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)
+
+    pdf = b"%PDF-1.4\n"
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(pdf)
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, objects[number])
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offsets[number] for number in sorted(objects))
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+
+async def measure(extract, pdf: bytes, concurrency: int):
+    lags = []
+    running = True
+
+    async def ticker():
+        while running:
+            expected = time.perf_counter() + TICK_SECONDS
+            await asyncio.sleep(TICK_SECONDS)
+            lags.append(max(0.0, time.perf_counter() - expected))
+
+    ticker_task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(extract(pdf) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    running = False
+    await ticker_task
+    return elapsed, lags
+
+
+async def extract_inline(pdf: bytes) -> str:
+    return extract_text(pdf, max_pages=1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 30])
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    get_pdf_pool()
+    asyncio.run(extract_pdf_text(make_pdf(1))) # start the pool workers before timing
+    print(f"{'mode':<14}{'pages':>6}{'total s':>10}{'lag p50 ms':>12}{'lag max ms':>12}")
+    for num_pages in args.pages:
+        pdf = make_pdf(num_pages)
+        for mode, extract in (("inline", extract_inline), ("process pool", extract_pdf_text)):
+            elapsed, lags = asyncio.run(measure(extract, pdf, args.concurrency))
+            lags = lags or [0.0]
+            print(f"{mode:<14}{num_pages:>6}{elapsed:>10.2f}{statistics.median(lags) * 1000:>12.1f}{max(lags) * 1000:>12.1f}")
+    shutdown_pdf_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Reciprocal rank fusion cost: the previous apply_rrf (nested loops, full sort, scores
+logged at info level) versus the current one with dict scoring, NumPy scoring and
+top-k selection, on many result lists of hundreds of candidates each.
+
+The previous implementation's log lines are emitted as the app would emit them; the
+table is printed once every run has finished.
+
+Usage:
+    python -m benchmarks.bench_rrf --lists 10 50 --candidates 200 500 --top-k 10 > /dev/null
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from unittest.mock import patch
+
+# retrieval imports the LLM clients, which only need a key to be constructed
+for key in ("GROQ_API_KEY", "GOOGLE_API_KEY"):
+    os.environ.setdefault(key, "benchmark")
+
+from app.logging_config import configure_logging, get_logger
+from app.services.retrieval import apply_rrf
+
+logger = get_logger(__name__)
+
+
+def apply_rrf_previous(profiles_list: list, weights: list = None, k: int = 60):
+    """The apply_rrf implementation before the rewrite."""
+    logger.info("apply_rrf", info="Starting RRF")
+    scores_dict = {}
+    all_profiles = {}
+    for profiles in profiles_list:
+        for idx, profile in enumerate(profiles):
+                profile_id = profile["id"]
+                score = 1 / (k + idx)
+                if profile_id in scores_dict:
+                    if weights:
+                        scores_dict[profile_id] += score * weights[idx]
+                    else:
+                        scores_dict[profile_id] += score
+                else:
+                    if weights:
+                        scores_dict[profile_id] = score * weights[idx]
+                    else:
+                        scores_dict[profile_id] = score
+                    all_profiles[profile_id] = profile
+    logger.info("Finished calculating RRF", scores=scores_dict)
+    sorted_profiles = sorted(scores_dict.items(), key=lambda x: x[1], reverse=True)
+    final_profiles = [all_profiles[profile_id] for profile_id, score in sorted_profiles]
+    return final_profiles
+
+
+def timed(fn, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lists", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--candidates", type=int, nargs="+", default=[200, 500])
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    configure_logging()
+    rng = random.Random(0)
+    rows = [f"{'lists':>6}{'cands':>7}{'previous ms':>13}{'dict ms':>10}{'numpy ms':>10}"]
+    for num_lists in args.lists:
+        for num_candidates in args.candidates:
+            pool = range(num_candidates * 4)
+            profiles_list = [[{"id": str(profile_id)} for profile_id in rng.sample(pool, num_candidates)]
+                             for _ in range(num_lists)]
+            previous = timed(lambda: apply_rrf_previous(profiles_list), args.repeats)
+            with patch("app.services.retrieval.RRF_ARRAY_THRESHOLD", 10 ** 9):
+                dict_scoring = timed(lambda: apply_rrf(profiles_list, top_k=args.top_k), args.repeats)
+            with patch("app.services.retrieval.RRF_ARRAY_THRESHOLD", 0):
+                array_scoring = timed(lambda: apply_rrf(profiles_list, top_k=args.top_k), args.repeats)
+            rows.append(f"{num_lists:>6}{num_candidates:>7}{previous:>13.2f}{dict_scoring:>10.2f}{array_scoring:>10.2f}")
+    print("\n".join(rows), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
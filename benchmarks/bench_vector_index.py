@@ -0,0 +1,78 @@
+"""
+Vector search latency of the in-process NumPy index (app.services.vector_index) on
+synthetic corpora of random 768-dimensional embeddings, optionally compared with the
+vector_search_profile RPC against the configured Supabase project.
+
+The RPC is timed on whatever the resumes table holds, so its numbers are only
+comparable with the index row of the same corpus size.
+
+Usage:
+    python -m benchmarks.bench_vector_index --sizes 1000 10000 100000
+    python -m benchmarks.bench_vector_index --sizes 1000 --rpc
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import numpy as np
+from app.services.vector_index import VectorIndex
+
+DIMENSIONS = 768
+
+
+def percentile_ms(samples: list, fraction: float) -> float:
+    return sorted(samples)[min(len(samples) - 1, int(len(samples) * fraction))] * 1000
+
+
+def report(label: str, size: int, load_seconds: float, samples: list):
+    print(f"{label:<8}{size:>9}{load_seconds:>10.2f}{statistics.median(samples) * 1000:>10.2f}{percentile_ms(samples, 0.99):>10.2f}")
+
+
+def bench_index(size: int, queries: np.ndarray, top_k: int, threshold: float):
+    rng = np.random.default_rng(size)
+    rows = [{"id": str(i), "user_id": str(i), "profile_skills": "", "profile_tasks": "", "embedding": vector}
+            for i, vector in enumerate(rng.normal(size=(size, DIMENSIONS)).astype(np.float32))]
+    index = VectorIndex()
+    start = time.perf_counter()
+    index.load(rows)
+    load_seconds = time.perf_counter() - start
+
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, threshold, top_k)
+        samples.append(time.perf_counter() - start)
+    report("index", size, load_seconds, samples)
+
+
+async def bench_rpc(queries: np.ndarray, top_k: int, threshold: float):
+    from app.services.repository import get_repository
+    search = get_repository().search
+    size = len(await get_repository().resumes.list_embeddings())
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        await search.vector_search(query.tolist(), match_threshold=threshold, num_profiles=top_k)
+        samples.append(time.perf_counter() - start)
+    report("rpc", size, 0.0, samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--threshold", type=float, default=0.0, help="0.0 keeps every positive match on random vectors")
+    parser.add_argument("--rpc", action="store_true", help="also time the vector_search_profile RPC")
+    args = parser.parse_args()
+
+    queries = np.random.default_rng(42).normal(size=(args.queries, DIMENSIONS)).astype(np.float32)
+    print(f"{'path':<8}{'profiles':>9}{'load s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for size in args.sizes:
+        bench_index(size, queries, args.top_k, args.threshold)
+    if args.rpc:
+        asyncio.run(bench_rpc(queries, args.top_k, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
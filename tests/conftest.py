@@ -0,0 +1,23 @@
+import pytest
+from app.auth.jwt_handler import create_access_token
+from app.auth.dependencies import principal_cache
+from app.services.memory_repository import MemoryRepository
+from app.services.repository import set_repository
+
+
+@pytest.fixture
+def repository():
+    repository = MemoryRepository()
+    set_repository(repository)
+    principal_cache.clear()
+    yield repository
+    set_repository(None)
+    principal_cache.clear()
+
+
+@pytest.fixture
+def auth_headers():
+    """Build the Authorization header of a user's access token."""
+    def auth_headers(user: dict) -> dict:
+        return {"Authorization": f"Bearer {create_access_token(user['id'])}"}
+    return auth_headers
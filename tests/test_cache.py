@@ -0,0 +1,62 @@
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from jose import jwt
+from app.services.cache import TTLCache
+from app.services.memory_repository import MemoryRepository
+from app.services.repository import set_repository
+from app.auth.dependencies import get_current_user, principal_cache
+from app.auth.jwt_handler import create_access_token, decode_access_token, verified_token_cache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache("test_lru", maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache("test_ttl", maxsize=10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_current_user_uses_principal_cache():
+    principal_cache.clear()
+    repository = MemoryRepository()
+    set_repository(repository)
+    user = await repository.users.create({"username": "test_user", "email": "test@example.com", "password": "x"})
+    token = create_access_token(user["id"])
+    request = SimpleNamespace(state=SimpleNamespace())
+
+    with patch.object(repository.users, "get_by_id", wraps=repository.users.get_by_id) as mock_get:
+        assert (await get_current_user(request=request, token=token))["username"] == "test_user"
+        assert (await get_current_user(request=request, token=token))["username"] == "test_user"
+        assert mock_get.call_count == 1
+
+        principal_cache.invalidate(user["id"])
+        await get_current_user(request=request, token=token)
+        assert mock_get.call_count == 2
+    principal_cache.clear()
+    set_repository(None)
+
+
+def test_decode_access_token_reuses_verified_claims():
+    verified_token_cache.clear()
+    token = create_access_token("user-2")
+
+    with patch("app.auth.jwt_handler.jwt.decode", wraps=jwt.decode) as mock_decode:
+        assert decode_access_token(token)["sub"] == "user-2"
+        assert decode_access_token(token)["sub"] == "user-2"
+        assert mock_decode.call_count == 1
+    verified_token_cache.clear()
@@ -0,0 +1,45 @@
+import pytest
+from typing import List
+from langchain_core.embeddings import Embeddings
+from app.services.embedding_cache import CachedEmbeddings, EmbeddingStore
+
+
+class CountingEmbeddings(Embeddings):
+    model = "fake-embedding"
+    output_dimensionality = 4
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls.append(list(texts))
+        return [[float(len(text)), 0.5, 0.25, 1.0] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def test_cached_embeddings_persist_across_instances(tmp_path):
+    store_path = str(tmp_path / "embeddings.sqlite3")
+    model = CountingEmbeddings()
+
+    cached = CachedEmbeddings(model, memory_size=16, store=EmbeddingStore(store_path))
+    first = cached.embed_query("Set up CI pipeline")
+    assert cached.embed_query("  Set up   CI pipeline ") == first
+    assert len(model.calls) == 1
+
+    reloaded = CachedEmbeddings(model, memory_size=16, store=EmbeddingStore(store_path))
+    assert reloaded.embed_query("Set up CI pipeline") == first
+    assert len(model.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_cached_embeddings_only_embeds_missing_documents():
+    model = CountingEmbeddings()
+    cached = CachedEmbeddings(model, memory_size=16)
+    await cached.aembed_documents(["python", "fastapi"])
+
+    vectors = await cached.aembed_documents(["python", "react", "python"])
+
+    assert model.calls[-1] == ["react"]
+    assert vectors[0] == vectors[2] == [6.0, 0.5, 0.25, 1.0]
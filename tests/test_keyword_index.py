@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.services.keyword_index import KeywordIndex
+from app.services.memory_repository import MemoryRepository
+from app.services.repository import set_repository
+from app.services.retrieval import multi_query_hybrid_search
+
+
+def make_row(user_id: str, skills: str) -> dict:
+    return {"id": f"resume-{user_id}", "user_id": user_id, "profile_skills": skills, "profile_tasks": "tasks"}
+
+
+def test_search_ranks_rare_terms_and_short_documents_higher():
+    index = KeywordIndex()
+    index.load([
+        make_row("a", "python fastapi postgresql"),
+        make_row("b", "python react"),
+        make_row("c", "python django celery redis kubernetes terraform"),
+        make_row("d", "java spring"),
+    ])
+
+    python_only, fastapi_python = index.search_many(["python", "FastAPI python"], num_profiles=10)
+
+    assert [profile["user_id"] for profile in python_only] == ["b", "a", "c"]
+    assert [profile["user_id"] for profile in fastapi_python][0] == "a"
+    assert index.search_many(["golang"], num_profiles=10) == [[]]
+
+
+def test_incremental_updates_match_a_fresh_load():
+    rows = [make_row("a", "python fastapi"), make_row("b", "react typescript"), make_row("c", "python react")]
+    index = KeywordIndex()
+    index.load(rows[:2])
+    index.upsert(make_row("b", "react typescript python"))
+    index.remove("a")
+    index.upsert(rows[2])
+    index.upsert(rows[0])
+
+    fresh = KeywordIndex()
+    fresh.load([rows[2], rows[0], make_row("b", "react typescript python")])
+
+    queries = ["python", "react", "fastapi typescript"]
+    assert index.search_many(queries, 10) == fresh.search_many(queries, 10)
+    assert len(index) == 3
+
+
+
+def test_failed_search_leaves_the_postings_resizable():
+    index = KeywordIndex()
+    index.load([make_row("a", "python fastapi"), make_row("b", "python react")])
+
+    with patch("app.services.keyword_index.np.argsort", side_effect=RuntimeError("boom")):
+        with pytest.raises(RuntimeError):
+            index.search_many(["python"], 10)
+        # The traceback held by pytest.raises keeps the failed search's locals alive
+        index.upsert(make_row("c", "python django"))
+
+    assert [profile["user_id"] for profile in index.search_many(["django"], 10)[0]] == ["c"]
+
+@pytest.mark.asyncio
+async def test_hybrid_search_scores_keyword_queries_locally():
+    repository = MemoryRepository()
+    repository.search.keyword_search = AsyncMock(return_value=[])
+    set_repository(repository)
+    alice = await repository.users.create({"username": "alice", "email": "alice@example.com", "password": "x"})
+    bob = await repository.users.create({"username": "bob", "email": "bob@example.com", "password": "x"})
+    index = KeywordIndex()
+    index.load([make_row(alice["id"], "python fastapi"), make_row(bob["id"], "react")])
+
+    try:
+        with patch("app.services.retrieval.keyword_index", index):
+            profiles = await multi_query_hybrid_search(["fastapi", "react"], [], num_profiles=5)
+    finally:
+        set_repository(None)
+
+    assert {profile["username"] for profile in profiles} == {"alice", "bob"}
+    repository.search.keyword_search.assert_not_awaited()
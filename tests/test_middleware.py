@@ -0,0 +1,31 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from app.auth.jwt_handler import create_access_token
+from app.middleware import LoggingMiddleware
+
+app = FastAPI()
+app.add_middleware(LoggingMiddleware)
+
+
+@app.get("/claims")
+def read_claims(request: Request):
+    return {"claims": getattr(request.state, "claims", "missing")}
+
+
+client = TestClient(app)
+
+
+def test_logging_middleware_sets_request_id_and_claims():
+    token = create_access_token("user-1")
+    response = client.get("/claims", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"]
+    assert response.json()["claims"]["sub"] == "user-1"
+
+
+def test_logging_middleware_marks_invalid_token():
+    response = client.get("/claims", headers={"Authorization": "Bearer not-a-token"})
+
+    assert response.json()["claims"] is None
+    assert client.get("/claims").json()["claims"] == "missing"
@@ -0,0 +1,256 @@
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+from app.auth.jwt_handler import create_access_token
+from app.services import pdf_extraction
+from app.services.jobs import QueueFullError, ResumeJobQueue, ResumeJobStore
+from app.main import app
+
+client = TestClient(app)
+
+
+def make_pdf(text: str) -> bytes:
+    """Build a minimal single-page PDF whose text layer contains `text`."""
+    content = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+
+@pytest.mark.asyncio
+async def test_create_resume_runs_extractions_concurrently(repository):
+    user = await repository.users.create({"username": "dev", "email": "dev@example.com", "password": "x"})
+    tasks_started = asyncio.Event()
+
+    async def skills_agent(payload):
+        # Only completes if the tasks extraction is already running alongside it
+        await asyncio.wait_for(tasks_started.wait(), timeout=1)
+        assert "Jane Doe Python Engineer" in payload["messages"]
+        return {"messages": [MagicMock(content="skills: Python")]}
+
+    async def tasks_agent(payload):
+        tasks_started.set()
+        return {"messages": [MagicMock(content="tasks:\n- Build APIs")]}
+
+    with patch("app.services.resume_ingestion.profile_skills_generator_agent") as mock_skills, \
+         patch("app.services.resume_ingestion.profile_task_generator_agent") as mock_tasks, \
+         patch("app.services.resume_ingestion.embeddings_model") as mock_embeddings, \
+         patch("app.services.s3_bucket.s3_client") as mock_s3:
+        mock_skills.ainvoke = skills_agent
+        mock_tasks.ainvoke = tasks_agent
+        mock_embeddings.aembed_query = AsyncMock(return_value=[0.1, 0.2])
+
+        response = client.post("/resumes/create", headers={"Authorization": f"Bearer {create_access_token(user['id'])}"},
+                               files={"file": ("resume.pdf", make_pdf("Jane Doe Python Engineer"), "application/pdf")})
+
+    assert response.status_code == 200
+    mock_s3.put_object.assert_called_once()
+    stored = await repository.resumes.get_by_user(user["id"])
+    assert stored["profile_skills"] == "skills: Python"
+    assert stored["embedding"] == [0.1, 0.2]
+
+
+@pytest.mark.asyncio
+async def test_resume_job_queue_retries_transient_failures(tmp_path):
+    attempts = []
+
+    async def handler(user_id, filename, payload):
+        attempts.append(payload)
+        if len(attempts) == 1:
+            raise TimeoutError("LLM provider timed out")
+        return {"s3_key": f"resumes/{user_id}/{filename}"}
+
+    queue = ResumeJobQueue(ResumeJobStore(str(tmp_path / "jobs.sqlite3")), handler=handler, workers=1,
+                           max_pending=1, max_attempts=3, retry_delay=0.01, transient_errors=(TimeoutError,))
+    queue.start()
+    job_id = await queue.submit("user-1", "resume.pdf", b"%PDF")
+
+    with pytest.raises(QueueFullError):
+        await queue.submit("user-1", "resume.pdf", b"%PDF")
+
+    for _ in range(100):
+        job = await queue.get(job_id)
+        if job["status"] == "succeeded":
+            break
+        await asyncio.sleep(0.01)
+    await queue.stop()
+
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 2
+    assert job["result"] == {"s3_key": "resumes/user-1/resume.pdf"}
+    assert attempts == [b"%PDF", b"%PDF"]
+
+
+@pytest.mark.asyncio
+async def test_resume_job_worker_survives_store_errors(tmp_path):
+    store = ResumeJobStore(str(tmp_path / "jobs.sqlite3"))
+    claim_next = store.claim_next
+    calls = []
+
+    def flaky_claim_next():
+        calls.append(1)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return claim_next()
+
+    store.claim_next = flaky_claim_next
+    queue = ResumeJobQueue(store, handler=AsyncMock(return_value={}), workers=1, max_pending=5, max_attempts=1,
+                           retry_delay=0, transient_errors=())
+    with patch("app.services.jobs.JOB_POLL_INTERVAL_SECONDS", 0.01):
+        queue.start()
+        job_id = await queue.submit("user-1", "resume.pdf", b"%PDF")
+        for _ in range(100):
+            job = await queue.get(job_id)
+            if job["status"] == "succeeded":
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+
+    assert job["status"] == "succeeded"
+    assert len(calls) > 1
+
+
+def test_resume_job_store_claims_are_exclusive_across_processes(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    first, second = ResumeJobStore(path, lease_seconds=0.2), ResumeJobStore(path, lease_seconds=0.2)
+    job_id = first.create("user-1", "resume.pdf", b"%PDF")
+
+    assert first.claim_next()[0] == job_id
+    assert second.claim_next() is None
+    # A worker starting up leaves jobs with a live lease alone
+    assert ResumeJobStore(path).claim_next() is None
+    assert first.get(job_id)["status"] == "running"
+
+    time.sleep(0.1)
+    first.heartbeat(job_id)
+    time.sleep(0.15)
+    assert second.claim_next() is None
+
+    # The worker stopped renewing its lease, so another one takes the job over
+    time.sleep(0.25)
+    job = second.claim_next()
+    assert job[0] == job_id
+    assert job[4] == 2
+
+
+@pytest.mark.asyncio
+async def test_create_resume_in_background_returns_job_id(repository, tmp_path):
+    user = await repository.users.create({"username": "dev", "email": "dev@example.com", "password": "x"})
+    queue = ResumeJobQueue(ResumeJobStore(str(tmp_path / "jobs.sqlite3")), handler=AsyncMock(), workers=1,
+                           max_pending=1, max_attempts=1, retry_delay=0, transient_errors=())
+    headers = {"Authorization": f"Bearer {create_access_token(user['id'])}"}
+    files = {"file": ("resume.pdf", make_pdf("Jane Doe"), "application/pdf")}
+
+    with patch("app.routes.resumes.resume_job_queue", queue):
+        response = client.post("/resumes/create?background=true", headers=headers, files=files)
+        assert response.status_code == 202
+        job = client.get(f"/resumes/jobs/{response.json()['job_id']}", headers=headers).json()
+        assert job["status"] == "queued"
+
+        assert client.post("/resumes/create?background=true", headers=headers, files=files).status_code == 429
+
+
+@pytest.mark.asyncio
+async def test_create_resume_rejects_oversized_pdf(repository):
+    user = await repository.users.create({"username": "dev", "email": "dev@example.com", "password": "x"})
+
+    with patch("app.services.pdf_extraction.PDF_MAX_BYTES", 100):
+        response = client.post("/resumes/create", headers={"Authorization": f"Bearer {create_access_token(user['id'])}"},
+                               files={"file": ("resume.pdf", make_pdf("Jane Doe"), "application/pdf")})
+
+    assert response.status_code == 413
+
+
+
+class BrokenPool(Executor):
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("A child process terminated abruptly"))
+        return future
+
+
+@pytest.mark.asyncio
+async def test_create_resume_replaces_the_pdf_pool_after_a_worker_crash(repository):
+    user = await repository.users.create({"username": "dev", "email": "dev@example.com", "password": "x"})
+    broken = BrokenPool()
+
+    with patch("app.services.pdf_extraction._pool", broken), patch("app.services.s3_bucket.s3_client"):
+        response = client.post("/resumes/create", headers={"Authorization": f"Bearer {create_access_token(user['id'])}"},
+                               files={"file": ("resume.pdf", make_pdf("Jane Doe"), "application/pdf")})
+
+        assert response.status_code == 422
+        assert pdf_extraction._pool is None
+
+@pytest.mark.asyncio
+async def test_create_resume_reuses_extraction_for_identical_uploads(repository):
+    first = await repository.users.create({"username": "dev", "email": "dev@example.com", "password": "x"})
+    second = await repository.users.create({"username": "dev2", "email": "dev2@example.com", "password": "x"})
+    files = {"file": ("resume.pdf", make_pdf("Jane Doe Python Engineer"), "application/pdf")}
+
+    with patch("app.services.resume_ingestion.profile_skills_generator_agent") as mock_skills, \
+         patch("app.services.resume_ingestion.profile_task_generator_agent") as mock_tasks, \
+         patch("app.services.resume_ingestion.embeddings_model") as mock_embeddings, \
+         patch("app.services.s3_bucket.s3_client") as mock_s3:
+        mock_skills.ainvoke = AsyncMock(return_value={"messages": [MagicMock(content="skills: Python")]})
+        mock_tasks.ainvoke = AsyncMock(return_value={"messages": [MagicMock(content="tasks:\n- Build APIs")]})
+        mock_embeddings.aembed_query = AsyncMock(return_value=[0.1, 0.2])
+
+        for user in (first, first, second):
+            response = client.post("/resumes/create", headers={"Authorization": f"Bearer {create_access_token(user['id'])}"},
+                                   files=files)
+            assert response.status_code == 200
+
+    # Re-uploading is a no-op and the second user's copy reuses the stored extraction
+    assert mock_skills.ainvoke.await_count == 1
+    assert mock_embeddings.aembed_query.await_count == 1
+    assert mock_s3.put_object.call_count == 2
+    stored = await repository.resumes.get_by_user(second["id"])
+    assert stored["profile_skills"] == "skills: Python"
+    assert stored["embedding"] == [0.1, 0.2]
+    assert stored["content_hash"] == (await repository.resumes.get_by_user(first["id"]))["content_hash"]
+
+
+@pytest.mark.asyncio
+async def test_reupload_after_failed_ingest_restores_the_stored_pdf(repository):
+    user = await repository.users.create({"username": "dev", "email": "dev@example.com", "password": "x"})
+    headers = {"Authorization": f"Bearer {create_access_token(user['id'])}"}
+    original = {"file": ("resume.pdf", make_pdf("Jane Doe Python Engineer"), "application/pdf")}
+    replacement = {"file": ("resume.pdf", make_pdf("Jane Doe Rust Engineer"), "application/pdf")}
+
+    with patch("app.services.resume_ingestion.profile_skills_generator_agent") as mock_skills, \
+         patch("app.services.resume_ingestion.profile_task_generator_agent") as mock_tasks, \
+         patch("app.services.resume_ingestion.embeddings_model") as mock_embeddings, \
+         patch("app.services.s3_bucket.s3_client") as mock_s3:
+        mock_skills.ainvoke = AsyncMock(return_value={"messages": [MagicMock(content="skills: Python")]})
+        mock_tasks.ainvoke = AsyncMock(return_value={"messages": [MagicMock(content="tasks:\n- Build APIs")]})
+        mock_embeddings.aembed_query = AsyncMock(return_value=[0.1, 0.2])
+        assert client.post("/resumes/create", headers=headers, files=original).status_code == 200
+
+        # The replacement reaches S3, then extraction fails
+        mock_skills.ainvoke = AsyncMock(side_effect=RuntimeError("LLM down"))
+        assert client.post("/resumes/create", headers=headers, files=replacement).status_code == 500
+
+        mock_skills.ainvoke = AsyncMock(return_value={"messages": [MagicMock(content="skills: Python")]})
+        assert client.post("/resumes/create", headers=headers, files=original).status_code == 200
+
+    assert mock_s3.put_object.call_count == 3
+    assert mock_s3.put_object.call_args.kwargs["Body"] == make_pdf("Jane Doe Python Engineer")
@@ -0,0 +1,90 @@
+import random
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.services.memory_repository import MemoryRepository
+from app.services.retrieval import apply_rrf, multi_query_hybrid_search
+
+
+async def add_resume(repository: MemoryRepository, username: str, skills: str, embedding: list) -> dict:
+    user = await repository.users.create({"username": username, "email": f"{username}@example.com", "password": "x"})
+    return await repository.resumes.upsert({"user_id": user["id"], "profile_skills": skills, "profile_tasks": "tasks", "embedding": embedding})
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_merges_partial_results_when_a_branch_fails(repository):
+    fastapi_resume = await add_resume(repository, "alice", "skills: FastAPI, Python", [1.0, 0.0])
+    await add_resume(repository, "bob", "skills: React", [0.0, 1.0])
+
+    with patch("app.services.embeddings.query_embedder.embeddings") as mock_embeddings:
+        mock_embeddings.aembed_documents = AsyncMock(side_effect=RuntimeError("embedding quota exceeded"))
+        profiles = await multi_query_hybrid_search(["fastapi"], ["Build REST APIs"], num_profiles=3)
+
+    assert [profile["resume_id"] for profile in profiles] == [fastapi_resume["id"]]
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_raises_when_every_branch_fails(repository):
+    with patch("app.services.embeddings.query_embedder.embeddings") as mock_embeddings:
+        mock_embeddings.aembed_documents = AsyncMock(side_effect=RuntimeError("embedding quota exceeded"))
+        with pytest.raises(RuntimeError):
+            await multi_query_hybrid_search([], ["Build REST APIs"], num_profiles=3)
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_embeds_all_vector_queries_in_one_batch(repository):
+    resume = await add_resume(repository, "alice", "skills: FastAPI", [1.0, 0.0])
+
+    with patch("app.services.embeddings.query_embedder.embeddings") as mock_embeddings:
+        mock_embeddings.aembed_documents = AsyncMock(side_effect=lambda texts, **kwargs: [[1.0, 0.0] for _ in texts])
+        profiles = await multi_query_hybrid_search([], ["Build APIs", "Design REST services", "Build APIs"], num_profiles=3)
+
+    mock_embeddings.aembed_documents.assert_called_once_with(["Build APIs", "Design REST services"], task_type="RETRIEVAL_QUERY")
+    assert [profile["resume_id"] for profile in profiles] == [resume["id"]]
+
+
+def test_apply_rrf_weights_each_list():
+    keyword = [{"id": "a"}, {"id": "b"}]
+    vector = [{"id": "b"}, {"id": "c"}]
+
+    fused = apply_rrf([keyword, vector], weights=[1.0, 3.0], k=60)
+
+    assert [(profile["id"], round(score, 6)) for profile, score in fused] == [
+        ("b", round(1 / 61 + 3 / 60, 6)), ("c", round(3 / 61, 6)), ("a", round(1 / 60, 6))]
+    with pytest.raises(ValueError):
+        apply_rrf([keyword, vector], weights=[1.0])
+
+
+def test_apply_rrf_array_scoring_matches_dict_scoring():
+    rng = random.Random(0)
+    profiles_list = [[{"id": str(profile_id)} for profile_id in rng.sample(range(400), 200)] for _ in range(12)]
+    weights = [rng.uniform(0.5, 2.0) for _ in profiles_list]
+
+    with patch("app.services.retrieval.RRF_ARRAY_THRESHOLD", 10 ** 9):
+        expected = apply_rrf(profiles_list, weights=weights, top_k=25)
+    with patch("app.services.retrieval.RRF_ARRAY_THRESHOLD", 0):
+        fused = apply_rrf(profiles_list, weights=weights, top_k=25)
+
+    assert [profile["id"] for profile, _ in fused] == [profile["id"] for profile, _ in expected]
+    assert [score for _, score in fused] == pytest.approx([score for _, score in expected])
+    assert [profile["id"] for profile, _ in apply_rrf(profiles_list, top_k=25)] == \
+           [profile["id"] for profile, _ in apply_rrf(profiles_list)[:25]]
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_returns_usernames_scores_and_snippets(repository):
+    resume = await add_resume(repository, "alice", "skills: FastAPI, Python\nhobbies: chess", [1.0, 0.0])
+
+    with patch("app.services.embeddings.query_embedder.embeddings") as mock_embeddings:
+        mock_embeddings.aembed_documents = AsyncMock(side_effect=lambda texts, **kwargs: [[1.0, 0.0] for _ in texts])
+        profiles = await multi_query_hybrid_search(["python"], ["Build APIs"], num_profiles=3)
+
+    assert profiles == [{
+        "id": resume["user_id"],
+        "username": "alice",
+        "resume_id": resume["id"],
+        "score": pytest.approx(2 / 60),
+        "matches": [
+            {"search_type": "keyword", "query": "python", "rank": 1, "snippet": "skills: FastAPI, Python"},
+            {"search_type": "vector", "query": "Build APIs", "rank": 1, "snippet": "tasks"},
+        ],
+    }]
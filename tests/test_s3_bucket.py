@@ -0,0 +1,59 @@
+import io
+import boto3
+import pytest
+from unittest.mock import patch
+from moto import mock_aws
+from app.services import s3_bucket
+
+CHUNK_SIZE = 5 * 1024 * 1024
+
+
+@pytest.fixture
+def bucket():
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test")
+        client.create_bucket(Bucket="resumes-test")
+        with patch.object(s3_bucket, "s3_client", client), \
+             patch.object(s3_bucket, "BUCKET_NAME", "resumes-test"), \
+             patch.object(s3_bucket, "S3_UPLOAD_CHUNK_SIZE", CHUNK_SIZE):
+            yield client
+
+
+def test_upload_stream_uses_single_put_for_small_files(bucket):
+    chunks = []
+
+    size = s3_bucket.upload_stream(io.BytesIO(b"%PDF small"), "resumes/a.pdf", "application/pdf", chunks.append)
+
+    assert size == 10
+    assert chunks == [b"%PDF small", b""]
+    obj = bucket.get_object(Bucket="resumes-test", Key="resumes/a.pdf")
+    assert obj["Body"].read() == b"%PDF small"
+    assert obj["ContentType"] == "application/pdf"
+
+
+def test_upload_stream_uses_multipart_for_large_files(bucket):
+    data = bytes(range(256)) * (11 * 1024 * 1024 // 256)
+    chunks = []
+
+    size = s3_bucket.upload_stream(io.BytesIO(data), "resumes/b.pdf", "application/pdf", chunks.append)
+
+    assert size == len(data)
+    assert [len(chunk) for chunk in chunks] == [CHUNK_SIZE, CHUNK_SIZE, len(data) - 2 * CHUNK_SIZE, 0]
+    obj = bucket.get_object(Bucket="resumes-test", Key="resumes/b.pdf")
+    assert obj["Body"].read() == data
+    assert obj["ETag"].endswith('-3"')
+
+
+def test_upload_stream_aborts_multipart_upload_on_error(bucket):
+    seen = []
+
+    def reject_third_chunk(chunk):
+        seen.append(chunk)
+        if len(seen) == 3:
+            raise ValueError("too large")
+
+    with pytest.raises(ValueError):
+        s3_bucket.upload_stream(io.BytesIO(b"x" * (3 * CHUNK_SIZE)), "resumes/c.pdf", "application/pdf", reject_third_chunk)
+
+    assert "Uploads" not in bucket.list_multipart_uploads(Bucket="resumes-test")
+    assert "Contents" not in bucket.list_objects_v2(Bucket="resumes-test")
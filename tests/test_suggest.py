@@ -1,8 +1,12 @@
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, patch
 from fastapi import HTTPException
 from app.routes.suggest import SuggestRequest
-from app.routes.suggest import suggest_profile, SuggestProfileRequest, suggest_description
+from app.routes.suggest import suggest_profile, SuggestProfileRequest, suggest_description, description_cache
+from app.services.staffing import StaffingSuggestions, staffing_suggestions
+from app.services import query_variations
+from app.services.query_variations import get_query_variations, precompute_query_variations, query_variations_cache, stop_precompute
 from fastapi.testclient import TestClient
 from app.auth.dependencies import get_current_user # Adjust imports
 from app.main import app
@@ -17,8 +21,11 @@ async def test_suggest_description_ai_success():
     mock_ai_content = '{"description": ["Task 1", "Task 2"]}'
     mock_response = {"messages": [AsyncMock(content=mock_ai_content)]}
     
-    with patch("app.routes.suggest.description_generator_agent.ainvoke", new_callable=AsyncMock) as mock_invoke:
+    description_cache.clear()
+    with patch("app.routes.suggest.description_generator_agent.ainvoke", new_callable=AsyncMock) as mock_invoke, \
+         patch("app.routes.suggest.embeddings_model") as mock_embeddings:
         mock_invoke.return_value = mock_response
+        mock_embeddings.aembed_query = AsyncMock(return_value=[1.0, 0.0])
         
         with patch.dict("os.environ", {"USE_LLM_STUB": "false"}):
             result = await suggest_description(task=mock_task, current_user=mock_admin)
@@ -26,6 +33,30 @@ async def test_suggest_description_ai_success():
             assert result == ["Task 1", "Task 2"]
             mock_invoke.assert_called_once()
 
+@pytest.mark.asyncio
+async def test_suggest_description_served_from_cache_for_similar_titles():
+    mock_admin = {"is_admin": True}
+    mock_response = {"messages": [AsyncMock(content='{"description": ["Task 1"]}')]}
+    embeddings = {"Setup CI": [1.0, 0.0], "Set up CI pipeline": [0.99, 0.05], "Design logo": [0.0, 1.0]}
+
+    description_cache.clear()
+    with patch("app.routes.suggest.description_generator_agent.ainvoke", new_callable=AsyncMock) as mock_invoke, \
+         patch("app.routes.suggest.embeddings_model") as mock_embeddings:
+        mock_invoke.return_value = mock_response
+        mock_embeddings.aembed_query = AsyncMock(side_effect=lambda title, **kwargs: embeddings[title])
+
+        with patch.dict("os.environ", {"USE_LLM_STUB": "false"}):
+            await suggest_description(task=SuggestRequest(title="Setup CI"), current_user=mock_admin)
+            assert await suggest_description(task=SuggestRequest(title="setup ci!"), current_user=mock_admin) == ["Task 1"]
+            assert await suggest_description(task=SuggestRequest(title="Set up CI pipeline"), current_user=mock_admin) == ["Task 1"]
+            assert mock_invoke.call_count == 1
+
+            await suggest_description(task=SuggestRequest(title="Design logo"), current_user=mock_admin)
+            await suggest_description(task=SuggestRequest(title="Setup CI", use_cache=False), current_user=mock_admin)
+            assert mock_invoke.call_count == 3
+    description_cache.clear()
+
+
 @pytest.mark.asyncio
 async def test_suggest_profile_success():
     
@@ -35,18 +66,30 @@ async def test_suggest_profile_success():
     mock_query_content = '{"keyword_search_queries": ["a"], "task_search_queries": ["b"]}'
     mock_ai_response = {"messages": [AsyncMock(content=mock_query_content)]}
     
-    with patch("app.routes.suggest.query_generator_agent.ainvoke", new_callable=AsyncMock) as mock_ai, \
-         patch("app.routes.suggest.multi_query_hybrid_search") as mock_search, \
-         patch("app.routes.suggest.supabase") as mock_sb:
+    query_variations_cache.clear()
+    staffing_suggestions.invalidate()
+    with patch("app.services.query_variations.query_generator_agent.ainvoke", new_callable=AsyncMock) as mock_ai, \
+         patch("app.services.staffing.multi_query_hybrid_search", new_callable=AsyncMock) as mock_search:
         
         mock_ai.return_value = mock_ai_response
-        mock_search.return_value = [{"user_id": "123"}]
-        mock_sb.rpc().execute.return_value.data = [{"username": "test_user"}]
+        mock_search.return_value = [{"id": "123", "username": "test_user", "score": 0.03, "matches": []}]
         
         with patch.dict("os.environ", {"USE_LLM_STUB": "false"}):
             result = await suggest_profile(task=mock_task, current_user=mock_admin)
             assert result[0]["username"] == "test_user"
 
+            # The same task again is served from the stored suggestions
+            await suggest_profile(task=SuggestProfileRequest(title="Dev ", description="Code"), current_user=mock_admin)
+            assert mock_search.await_count == 1
+
+            # A resume change invalidates the suggestions but not the cached query variations
+            staffing_suggestions.invalidate()
+            await suggest_profile(task=mock_task, current_user=mock_admin)
+            mock_ai.assert_awaited_once()
+            assert mock_search.await_count == 2
+    query_variations_cache.clear()
+    staffing_suggestions.invalidate()
+
 
 def test_integration_suggest_description_stub():
     with patch.dict("os.environ", {"USE_LLM_STUB": "true"}):
@@ -56,4 +99,106 @@ def test_integration_suggest_description_stub():
         assert response.status_code == 200
         data = response.json()
         assert len(data) == 3
-        app.dependency_overrides.clear()
\ No newline at end of file
+        app.dependency_overrides.clear()
+
+
+def test_integration_suggest_profile_stub_matches_the_search_records():
+    with patch.dict("os.environ", {"USE_LLM_STUB": "true"}):
+        app.dependency_overrides[get_current_user] = lambda: {"is_admin": True}
+        response = client.post("/ai/suggest_profile", json={"title": "Test Stub Task", "description": "Code"})
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    for profile in response.json():
+        assert set(profile) == {"id", "username", "resume_id", "score", "matches"}
+        assert profile["matches"][0]["query"] == "Test Stub Task"
+
+@pytest.mark.asyncio
+async def test_precomputed_query_variations_are_shared_with_concurrent_requests():
+    query_variations_cache.clear()
+    mock_query_content = '{"keyword_search_queries": ["a"], "task_search_queries": ["b"]}'
+
+    with patch("app.services.query_variations.query_generator_agent.ainvoke", new_callable=AsyncMock) as mock_ai, \
+         patch("app.services.query_variations.QUERY_VARIATIONS_PRECOMPUTE", True), \
+         patch.dict("os.environ", {"USE_LLM_STUB": "false"}):
+        mock_ai.return_value = {"messages": [AsyncMock(content=mock_query_content)]}
+
+        precompute_query_variations("Dev", "Code")
+        variations = await get_query_variations("Dev", "Code")
+
+    assert variations == {"keyword_search_queries": ["a"], "task_search_queries": ["b"]}
+    mock_ai.assert_awaited_once()
+    query_variations_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_precompute_is_bounded_and_cancelled_on_stop():
+    query_variations_cache.clear()
+    running = []
+    release = asyncio.Event()
+
+    async def generate(*args, **kwargs):
+        running.append(1)
+        await release.wait()
+
+    with patch("app.services.query_variations.query_generator_agent.ainvoke", side_effect=generate) as mock_ai, \
+         patch("app.services.query_variations.QUERY_VARIATIONS_PRECOMPUTE", True), \
+         patch("app.services.query_variations.QUERY_VARIATIONS_PRECOMPUTE_MAX_PENDING", 2), \
+         patch("app.services.query_variations._precompute_slots", asyncio.Semaphore(1)), \
+         patch.dict("os.environ", {"USE_LLM_STUB": "false"}):
+        for i in range(4):
+            precompute_query_variations(f"Task {i}", "")
+        await asyncio.sleep(0.01)
+
+        # Two accepted, the rest dropped, and only one generating at a time
+        assert len(query_variations._background_tasks) == 2
+        assert mock_ai.await_count == 1
+        await stop_precompute()
+    assert len(running) == 1
+    assert not query_variations._background_tasks
+    query_variations_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_staffing_workers_deduplicate_pending_recomputes():
+    computed = []
+
+    async def compute(title, description):
+        computed.append(title)
+        return [{"id": "123", "username": title}]
+
+    suggestions = StaffingSuggestions(compute, workers=1, max_pending=10, maxsize=10, ttl=60, enabled=True)
+    suggestions.start()
+    suggestions.schedule("task-1", "Old title", "Code")
+    suggestions.schedule("task-1", "New title", "Code")
+    suggestions.schedule("task-2", "Other", "Code")
+    for _ in range(100):
+        if suggestions.get("Other", "Code"):
+            break
+        await asyncio.sleep(0.01)
+    await suggestions.stop()
+
+    assert computed == ["New title", "Other"]
+    assert suggestions.get("New title", "Code") == [{"id": "123", "username": "New title"}]
+    suggestions.invalidate()
+    assert suggestions.get("New title", "Code") is None
+
+
+@pytest.mark.asyncio
+async def test_staffing_concurrent_requests_share_one_computation():
+    release = asyncio.Event()
+    calls = []
+
+    async def compute(title, description):
+        calls.append(title)
+        await release.wait()
+        return [{"id": "123", "username": title}]
+
+    suggestions = StaffingSuggestions(compute, workers=1, max_pending=10, maxsize=10, ttl=60, enabled=False)
+    waiters = [asyncio.create_task(suggestions.get_or_compute("Build API", "Code")) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [[{"id": "123", "username": "Build API"}]] * 3
+    assert calls == ["Build API"]
+    assert suggestions.get("Build API", "Code") == [{"id": "123", "username": "Build API"}]
@@ -0,0 +1,68 @@
+import io
+from pathlib import Path
+from uuid import uuid4
+import pytest
+from fastapi.testclient import TestClient
+from app.services.task_import import import_tasks, parse_task_row
+from app.main import app
+
+client = TestClient(app)
+
+SPRINT_CSV = Path(__file__).resolve().parent.parent / "Sprint Project Estimation and Strategy.csv"
+HEADER = "﻿Story,Task,Estimate Min (hr),Estimate Max (hr),Actual,Comment\n"
+
+
+def test_parse_task_row_uses_actual_or_estimate_midpoint():
+    row = {"Story": "Auth", "Task": "JWT login", "Estimate Min (hr)": "1.5", "Estimate Max (hr)": "2.5", "Actual": "", "Comment": "Done early"}
+    task = parse_task_row(row)
+    assert task["title"] == "JWT login"
+    assert task["description"] == "Auth\n\nDone early"
+    assert task["total_minutes"] == 120
+
+    assert parse_task_row({**row, "Actual": "3"})["total_minutes"] == 180
+    for bad in ({"Task": " "}, {"Actual": "soon"}, {"Actual": "", "Estimate Max (hr)": ""},
+                {"Estimate Min (hr)": "4", "Estimate Max (hr)": "2"}, {"Actual": "-1"}):
+        with pytest.raises(ValueError):
+            parse_task_row({**row, **bad})
+
+
+@pytest.mark.asyncio
+async def test_import_tasks_batches_inserts_and_reports_bad_rows():
+    lines = [f"Story {i},Task {i},1,3,,\n" for i in range(7)]
+    lines.insert(3, "Story,,1,2,,\n")
+    lines.insert(5, "Story,Bad estimate,x,2,,\n")
+    batches = []
+
+    async def create_many(rows):
+        batches.append(len(rows))
+        return rows
+
+    report = await import_tasks(io.BytesIO((HEADER + "".join(lines)).encode("utf-8")), create_many, batch_size=3)
+    assert report["imported"] == 7
+    assert report["failed"] == 2
+    assert [error["line"] for error in report["errors"]] == [5, 7]
+    assert sum(batches) == 7 and max(batches) <= 3
+
+
+@pytest.mark.asyncio
+async def test_import_endpoint_loads_the_sprint_csv(repository, auth_headers):
+    admin = await repository.users.create({"username": "admin", "email": "admin@example.com", "password": "x", "is_admin": True})
+    user = await repository.users.create({"username": "dev", "email": "dev@example.com", "password": "x"})
+
+    with SPRINT_CSV.open("rb") as f:
+        files = {"file": ("sprint.csv", f, "text/csv")}
+        assert client.post("/tasks/import", headers=auth_headers(user), files=files).status_code == 403
+        f.seek(0)
+        response = client.post("/tasks/import", headers=auth_headers(admin), files=files, params={"user_id": user["id"]})
+    assert response.status_code == 200
+    report = response.json()
+    assert report["failed"] == 0
+    tasks = {task["title"]: task for task in repository.store.tasks.values()}
+    assert len(tasks) == report["imported"] == 12
+    assert tasks["JWT-based Authentication"]["total_minutes"] == 90
+    assert tasks["JWT-based Authentication"]["user_id"] == user["id"]
+
+    files = {"file": ("tasks.csv", io.BytesIO(b"title,minutes\nA,1\n"), "text/csv")}
+    assert client.post("/tasks/import", headers=auth_headers(admin), files=files).status_code == 400
+    assert client.post("/tasks/import", headers=auth_headers(admin), files=files, params={"user_id": "missing"}).status_code == 422
+    assert client.post("/tasks/import", headers=auth_headers(admin), files=files, params={"user_id": str(uuid4())}).status_code == 404
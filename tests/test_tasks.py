@@ -0,0 +1,248 @@
+import json
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.mark.asyncio
+async def test_task_lifecycle_with_memory_repository(repository, auth_headers):
+    admin = await repository.users.create({"username": "admin", "email": "admin@example.com", "password": "x", "is_admin": True})
+    user = await repository.users.create({"username": "dev", "email": "dev@example.com", "password": "x"})
+
+    response = client.post("/tasks/create", headers=auth_headers(admin),
+                           json={"title": "Setup CI", "description": "Pipeline", "total_minutes": 0, "user_id": user["id"]})
+    assert response.status_code == 200
+    task_id = response.json()["id"]
+
+    my_tasks = client.get("/tasks/my_tasks", headers=auth_headers(user)).json()
+    assert [task["id"] for task in my_tasks] == [task_id]
+
+    response = client.put(f"/tasks/update/{task_id}", headers=auth_headers(user), json={"status": "in_process", "title": "Ignored"})
+    assert response.json()["status"] == "in_process"
+    assert response.json()["title"] == "Setup CI"
+
+    assert client.delete(f"/tasks/delete/{task_id}", headers=auth_headers(user)).status_code == 403
+    assert client.delete(f"/tasks/delete/{task_id}", headers=auth_headers(admin)).status_code == 200
+    assert client.get(f"/tasks/get/{task_id}", headers=auth_headers(admin)).status_code == 404
+
+
+def test_signup_and_login_with_memory_repository(repository):
+    response = client.post("/users/create", json={"email": "new@example.com", "username": "new", "password": "secret", "is_admin": True})
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+
+    me = client.get("/users/me", headers={"Authorization": f"Bearer {token}"}).json()
+    assert me["username"] == "new"
+    assert me["is_admin"] is False
+
+    assert client.post("/users/login", data={"username": "new", "password": "wrong"}).status_code == 401
+    assert client.post("/users/login", data={"username": "new", "password": "secret"}).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_pages_with_cursor_and_fields(repository, auth_headers):
+    admin = await repository.users.create({"username": "admin", "email": "admin@example.com", "password": "x", "is_admin": True})
+    created = [await repository.tasks.create({"title": f"Task {i}", "description": "", "total_minutes": i, "status": "created"})
+               for i in range(5)]
+
+    seen = []
+    params = {"limit": 2, "fields": "title"}
+    while True:
+        response = client.get("/tasks/list", headers=auth_headers(admin), params=params)
+        assert response.status_code == 200
+        for task in response.json():
+            assert set(task) == {"id", "created_at", "title"}
+            seen.append(task["id"])
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    assert seen == [task["id"] for task in created]
+
+    assert client.get("/tasks/list", headers=auth_headers(admin), params={"fields": "title,secret"}).status_code == 400
+    assert client.get("/tasks/list", headers=auth_headers(admin), params={"cursor": "not-a-cursor"}).status_code == 400
+
+    response = client.get("/tasks/list", headers=auth_headers(admin), params={"stream": "true", "limit": 2})
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [task["id"] for task in lines] == [task["id"] for task in created]
+
+
+@pytest.mark.asyncio
+async def test_list_users_never_returns_password(repository, auth_headers):
+    admin = await repository.users.create({"username": "admin", "email": "admin@example.com", "password": "x", "is_admin": True})
+
+    users = client.get("/users/list", headers=auth_headers(admin)).json()
+    assert [user["id"] for user in users] == [admin["id"]]
+    assert "password" not in users[0]
+    assert client.get("/users/list", headers=auth_headers(admin), params={"fields": "password"}).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_task_filters_and_sort(repository, auth_headers):
+    admin = await repository.users.create({"username": "admin", "email": "admin@example.com", "password": "x", "is_admin": True})
+    user = await repository.users.create({"username": "dev", "email": "dev@example.com", "password": "x"})
+    for task in [{"title": "Old", "status": "completed", "user_id": user["id"],
+                  "created_at": "2026-01-01T00:00:00+00:00", "updated_at": "2026-01-05T00:00:00+00:00"},
+                 {"title": "New", "status": "in_process", "user_id": user["id"],
+                  "created_at": "2026-02-01T00:00:00+00:00", "updated_at": "2026-02-02T00:00:00+00:00"},
+                 {"title": "Other", "status": "in_process", "user_id": admin["id"],
+                  "created_at": "2026-03-01T00:00:00+00:00", "updated_at": "2026-03-01T00:00:00+00:00"}]:
+        await repository.tasks.create(task)
+
+    def titles(url, **params):
+        response = client.get(url, headers=auth_headers(admin if url == "/tasks/list" else user), params=params)
+        assert response.status_code == 200, response.text
+        return [task["title"] for task in response.json()]
+
+    assert titles("/tasks/list", status="in_process") == ["New", "Other"]
+    assert titles("/tasks/list", assignee=user["id"], sort="-created_at") == ["New", "Old"]
+    assert titles("/tasks/list", created_after="2026-01-15T00:00:00", created_before="2026-03-01T00:00:00Z") == ["New"]
+    assert titles("/tasks/my_tasks", sort="-updated_at") == ["New", "Old"]
+    assert titles("/tasks/my_tasks", status="completed") == ["Old"]
+    assert titles("/tasks/my_tasks", updated_after="2026-02-01T00:00:00Z") == ["New"]
+
+    first = client.get("/tasks/list", headers=auth_headers(admin), params={"sort": "-updated_at", "limit": 2})
+    assert [task["title"] for task in first.json()] == ["Other", "New"]
+    cursor = first.headers["X-Next-Cursor"]
+    assert titles("/tasks/list", sort="-updated_at", limit=2, cursor=cursor) == ["Old"]
+    assert client.get("/tasks/list", headers=auth_headers(admin), params={"cursor": cursor}).status_code == 400
+
+    assert client.get("/tasks/list", headers=auth_headers(admin), params={"status": "unknown"}).status_code == 422
+    assert client.get("/tasks/list", headers=auth_headers(admin), params={"assignee": "nobody"}).status_code == 422
+    assert client.get("/tasks/my_tasks", headers=auth_headers(user), params={"sort": "title"}).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_conditional_get_returns_304_until_task_changes(repository, auth_headers):
+    admin = await repository.users.create({"username": "admin", "email": "admin@example.com", "password": "x", "is_admin": True})
+    user = await repository.users.create({"username": "dev", "email": "dev@example.com", "password": "x"})
+    task = await repository.tasks.create({"title": "Setup CI", "user_id": user["id"]})
+
+    for url in (f"/tasks/get/{task['id']}", "/tasks/my_tasks", "/users/me"):
+        response = client.get(url, headers=auth_headers(user))
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert etag.startswith('W/"')
+        assert response.headers["Cache-Control"] == "private, no-cache"
+
+        # Served from the version map, without reading the repository
+        repository.store.tasks[task["id"]]["title"] = "Changed behind the version map"
+        response = client.get(url, headers={**auth_headers(user), "If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+        repository.store.tasks[task["id"]]["title"] = "Setup CI"
+
+    etag = client.get(f"/tasks/get/{task['id']}", headers=auth_headers(user)).headers["ETag"]
+    client.put(f"/tasks/update/{task['id']}", headers=auth_headers(user), json={"status": "in_process"})
+    response = client.get(f"/tasks/get/{task['id']}", headers={**auth_headers(user), "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["status"] == "in_process"
+
+    # Same content for the admin, but the ETag of one viewer never answers for a user who can't see the task
+    response = client.get(f"/tasks/get/{task['id']}", headers={**auth_headers(admin), "If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304
+    other = await repository.users.create({"username": "other", "email": "other@example.com", "password": "x"})
+    response = client.get(f"/tasks/get/{task['id']}", headers={**auth_headers(other), "If-None-Match": "*"})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_update_and_delete(repository, auth_headers):
+    admin = await repository.users.create({"username": "admin", "email": "admin@example.com", "password": "x", "is_admin": True})
+    user = await repository.users.create({"username": "dev", "email": "dev@example.com", "password": "x"})
+
+    items = [{"title": f"Task {i}", "description": "", "total_minutes": 30, "user_id": user["id"]} for i in range(3)]
+    assert client.post("/tasks/bulk_create", headers=auth_headers(user), json=items).status_code == 403
+    assert client.post("/tasks/bulk_create", headers=auth_headers(admin), json=items + [{"title": "No estimate"}]).status_code == 422
+    created = client.post("/tasks/bulk_create", headers=auth_headers(admin), json=items).json()
+    assert [result["task"]["title"] for result in created] == ["Task 0", "Task 1", "Task 2"]
+    ids = [result["id"] for result in created]
+
+    other = await repository.tasks.create({"title": "Not mine", "user_id": admin["id"]})
+    results = client.put("/tasks/bulk_update", headers=auth_headers(user), json=[
+        {"id": ids[0], "status": "completed", "title": "Ignored"},
+        {"id": str(uuid.uuid4()), "status": "completed"},
+        {"id": other["id"], "status": "completed"},
+        {"id": ids[0], "total_minutes": 90},
+        {"id": ids[1], "total_minutes": 45},
+    ]).json()
+    assert [result["ok"] for result in results] == [True, False, False, False, True]
+    assert results[0]["task"]["status"] == "completed"
+    assert results[0]["task"]["title"] == "Task 0"
+    assert results[4]["task"]["total_minutes"] == 45
+    assert repository.store.tasks[other["id"]]["status"] == "created"
+
+    results = client.post("/tasks/bulk_delete", headers=auth_headers(admin), json=[ids[0], str(uuid.uuid4()), ids[2]]).json()
+    assert [result["ok"] for result in results] == [True, False, True]
+    assert set(repository.store.tasks) == {ids[1], other["id"]}
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_writes_only_changed_columns(repository, auth_headers):
+    user = await repository.users.create({"username": "dev", "email": "dev@example.com", "password": "x"})
+    task = await repository.tasks.create({"title": "Setup CI", "user_id": user["id"]})
+    writes = []
+    update_many = repository.tasks.update_many
+
+    async def recording_update_many(task_ids, data, user_id=None):
+        writes.append(data)
+        # An admin renames the task between the request being read and written
+        repository.store.tasks[task["id"]]["title"] = "Renamed meanwhile"
+        return await update_many(task_ids, data, user_id=user_id)
+
+    repository.tasks.update_many = recording_update_many
+    results = client.put("/tasks/bulk_update", headers=auth_headers(user), json=[{"id": task["id"], "status": "completed"}]).json()
+    assert results[0]["ok"] is True
+    assert set(writes[0]) == {"status", "updated_at"}
+    assert repository.store.tasks[task["id"]]["title"] == "Renamed meanwhile"
+
+
+@pytest.mark.asyncio
+async def test_bulk_writes_skip_precompute_hooks(repository, monkeypatch, auth_headers):
+    admin = await repository.users.create({"username": "admin", "email": "admin@example.com", "password": "x", "is_admin": True})
+    scheduled = []
+    monkeypatch.setattr("app.routes.tasks.precompute_query_variations", lambda *args: scheduled.append(args))
+    monkeypatch.setattr("app.routes.tasks.staffing_suggestions.schedule", lambda *args: scheduled.append(args))
+
+    items = [{"title": f"Task {i}", "description": "", "total_minutes": 30, "user_id": admin["id"]} for i in range(3)]
+    created = client.post("/tasks/bulk_create", headers=auth_headers(admin), json=items).json()
+    client.put("/tasks/bulk_update", headers=auth_headers(admin), json=[{"id": result["id"], "title": "Renamed"} for result in created])
+    assert scheduled == []
+
+    client.put(f"/tasks/update/{created[0]['id']}", headers=auth_headers(admin), json={"title": "Single update"})
+    assert len(scheduled) == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_endpoints_validate_ids_and_assignees(repository, auth_headers):
+    admin = await repository.users.create({"username": "admin", "email": "admin@example.com", "password": "x", "is_admin": True})
+    task = await repository.tasks.create({"title": "Setup CI", "user_id": admin["id"]})
+    unknown_user = str(uuid.uuid4())
+
+    assert client.put("/tasks/bulk_update", headers=auth_headers(admin), json=[{"id": "not-a-uuid", "status": "completed"}]).status_code == 422
+    assert client.post("/tasks/bulk_delete", headers=auth_headers(admin), json=[task["id"], "not-a-uuid"]).status_code == 422
+    assert task["id"] in repository.store.tasks
+
+    items = [{"title": "Known", "description": "", "total_minutes": 30, "user_id": admin["id"]},
+             {"title": "Unknown", "description": "", "total_minutes": 30, "user_id": unknown_user}]
+    results = client.post("/tasks/bulk_create", headers=auth_headers(admin), json=items).json()
+    assert [result["ok"] for result in results] == [True, False]
+    assert results[1]["detail"] == "User not found"
+    assert {task["title"] for task in repository.store.tasks.values()} == {"Setup CI", "Known"}
+
+    results = client.put("/tasks/bulk_update", headers=auth_headers(admin), json=[
+        {"id": task["id"], "user_id": unknown_user},
+        {"id": results[0]["id"], "status": "completed"},
+    ]).json()
+    assert [result["ok"] for result in results] == [False, True]
+    assert results[0]["detail"] == "User not found"
+    assert repository.store.tasks[task["id"]]["user_id"] == admin["id"]
+
+    results = client.post("/tasks/bulk_delete", headers=auth_headers(admin), json=[task["id"], task["id"]]).json()
+    assert [result["ok"] for result in results] == [True, False]
+    assert results[1]["detail"] == "Task is listed more than once"
+    assert task["id"] not in repository.store.tasks
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.services.memory_repository import MemoryRepository
+from app.services.repository import set_repository
+from app.services.retrieval import vector_search
+from app.services.vector_index import VectorIndex
+
+
+def make_row(user_id: str, embedding) -> dict:
+    return {"id": f"resume-{user_id}", "user_id": user_id, "profile_skills": "skills", "profile_tasks": "tasks",
+            "embedding": embedding}
+
+
+def test_search_matches_brute_force_cosine():
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, 16))
+    index = VectorIndex()
+    # PostgREST returns pgvector columns as strings
+    index.load([make_row(str(i), str(vector.tolist())) for i, vector in enumerate(vectors)])
+    query = rng.normal(size=16)
+
+    results = index.search(query.tolist(), match_threshold=0.3, num_profiles=5)
+
+    similarities = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+    expected = [str(i) for i in np.argsort(-similarities) if similarities[i] > 0.3][:5]
+    assert [profile["user_id"] for profile in results] == expected
+    assert all(profile["similarity"] > 0.3 for profile in results)
+
+
+def test_upsert_and_remove_keep_the_index_consistent():
+    index = VectorIndex()
+    index.upsert(make_row("ignored", [1.0, 0.0]))
+    assert len(index) == 0 # updates before load are ignored
+
+    index.load([])
+    for user_id, embedding in (("a", [1.0, 0.0]), ("b", [0.0, 1.0]), ("c", [0.7, 0.7])):
+        index.upsert(make_row(user_id, embedding))
+    index.upsert(make_row("b", [0.9, 0.1]))
+    index.remove("a")
+
+    assert len(index) == 2
+    assert [profile["user_id"] for profile in index.search([1.0, 0.0], 0.3, 10)] == ["b", "c"]
+    assert index.search([0.0, -1.0], 0.3, 10) == []
+
+
+@pytest.mark.asyncio
+async def test_vector_search_uses_the_index_when_loaded():
+    repository = MemoryRepository()
+    repository.search.vector_search = AsyncMock(return_value=[])
+    set_repository(repository)
+    index = VectorIndex()
+    index.load([make_row("a", [1.0, 0.0])])
+
+    try:
+        with patch("app.services.retrieval.vector_index", index):
+            profiles = await vector_search("Build REST APIs", 3, query_embedding=[1.0, 0.0])
+        await vector_search("Build REST APIs", 3, query_embedding=[1.0, 0.0])
+    finally:
+        set_repository(None)
+
+    assert [profile["user_id"] for profile in profiles] == ["a"]
+    repository.search.vector_search.assert_awaited_once()
@@ -0,0 +1,51 @@
+import asyncio
+import json
+import httpx
+import pytest
+from tavily import AsyncTavilyClient
+from app.services.cache import TTLCache
+from app.services.web_search import WebSearch
+
+
+class FakeTavily:
+    """Stands in for the Tavily API behind httpx.MockTransport, recording every search it receives."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.queries = []
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/search"
+        payload = json.loads(request.content)
+        self.queries.append(payload["query"])
+        await asyncio.sleep(self.delay)
+        return httpx.Response(200, json={"query": payload["query"], "results": [
+            {"title": "FastAPI docs", "url": "https://fastapi.tiangolo.com", "content": "FastAPI framework"}]})
+
+    def client(self) -> AsyncTavilyClient:
+        transport = httpx.MockTransport(self.handler)
+        return AsyncTavilyClient(api_key="test", client=httpx.AsyncClient(transport=transport, base_url="https://tavily.test"))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_searches_share_one_upstream_call():
+    fake = FakeTavily(delay=0.05)
+    search = WebSearch(fake.client, TTLCache("tavily_search_test", maxsize=10, ttl=60))
+
+    responses = await asyncio.gather(search.search("FastAPI best practices"), search.search("  fastapi BEST practices"))
+
+    assert fake.queries == ["fastapi best practices"]
+    assert responses[0] == responses[1]
+    assert responses[0]["results"][0]["title"] == "FastAPI docs"
+
+
+@pytest.mark.asyncio
+async def test_search_results_are_cached_by_normalized_query():
+    fake = FakeTavily()
+    search = WebSearch(fake.client, TTLCache("tavily_search_test", maxsize=10, ttl=60))
+
+    await search.search("Kubernetes autoscaling")
+    await search.search("kubernetes   autoscaling")
+    await search.search("Terraform modules")
+
+    assert fake.queries == ["kubernetes autoscaling", "terraform modules"]